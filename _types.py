@@ -2,6 +2,8 @@ from collections import namedtuple
 from typing import TypedDict
 import pandas as pd
 
+from utils import FlightPath
+
 
 class FlightPoint(TypedDict):
     longitude: float
@@ -29,8 +31,6 @@ class Objectives(TypedDict):
     cocip: float or None
 
 
-FlightPath = list[FlightPoint]
-
 WindVector = namedtuple("WindVector", "u v")
 
 IndexPoint3D = namedtuple("IndexPoint3D", "lat lon alt")
@@ -1,10 +1,10 @@
-import multiprocessing
-from concurrent.futures import ProcessPoolExecutor, as_completed
-
+import contextlib
 import networkx as nx
 import numpy as np
 
 from .ant import Ant
+from .executor import create_executor
+from .cocip_queue import CocipQueue
 from rich.progress import track
 
 import typing
@@ -69,50 +69,110 @@ class ACO:
             )
             for _ in range(self.config.NO_OF_ANTS)
         ]
-        for i in track(range(self.config.NO_OF_ITERATIONS)):
-            with ProcessPoolExecutor(
-                max_workers=multiprocessing.cpu_count()
-            ) as executor:
-                # Run the ants
-                futures = [
-                    executor.submit(ant.run_ant, i) for i, ant in enumerate(ants)
-                ]
+        # Deferred objectives are evaluated asynchronously for the most
+        # promising solutions only, rather than for every ant
+        deferred_objectives = [
+            str(objective)
+            for objective in self.objective_functions
+            if objective.deferred
+        ]
+        if self.config.ASYNC_COCIP and deferred_objectives:
+            queue = CocipQueue(self.config, deferred_objectives)
+        else:
+            queue = contextlib.nullcontext()
+
+        with create_executor(self.config) as executor, queue as cocip_queue:
+            executor.start(self.routing_graph_manager)
+            if cocip_queue is not None:
+                cocip_queue.start(self.routing_graph_manager)
+            for _ in track(range(self.config.NO_OF_ITERATIONS)):
+                # Construct the paths locally, then evaluate them on the executor
+                solutions = [ant.construct_solution() for ant in ants]
+                results = executor.evaluate(
+                    [solution.indices for solution in solutions],
+                    skip_deferred=cocip_queue is not None,
+                )
 
                 iteration_best_solution = dict.fromkeys(self.objectives, None)
                 iteration_best_objectives = dict.fromkeys(self.objectives, np.inf)
 
-                # Get the results
-                for future in as_completed(futures):
-                    solution = future.result()
-
-                    self.solutions.append(solution)
-                    # Only add to the pareto set if it is not dominated by any current solution
-                    is_dominated = self.check_pareto_dominance(solution)
-                    if not is_dominated:
-                        self.pareto_set.append(solution)
-
-                    # Track the best objectives for each iteration and globally
-                    for objective in self.objective_functions:
-                        objective = str(objective)
-                        if (
-                            solution.objectives[objective]
-                            < iteration_best_objectives[objective]
-                        ):
-                            iteration_best_solution[objective] = solution
-                            iteration_best_objectives[objective] = solution.objectives[
-                                objective
-                            ]
-
-                        if solution.objectives[objective] < best_objectives[objective]:
-                            best_objectives[objective] = solution.objectives[objective]
+                for solution, (flight_path, objectives) in zip(solutions, results):
+                    solution.flight_path = flight_path
+                    solution.objectives = objectives
+
+                if cocip_queue is not None:
+                    cocip_queue.submit(solutions, self.pareto_set)
+                    solutions = solutions + cocip_queue.collect()
+
+                for solution in solutions:
+                    self.record_solution(
+                        solution,
+                        iteration_best_solution,
+                        iteration_best_objectives,
+                        best_objectives,
+                    )
 
                 self.objectives_over_time.append(best_objectives.copy())
                 self.pheromone_update(
                     iteration_best_solution, iteration_best_objectives, best_objectives
                 )
 
+            if cocip_queue is not None:
+                # Results still in flight are added to the archive at the end
+                for solution in cocip_queue.collect(block=True):
+                    self.record_solution(solution, {}, {}, best_objectives)
+
         return self.pareto_set
 
+    def record_solution(
+        self,
+        solution: "Flight",
+        iteration_best_solution: dict[str, "Flight"],
+        iteration_best_objectives: "Objectives",
+        best_objectives: "Objectives",
+    ) -> None:
+        """
+        Tracks the best of each objective a solution has been evaluated for,
+        and adds it to the archive once every objective has been evaluated
+        """
+        for objective in self.objectives:
+            if objective not in solution.objectives:
+                continue
+            value = solution.objectives[objective]
+            if value < iteration_best_objectives.get(objective, np.inf):
+                iteration_best_solution[objective] = solution
+                iteration_best_objectives[objective] = value
+            if value < best_objectives[objective]:
+                best_objectives[objective] = value
+
+        if all(objective in solution.objectives for objective in self.objectives):
+            self.solutions.append(solution)
+            # Only add to the pareto set if it is not dominated by any current solution
+            is_dominated = self.check_pareto_dominance(solution)
+            if not is_dominated:
+                self.pareto_set.append(solution)
+
+    def warm_start(self, seeds: dict[str, "Flight"]) -> None:
+        """
+        Biases the pheromone of each objective towards an evaluated seed
+        solution, and adds the seeds to the pareto set
+        """
+        evaporation_rate = self.config.EVAPORATION_RATE
+        tau_min = self.config.TAU_MIN
+        tau_max = self.config.TAU_MAX
+
+        for objective, solution in seeds.items():
+            if objective not in self.objectives:
+                continue
+            self.routing_graph.evaporate_pheromone(objective, evaporation_rate, tau_min)
+            for u, v in nx.utils.pairwise(solution.indices):
+                self.routing_graph[u][v][f"{objective}_pheromone"] = tau_max
+
+        for solution in seeds.values():
+            self.solutions.append(solution)
+            if not self.check_pareto_dominance(solution):
+                self.pareto_set.append(solution)
+
     def pheromone_update(
         self,
         solution: "Flight",
@@ -128,6 +188,9 @@ class ACO:
 
         for objective in self.objective_functions:
             objective = str(objective)
+            if solution[objective] is None:
+                # Deferred objectives may have no results yet this iteration
+                continue
             solution_edges = list(nx.utils.pairwise(solution[objective].indices))
             for u, v in solution_edges:
                 delta = 0
@@ -1,13 +1,16 @@
 import random
 import math
 from performance_model import Flight
+from routing_graph import RoutingGraph
+from utils import geodesy
 
 import typing
 
 if typing.TYPE_CHECKING:
     from config import Config
-    from routing_graph import RoutingGraphManager, RoutingGraph
-    from _types import FlightPath, Objectives, IndexPoint3D
+    from routing_graph import RoutingGraphManager
+    from objectives import Objective
+    from _types import Objectives, IndexPoint3D, FlightPoint
 
 
 class Ant:
@@ -49,31 +52,85 @@ class Ant:
             ((0, self.config.GRID_WIDTH, self.config.STARTING_ALTITUDE))
         )
 
+        time = None
+        if isinstance(self.routing_graph, RoutingGraph):
+            # Heuristics which vary with time are taken at a rough arrival time
+            time = self.config.DEPARTURE_DATE.value
+
         neighbours = self.routing_graph[solution.indices[0]]
         while neighbours:
-            probabilities = []
-            choice = None
             random_objective = random.choice(self.objectives)
-            for n in neighbours:
-                probability = self.calculate_probability_at_neighbour(
-                    n,
-                    neighbours[n][f"{random_objective}_pheromone"],
-                    random_objective,
-                )
-                if probability is None:
-                    # reached the destination
-                    choice = n
-                    break
-
-                probabilities.append(probability)
-            if not choice and probabilities:
-                choice = random.choices(list(neighbours), weights=probabilities, k=1)[0]
-
+            choice = self.choose_neighbour(
+                solution.indices[-1], neighbours, random_objective, time
+            )
             solution.add_point_from_index(choice)
+            if time is not None:
+                time += self.estimate_duration(
+                    solution.flight_path[-2], solution.flight_path[-1]
+                )
             neighbours = self.routing_graph[choice]
 
         return solution
 
+    def choose_neighbour(
+        self,
+        node: "IndexPoint3D",
+        neighbours: dict,
+        objective: "Objective",
+        time: int or None = None,
+    ) -> "IndexPoint3D":
+        """
+        Chooses the next node, weighted by the probability of each neighbour
+        """
+        if isinstance(self.routing_graph, RoutingGraph):
+            # Array-backed graphs calculate every probability in one pass
+            candidates, probabilities = self.routing_graph.calculate_probabilities(
+                node,
+                objective,
+                self.config.PHEROMONE_WEIGHT,
+                self.config.HEURISTIC_WEIGHT,
+                time,
+            )
+            for n in candidates:
+                if self.is_destination(n):
+                    return n
+            return random.choices(candidates, weights=probabilities, k=1)[0]
+
+        probabilities = []
+        for n in neighbours:
+            probability = self.calculate_probability_at_neighbour(
+                n,
+                neighbours[n][f"{objective}_pheromone"],
+                objective,
+            )
+            if probability is None:
+                # reached the destination
+                return n
+
+            probabilities.append(probability)
+        return random.choices(list(neighbours), weights=probabilities, k=1)[0]
+
+    def estimate_duration(self, point: "FlightPoint", next_point: "FlightPoint") -> int:
+        """
+        Estimates the time in nanoseconds between two points, at an arbitrary
+        speed
+        """
+        distance = geodesy.distance(
+            point["latitude"],
+            point["longitude"],
+            next_point["latitude"],
+            next_point["longitude"],
+            method="haversine",
+        )
+        speed = self.config.NOMINAL_THRUST * 343  # as in the objective heuristics
+        return int(distance / speed * 1e9)
+
+    def is_destination(self, node: "IndexPoint3D") -> bool:
+        """
+        Checks whether a node is the destination
+        """
+        return node[0] == self.config.NO_OF_POINTS and node[1] == 0
+
     def calculate_probability_at_neighbour(
         self,
         node: "IndexPoint3D",
@@ -90,7 +147,7 @@ class Ant:
 
         alpha = self.config.PHEROMONE_WEIGHT
         beta = self.config.HEURISTIC_WEIGHT
-        if node[0] == self.config.NO_OF_POINTS and node[1] == 0:
+        if self.is_destination(node):
             return None
         if len(neighbours) == 0:
             return 0.0001
@@ -0,0 +1,229 @@
+import heapq
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import numpy as np
+from rich import print
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from config import Config
+    from routing_graph import RoutingGraphManager
+    from performance_model import Flight
+    from _types import FlightPath, Objectives
+
+
+# State cached once per CoCiP worker process by the pool initializer
+_cocip_worker_state: dict = {}
+
+
+def _init_cocip_worker(
+    routing_graph_manager: "RoutingGraphManager", config: "Config"
+) -> None:
+    performance_model = routing_graph_manager.performance_model
+    objectives = [
+        objective(performance_model, config) for objective in config.OBJECTIVES
+    ]
+    _cocip_worker_state["objectives"] = [
+        objective for objective in objectives if objective.deferred
+    ]
+
+
+def _evaluate_deferred(flight_path: "FlightPath") -> "Objectives":
+    return {
+        str(objective): objective._run_objective_function(flight_path)
+        for objective in _cocip_worker_state["objectives"]
+    }
+
+
+class CocipQueue:
+    def __init__(self, config: "Config", deferred_objectives: list[str]):
+        """
+        Evaluates the deferred (expensive) objectives of solutions in a separate
+        process pool. The most promising solutions of each iteration, up to a
+        budget, join a bounded backlog which is re-prioritised against the
+        archive every iteration. Only as many evaluations as there are workers
+        are dispatched at once, and those which overrun the timeout from
+        their dispatch are abandoned. Failed evaluations are retried once.
+        """
+        self.config: "Config" = config
+        self.deferred_objectives: list[str] = deferred_objectives
+        self.workers: int = config.COCIP_WORKERS
+        self.budget: int = config.COCIP_BUDGET
+        self.max_backlog: int = config.COCIP_BACKLOG
+        self.timeout: float = config.COCIP_TIMEOUT
+        self.pool: ProcessPoolExecutor or None = None
+        # Heap of (dominated by, rank sum, order, solution) waiting for a worker
+        self.backlog: list[tuple] = []
+        self.counter: itertools.count = itertools.count()
+        self.running: dict[Future, tuple["Flight", float]] = {}
+        # Evaluations past their timeout still hold a worker until they end
+        self.abandoned: set[Future] = set()
+        self.retried: set["Flight"] = set()
+        self.no_of_evaluations: int = 0
+        self.no_of_timeouts: int = 0
+        self.no_of_failures: int = 0
+        self.no_of_dropped: int = 0
+
+    def start(self, routing_graph_manager: "RoutingGraphManager") -> None:
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_cocip_worker,
+            initargs=(routing_graph_manager, self.config),
+        )
+
+    def get_priorities(
+        self, solutions: list["Flight"], archive: list["Flight"]
+    ) -> list[tuple[int, int]]:
+        """
+        Gets how many archive members dominate each solution on the cheap
+        objectives, and the sum of its ranks on each cheap objective. Lower
+        priorities go first.
+        """
+        if not solutions:
+            return []
+        cheap_objectives = [
+            objective
+            for objective in solutions[0].objectives
+            if objective not in self.deferred_objectives
+        ]
+        values = np.array(
+            [
+                [solution.objectives[objective] for objective in cheap_objectives]
+                for solution in solutions
+            ],
+            dtype=float,
+        ).reshape(len(solutions), len(cheap_objectives))
+        archive_values = np.array(
+            [
+                [solution.objectives[objective] for objective in cheap_objectives]
+                for solution in archive
+            ],
+            dtype=float,
+        ).reshape(len(archive), len(cheap_objectives))
+
+        dominated_by = (
+            (archive_values[np.newaxis] <= values[:, np.newaxis]).all(axis=-1)
+            & (archive_values[np.newaxis] < values[:, np.newaxis]).any(axis=-1)
+        ).sum(axis=1)
+        ranks = values.argsort(axis=0).argsort(axis=0).sum(axis=1)
+        return list(zip(dominated_by.tolist(), ranks.tolist()))
+
+    def prioritise(
+        self, solutions: list["Flight"], archive: list["Flight"]
+    ) -> list["Flight"]:
+        """
+        Orders solutions by how many archive members dominate them on the cheap
+        objectives, then by the sum of their ranks on each cheap objective
+        """
+        priorities = self.get_priorities(solutions, archive)
+        order = sorted(range(len(solutions)), key=lambda i: priorities[i])
+        return [solutions[i] for i in order]
+
+    def submit(self, solutions: list["Flight"], archive: list["Flight"]) -> None:
+        """
+        Adds the most promising solutions, up to the budget, to the backlog.
+        The whole backlog is re-prioritised against the current archive, the
+        least promising beyond COCIP_BACKLOG are dropped, and idle workers
+        are given the most promising.
+        """
+        waiting = [entry[-1] for entry in self.backlog]
+        waiting += self.prioritise(solutions, archive)[: self.budget]
+        entries = [
+            (*priority, next(self.counter), solution)
+            for priority, solution in zip(
+                self.get_priorities(waiting, archive), waiting
+            )
+        ]
+        # A sorted list is already a heap
+        self.backlog = heapq.nsmallest(self.max_backlog, entries)
+        self.no_of_dropped += len(entries) - len(self.backlog)
+        self._dispatch()
+
+    def collect(self, block: bool = False) -> list["Flight"]:
+        """
+        Gets the solutions whose deferred objectives have arrived, adding them
+        to their objectives, and dispatches the backlog to freed workers.
+        Blocking waits until the backlog has been evaluated, each evaluation
+        up to its timeout.
+        """
+        arrived = self._collect_running()
+        self._dispatch()
+        while block and (self.running or self.backlog):
+            if self.running:
+                start = min(start for _, start in self.running.values())
+                timeout = max(0, start + self.timeout - time.monotonic())
+            else:
+                # Every worker is held by an abandoned evaluation
+                timeout = self.timeout
+            done, _ = wait(
+                [*self.running, *self.abandoned],
+                timeout=timeout,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done and not self.running:
+                self.no_of_dropped += len(self.backlog)
+                self.backlog = []
+            arrived += self._collect_running()
+            self._dispatch()
+        return arrived
+
+    def _dispatch(self) -> None:
+        """
+        Gives idle workers the most promising solutions in the backlog, timing
+        each from its dispatch
+        """
+        self.abandoned = {future for future in self.abandoned if not future.done()}
+        while self.backlog and len(self.running) + len(self.abandoned) < self.workers:
+            solution = heapq.heappop(self.backlog)[-1]
+            future = self.pool.submit(_evaluate_deferred, solution.flight_path)
+            self.running[future] = (solution, time.monotonic())
+
+    def _collect_running(self) -> list["Flight"]:
+        """
+        Gets the solutions whose evaluations have finished, and abandons those
+        which have overrun the timeout. Failed evaluations go back to the front
+        of the backlog, unless they have already been retried.
+        """
+        arrived = []
+        for future, (solution, start) in list(self.running.items()):
+            if future.done():
+                del self.running[future]
+                exception = future.exception()
+                if exception is not None:
+                    self.no_of_failures += 1
+                    print(f"[yellow]CoCiP evaluation failed: {exception!r}[/yellow]")
+                    if solution in self.retried:
+                        self.no_of_dropped += 1
+                    else:
+                        self.retried.add(solution)
+                        heapq.heappush(
+                            self.backlog, (0, 0, next(self.counter), solution)
+                        )
+                    continue
+                solution.objectives.update(future.result())
+                self.no_of_evaluations += 1
+                arrived.append(solution)
+            elif time.monotonic() - start > self.timeout:
+                # Overrunning evaluations can't be stopped, but are abandoned
+                del self.running[future]
+                future.cancel()
+                self.abandoned.add(future)
+                self.no_of_timeouts += 1
+        return arrived
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        self.backlog = []
+        self.running = {}
+        self.abandoned = set()
+        self.retried = set()
+
+    def __enter__(self) -> "CocipQueue":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
@@ -0,0 +1,378 @@
+from abc import ABC, abstractmethod
+import math
+import os
+import socket
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import (
+    Listener,
+    Client,
+    Connection,
+    answer_challenge,
+    deliver_challenge,
+)
+from performance_model import Flight
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from config import Config
+    from routing_graph import RoutingGraphManager
+    from _types import FlightPath, IndexPath, Objectives
+
+EvaluationResult = tuple["FlightPath", "Objectives"]
+
+
+def evaluate_index_path(
+    routing_graph_manager: "RoutingGraphManager",
+    config: "Config",
+    indices: "IndexPath",
+) -> EvaluationResult:
+    """
+    Builds a flight from an index path, runs the performance model on it and
+    calculates its objectives
+    """
+    flight = Flight(routing_graph_manager, [], config)
+    flight.set_index_path(indices)
+    flight.run_performance_model()
+    flight.calculate_objectives()
+
+    return flight.flight_path, flight.objectives
+
+
+def evaluate_batch(
+    routing_graph_manager: "RoutingGraphManager",
+    config: "Config",
+    batch: list["IndexPath"],
+    skip_deferred: bool = False,
+) -> list[EvaluationResult]:
+    """
+    Evaluates a batch of index paths, calculating each objective over the whole
+    batch at once. Deferred objectives can be skipped, to be evaluated later.
+    """
+    flights = []
+    for indices in batch:
+        flight = Flight(routing_graph_manager, [], config)
+        flight.set_index_path(indices)
+        flight.run_performance_model()
+        flights.append(flight)
+    Flight.calculate_batch_objectives(flights, skip_deferred)
+
+    return [(flight.flight_path, flight.objectives) for flight in flights]
+
+
+def split_into_batches(items: list, no_of_batches: int) -> list[list]:
+    """
+    Splits a list into at most no_of_batches contiguous, evenly sized batches
+    """
+    if not items:
+        return []
+    batch_size = math.ceil(len(items) / max(1, no_of_batches))
+    return [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+
+
+class Executor(ABC):
+    def __init__(self, config: "Config"):
+        """
+        Abstract backend which evaluates batches of ant index paths
+        """
+        self.config: "Config" = config
+
+    @abstractmethod
+    def start(self, routing_graph_manager: "RoutingGraphManager") -> None:
+        """
+        Distributes the static grids and weather to the workers
+        """
+
+    @abstractmethod
+    def evaluate(
+        self, index_paths: list["IndexPath"], skip_deferred: bool = False
+    ) -> list[EvaluationResult]:
+        """
+        Evaluates the index paths, returning results in the same order
+        """
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        """
+        Stops all workers
+        """
+
+    def __enter__(self) -> "Executor":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+
+
+# State cached once per local worker process by the pool initializer
+_worker_state: dict = {}
+
+
+def _init_local_worker(
+    routing_graph_manager: "RoutingGraphManager", config: "Config"
+) -> None:
+    _worker_state["routing_graph_manager"] = routing_graph_manager
+    _worker_state["config"] = config
+
+
+def _evaluate_local_batch(
+    batch: list["IndexPath"], skip_deferred: bool = False
+) -> list[EvaluationResult]:
+    return evaluate_batch(
+        _worker_state["routing_graph_manager"],
+        _worker_state["config"],
+        batch,
+        skip_deferred,
+    )
+
+
+class LocalExecutor(Executor):
+    def __init__(self, config: "Config"):
+        """
+        Evaluates ants in a process pool on this machine
+        """
+        super().__init__(config)
+        self.no_of_workers: int = config.NO_OF_WORKERS or multiprocessing.cpu_count()
+        self.pool: ProcessPoolExecutor or None = None
+
+    def start(self, routing_graph_manager: "RoutingGraphManager") -> None:
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.no_of_workers,
+            initializer=_init_local_worker,
+            initargs=(routing_graph_manager, self.config),
+        )
+
+    def evaluate(
+        self, index_paths: list["IndexPath"], skip_deferred: bool = False
+    ) -> list[EvaluationResult]:
+        batches = split_into_batches(index_paths, self.no_of_workers)
+        results = []
+        for batch_result in self.pool.map(
+            _evaluate_local_batch, batches, [skip_deferred] * len(batches)
+        ):
+            results.extend(batch_result)
+        return results
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+class SocketExecutor(Executor):
+    def __init__(self, config: "Config", no_of_local_workers: int = 0):
+        """
+        Evaluates ants on workers which register over a socket, so they can
+        run on other machines. Local workers can be spawned which speak the
+        same protocol.
+        """
+        super().__init__(config)
+        self.address: tuple = config.EXECUTOR_ADDRESS
+        self.authkey: bytes = get_authkey()
+        self.no_of_local_workers: int = no_of_local_workers
+        self.local_workers: list[multiprocessing.Process] = []
+        self.workers: list[Connection] = []
+        self.workers_lock: threading.Lock = threading.Lock()
+        self.workers_registered: threading.Condition = threading.Condition(
+            self.workers_lock
+        )
+        self.listener: Listener or None = None
+        self.init_payload: tuple or None = None
+
+    def start(self, routing_graph_manager: "RoutingGraphManager") -> None:
+        self.init_payload = ("init", routing_graph_manager, self.config)
+        # Workers are authenticated in _register_worker, so that a stalled
+        # client can't hold up the accept loop
+        self.listener = Listener(self.address)
+        self.address = self.listener.address
+        threading.Thread(target=self._accept_workers, daemon=True).start()
+
+        for _ in range(self.no_of_local_workers):
+            process = multiprocessing.Process(
+                target=run_worker, args=(self.address, self.authkey), daemon=True
+            )
+            process.start()
+            self.local_workers.append(process)
+
+        min_workers = max(self.no_of_local_workers, self.config.MIN_REMOTE_WORKERS)
+        with self.workers_registered:
+            registered = self.workers_registered.wait_for(
+                lambda: len(self.workers) >= min_workers,
+                timeout=self.config.WORKER_REGISTRATION_TIMEOUT,
+            )
+        if not registered:
+            self.shutdown()
+            raise TimeoutError(
+                f"Only {len(self.workers)} of {min_workers} workers registered"
+            )
+
+    def _accept_workers(self) -> None:
+        """
+        Accepts connections, registering each worker in its own thread
+        """
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                # The listener has been closed
+                return
+            threading.Thread(
+                target=self._register_worker, args=(connection,), daemon=True
+            ).start()
+
+    def _register_worker(self, connection: Connection) -> None:
+        """
+        Authenticates a worker and sends it the static state once. Workers which
+        don't answer within WORKER_REGISTRATION_TIMEOUT are dropped.
+        """
+        timeout = self.config.WORKER_REGISTRATION_TIMEOUT
+        try:
+            deliver_challenge(connection, self.authkey)
+            answer_challenge(connection, self.authkey)
+            if not connection.poll(timeout) or connection.recv()[0] != "register":
+                connection.close()
+                return
+            connection.send(self.init_payload)
+            if not connection.poll(timeout) or connection.recv()[0] != "ready":
+                connection.close()
+                return
+        except (multiprocessing.AuthenticationError, EOFError, OSError):
+            connection.close()
+            return
+        with self.workers_registered:
+            self.workers.append(connection)
+            self.workers_registered.notify_all()
+
+    def evaluate(
+        self, index_paths: list["IndexPath"], skip_deferred: bool = False
+    ) -> list[EvaluationResult]:
+        results: list[EvaluationResult or None] = [None] * len(index_paths)
+        pending = list(range(len(index_paths)))
+
+        while pending:
+            with self.workers_lock:
+                workers = list(self.workers)
+            if not workers:
+                raise RuntimeError("No workers available to evaluate ants")
+
+            batches = split_into_batches(pending, len(workers))
+            in_flight = {}
+            pending = []
+            for worker, batch in zip(workers, batches):
+                try:
+                    worker.send(
+                        ("evaluate", [index_paths[i] for i in batch], skip_deferred)
+                    )
+                    in_flight[worker] = batch
+                except OSError:
+                    self._remove_worker(worker)
+                    pending.extend(batch)
+
+            errors = []
+            for worker, batch in in_flight.items():
+                try:
+                    status, batch_results = worker.recv()
+                except (EOFError, OSError):
+                    # Reassign the batch of a worker which has gone away
+                    self._remove_worker(worker)
+                    pending.extend(batch)
+                    continue
+                if status == "error":
+                    errors.append(batch_results)
+                    continue
+                for i, result in zip(batch, batch_results):
+                    results[i] = result
+            # Every worker's reply is read first, so none is left for the next
+            # batch
+            if errors:
+                raise RuntimeError(f"A worker failed to evaluate ants:\n{errors[0]}")
+
+        return results
+
+    def _remove_worker(self, worker: Connection) -> None:
+        with self.workers_lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+        worker.close()
+
+    def shutdown(self) -> None:
+        with self.workers_lock:
+            workers = list(self.workers)
+            self.workers = []
+        for worker in workers:
+            try:
+                worker.send(("shutdown",))
+            except OSError:
+                pass
+            worker.close()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        for process in self.local_workers:
+            process.join(timeout=5)
+        self.local_workers = []
+
+
+def get_authkey() -> bytes:
+    """
+    Gets the shared secret workers use to authenticate with the executor.
+    Payloads are pickled, so there is deliberately no default secret.
+    """
+    authkey = os.getenv("EXECUTOR_AUTHKEY")
+    if not authkey:
+        raise RuntimeError(
+            "EXECUTOR_AUTHKEY must be set to a shared secret to use socket workers"
+        )
+    return authkey.encode()
+
+
+def run_worker(address: tuple, authkey: bytes) -> None:
+    """
+    Registers with a SocketExecutor, caches the static state it sends and
+    evaluates batches of index paths until told to shut down
+    """
+    connection = Client(address, authkey=authkey)
+    connection.send(("register", socket.gethostname()))
+    routing_graph_manager, config = None, None
+
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == "init":
+                _, routing_graph_manager, config = message
+                connection.send(("ready",))
+            elif message[0] == "evaluate":
+                batch = message[1]
+                skip_deferred = message[2] if len(message) > 2 else False
+                # Failures are sent back to be raised by the executor, rather
+                # than leaving it waiting for a result
+                try:
+                    result = (
+                        "result",
+                        evaluate_batch(
+                            routing_graph_manager, config, batch, skip_deferred
+                        ),
+                    )
+                except Exception:
+                    result = ("error", traceback.format_exc())
+                connection.send(result)
+            elif message[0] == "shutdown":
+                break
+    except EOFError:
+        pass
+    finally:
+        connection.close()
+
+
+def create_executor(config: "Config") -> Executor:
+    """
+    Creates the executor backend chosen in the config
+    """
+    if config.EXECUTOR == "local":
+        return LocalExecutor(config)
+    elif config.EXECUTOR == "socket":
+        return SocketExecutor(config)
+    raise ValueError(f"Unknown executor: {config.EXECUTOR}")
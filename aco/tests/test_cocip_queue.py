@@ -0,0 +1,144 @@
+import time
+import unittest
+from ..cocip_queue import CocipQueue
+
+
+# Mocks are defined at module level so they can be pickled to the workers
+class MockRoutingGraphManager:
+    def __init__(self):
+        self.performance_model = None
+
+
+class MockObjective:
+    def __init__(self, performance_model, config):
+        self.name = "time"
+        self.deferred = False
+
+    def __str__(self):
+        return self.name
+
+
+class MockDeferredObjective(MockObjective):
+    def __init__(self, performance_model, config):
+        self.name = "cocip"
+        self.deferred = True
+
+    def _run_objective_function(self, flight_path):
+        if flight_path[0].get("fail"):
+            raise ValueError("CoCiP failed")
+        time.sleep(flight_path[0]["delay"])
+        return len(flight_path)
+
+
+class MockConfig:
+    OBJECTIVES = [MockDeferredObjective, MockObjective]
+    COCIP_WORKERS = 2
+    COCIP_BUDGET = 2
+    COCIP_BACKLOG = 4
+    COCIP_TIMEOUT = 30
+
+
+class MockFlight:
+    def __init__(self, objectives, delay=0):
+        self.objectives = objectives
+        self.flight_path = [{"delay": delay}] * 3
+
+
+class TestCocipQueue(unittest.TestCase):
+    def setUp(self):
+        self.config = MockConfig()
+        self.queue = CocipQueue(self.config, ["cocip"])
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_prioritise(self):
+        archive = [MockFlight({"co2": 2, "time": 2, "cocip": 0})]
+        dominated = MockFlight({"co2": 3, "time": 3})
+        best_co2 = MockFlight({"co2": 1, "time": 4})
+        best_time = MockFlight({"co2": 4, "time": 1})
+        balanced = MockFlight({"co2": 2, "time": 1.5})
+
+        order = self.queue.prioritise(
+            [dominated, best_co2, best_time, balanced], archive
+        )
+        # Solutions dominated by the archive go last, then the summed ranks
+        # break ties
+        self.assertIs(order[0], balanced)
+        self.assertIs(order[-1], dominated)
+
+    def test_submit_within_budget(self):
+        solutions = [MockFlight({"time": i}) for i in range(4)]
+        self.queue.start(MockRoutingGraphManager())
+        self.queue.submit(solutions, [])
+        self.assertEqual(len(self.queue.running), 2)
+
+        arrived = self.queue.collect(block=True)
+        self.assertEqual(
+            {id(solution) for solution in arrived}, {id(s) for s in solutions[:2]}
+        )
+        for solution in arrived:
+            self.assertEqual(solution.objectives["cocip"], 3)
+        self.assertNotIn("cocip", solutions[3].objectives)
+        self.assertEqual(self.queue.running, {})
+
+    def test_backlog(self):
+        self.queue.workers = 1
+        self.queue.max_backlog = 2
+        self.queue.start(MockRoutingGraphManager())
+        first = [MockFlight({"time": i}, delay=0.2) for i in range(2)]
+        self.queue.submit(first, [])
+        # Only one evaluation is dispatched per worker, the rest wait
+        self.assertEqual(len(self.queue.running), 1)
+        self.assertEqual(len(self.queue.backlog), 1)
+
+        # The backlog is re-prioritised against the archive, so a waiting
+        # solution which is now dominated falls behind new ones, and the least
+        # promising beyond the bound are dropped
+        second = [MockFlight({"time": 0.5}), MockFlight({"time": 0.6})]
+        self.queue.submit(second, [MockFlight({"time": 0.7})])
+        self.assertEqual([entry[-1] for entry in sorted(self.queue.backlog)], second)
+        self.assertEqual(self.queue.no_of_dropped, 1)
+
+        arrived = self.queue.collect(block=True)
+        self.assertEqual(
+            [id(solution) for solution in arrived],
+            [id(first[0]), id(second[0]), id(second[1])],
+        )
+        self.assertEqual(self.queue.backlog, [])
+
+    def test_timeout_from_dispatch(self):
+        # Evaluations waiting for a worker aren't timed until they're dispatched
+        self.queue.workers = 1
+        self.queue.timeout = 1.5
+        solutions = [MockFlight({"time": i}, delay=1) for i in range(2)]
+        self.queue.start(MockRoutingGraphManager())
+        self.queue.submit(solutions, [])
+
+        self.assertEqual(len(self.queue.collect(block=True)), 2)
+        self.assertEqual(self.queue.no_of_timeouts, 0)
+
+    def test_timeout(self):
+        self.queue.timeout = 0.1
+        solution = MockFlight({"time": 1}, delay=2)
+        self.queue.start(MockRoutingGraphManager())
+        self.queue.submit([solution], [])
+
+        self.assertEqual(self.queue.collect(), [])
+        self.assertEqual(self.queue.collect(block=True), [])
+        self.assertEqual(self.queue.no_of_timeouts, 1)
+        self.assertNotIn("cocip", solution.objectives)
+
+    def test_failure(self):
+        # Failed evaluations are retried once, then dropped
+        failing = MockFlight({"time": 1})
+        failing.flight_path = [{"delay": 0, "fail": True}] * 3
+        solution = MockFlight({"time": 2})
+        self.queue.start(MockRoutingGraphManager())
+        self.queue.submit([failing, solution], [])
+
+        arrived = self.queue.collect(block=True)
+        self.assertEqual([id(solution) for solution in arrived], [id(solution)])
+        self.assertEqual(self.queue.no_of_failures, 2)
+        self.assertEqual(self.queue.no_of_dropped, 1)
+        self.assertNotIn("cocip", failing.objectives)
@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import socket
+import unittest
+from unittest import mock
+from ..executor import (
+    Executor,
+    LocalExecutor,
+    SocketExecutor,
+    evaluate_index_path,
+    run_worker,
+    split_into_batches,
+    get_authkey,
+)
+from utils.testing import MockConfig, MockRoutingGraphManager, MockLateralObjective
+
+
+# Mocks are defined at module level so they can be pickled to the workers
+class MockDeferredObjective(MockLateralObjective):
+    def __init__(self, performance_model, config):
+        super().__init__(performance_model, config)
+        self.name = "deferred"
+        self.deferred = True
+
+    def _run_objective_function(self, flight_path):
+        return len(flight_path)
+
+
+class MockFailingObjective(MockLateralObjective):
+    def _run_objective_function(self, flight_path):
+        raise ValueError("objective failed")
+
+
+class MockExecutorConfig(MockConfig):
+    OBJECTIVES = [MockLateralObjective]
+    NO_OF_WORKERS = 2
+    EXECUTOR_ADDRESS = ("localhost", 0)
+    MIN_REMOTE_WORKERS = 0
+    WORKER_REGISTRATION_TIMEOUT = 30
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self):
+        self.routing_graph_manager = MockRoutingGraphManager()
+        self.config = MockExecutorConfig()
+        self.index_paths = [[(0, 0, 0), (1, i, 0), (2, i + 1, 0)] for i in range(5)]
+
+    def test_split_into_batches(self):
+        batches = split_into_batches(list(range(5)), 2)
+        self.assertEqual(batches, [[0, 1, 2], [3, 4]])
+        self.assertEqual(split_into_batches([], 2), [])
+
+    def test_evaluate_index_path(self):
+        flight_path, objectives = evaluate_index_path(
+            self.routing_graph_manager, self.config, self.index_paths[1]
+        )
+        self.assertEqual(len(flight_path), 3)
+        self.assertEqual(flight_path[0]["aircraft_mass"], 100000)
+        self.assertEqual(objectives, {"lateral": 3})
+
+    def test_local_executor(self):
+        with LocalExecutor(self.config) as executor:
+            executor.start(self.routing_graph_manager)
+            results = executor.evaluate(self.index_paths)
+        # Assert results are returned in the order of the index paths
+        objectives = [objectives["lateral"] for _, objectives in results]
+        self.assertEqual(objectives, [1, 3, 5, 7, 9])
+
+    def test_skip_deferred(self):
+        self.config.OBJECTIVES = [MockLateralObjective, MockDeferredObjective]
+        with LocalExecutor(self.config) as executor:
+            executor.start(self.routing_graph_manager)
+            results = executor.evaluate(self.index_paths, skip_deferred=True)
+            all_results = executor.evaluate(self.index_paths)
+        self.assertEqual(results[0][1], {"lateral": 1})
+        self.assertEqual(all_results[0][1], {"lateral": 1, "deferred": 3})
+
+    @mock.patch.dict(os.environ, {"EXECUTOR_AUTHKEY": "test-secret"})
+    def test_socket_executor(self):
+        with SocketExecutor(self.config, no_of_local_workers=2) as executor:
+            executor.start(self.routing_graph_manager)
+            self.assertEqual(len(executor.workers), 2)
+            first_results = executor.evaluate(self.index_paths)
+            # Workers keep their cached state between batches
+            second_results = executor.evaluate(self.index_paths[:2])
+        objectives = [objectives["lateral"] for _, objectives in first_results]
+        self.assertEqual(objectives, [1, 3, 5, 7, 9])
+        self.assertEqual(len(second_results), 2)
+        self.assertEqual(len(second_results[1][0]), 3)
+
+    @mock.patch.dict(os.environ, {"EXECUTOR_AUTHKEY": "test-secret"})
+    def test_socket_worker_error(self):
+        self.config.OBJECTIVES = [MockFailingObjective]
+        with SocketExecutor(self.config, no_of_local_workers=1) as executor:
+            executor.start(self.routing_graph_manager)
+            with self.assertRaisesRegex(RuntimeError, "objective failed"):
+                executor.evaluate(self.index_paths)
+            # The worker survives the failure
+            self.assertEqual(len(executor.workers), 1)
+
+    @mock.patch.dict(os.environ, {"EXECUTOR_AUTHKEY": "test-secret"})
+    def test_stalled_client(self):
+        # A client which connects but never authenticates doesn't stop workers
+        # from registering
+        with SocketExecutor(self.config) as executor:
+            executor.start(self.routing_graph_manager)
+            stalled = socket.create_connection(executor.address)
+            worker = multiprocessing.Process(
+                target=run_worker, args=(executor.address, executor.authkey)
+            )
+            worker.start()
+            executor.local_workers.append(worker)
+            with executor.workers_registered:
+                registered = executor.workers_registered.wait_for(
+                    lambda: len(executor.workers) == 1, timeout=10
+                )
+            stalled.close()
+        self.assertTrue(registered)
+
+    @mock.patch.dict(os.environ, {}, clear=True)
+    def test_authkey_required(self):
+        with self.assertRaises(RuntimeError):
+            get_authkey()
+
+    def test_abstract_executor(self):
+        class IncompleteExecutor(Executor):
+            def start(self, routing_graph_manager):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteExecutor(self.config)
@@ -0,0 +1,18 @@
+import warnings
+import typer
+from dotenv import load_dotenv
+
+from .executor import run_worker, get_authkey
+
+
+def main(host: str, port: int):
+    """
+    Connects to a SocketExecutor and evaluates ants until it shuts down
+    """
+    run_worker((host, port), get_authkey())
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    warnings.filterwarnings("ignore")
+    typer.run(main)
@@ -0,0 +1 @@
+from .baseline import BaselineSolver
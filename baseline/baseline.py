@@ -0,0 +1,100 @@
+from aco.executor import evaluate_batch
+from performance_model import Flight
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from config import Config
+    from routing_graph import RoutingGraphManager, RoutingGraph
+    from _types import IndexPath, IndexPoint3D, Objectives
+
+
+class BaselineSolver:
+    def __init__(self, routing_graph_manager: "RoutingGraphManager", config: "Config"):
+        """
+        Deterministic single-objective solver, which finds the path with the
+        lowest total heuristic cost for each objective by dynamic programming
+        over the layers of the routing graph
+        """
+        self.routing_graph_manager: "RoutingGraphManager" = routing_graph_manager
+        self.routing_graph: "RoutingGraph" = routing_graph_manager.get_routing_graph()
+        self.config: "Config" = config
+
+        self.objectives: list[str] = [
+            str(objective(self.routing_graph_manager.performance_model, self.config))
+            for objective in config.OBJECTIVES
+        ]
+
+    def find_path(self, objective: str) -> "IndexPath":
+        """
+        Finds the index path with the lowest total heuristic cost for an objective
+        """
+        departure = (0, self.config.GRID_WIDTH, self.config.STARTING_ALTITUDE)
+        key = f"{objective}_heuristic"
+        nodes = self.routing_graph.nodes
+        if departure not in nodes:
+            raise ValueError(f"The departure {departure} is not in the routing graph")
+
+        costs: dict["IndexPoint3D", float] = {departure: -nodes[departure][key]}
+        predecessors: dict["IndexPoint3D", "IndexPoint3D"] = {}
+        layer = [departure]
+        destinations = []
+        while layer:
+            next_layer = {}
+            for node in layer:
+                neighbours = self.routing_graph[node]
+                if not neighbours:
+                    destinations.append(node)
+                    continue
+                for neighbour in neighbours:
+                    cost = costs[node] - nodes[neighbour][key]
+                    if neighbour not in costs or cost < costs[neighbour]:
+                        costs[neighbour] = cost
+                        predecessors[neighbour] = node
+                    next_layer[neighbour] = None
+            layer = list(next_layer)
+
+        # Paths can dead-end early, so only destinations in the last layer count
+        last_layer = max(destination[0] for destination in destinations)
+        if last_layer == 0:
+            raise ValueError(
+                f"No path leaves the departure {departure} for the {objective} objective"
+            )
+        destinations = [d for d in destinations if d[0] == last_layer]
+        node = min(destinations, key=costs.get)
+        path = [node]
+        while node in predecessors:
+            node = predecessors[node]
+            path.append(node)
+
+        return path[::-1]
+
+    def solve(self) -> dict[str, Flight]:
+        """
+        Finds and evaluates the optimal path for each objective
+        """
+        paths = [self.find_path(objective) for objective in self.objectives]
+        results = evaluate_batch(self.routing_graph_manager, self.config, paths)
+
+        solutions = {}
+        for objective, indices, (flight_path, objectives) in zip(
+            self.objectives, paths, results
+        ):
+            solution = Flight(self.routing_graph_manager, flight_path, self.config)
+            solution.indices = indices
+            solution.objectives = objectives
+            solutions[objective] = solution
+
+        return solutions
+
+    def get_ideal_point(self, solutions: dict[str, Flight]) -> "Objectives":
+        """
+        Gets the lowest value of each objective over the single-objective
+        solutions, which anchors the pareto front when normalising
+        """
+        return {
+            objective: min(
+                solution.objectives[objective] for solution in solutions.values()
+            )
+            for objective in self.objectives
+        }
@@ -0,0 +1,41 @@
+import unittest
+from ..baseline import BaselineSolver
+import networkx as nx
+from utils.testing import MockConfig, MockRoutingGraphManager, create_lattice_graph
+
+
+class TestBaselineSolver(unittest.TestCase):
+    def setUp(self):
+        routing_graph_manager = MockRoutingGraphManager(create_lattice_graph())
+        self.solver = BaselineSolver(routing_graph_manager, MockConfig())
+
+    def test_find_path(self):
+        # Move to the lowest lateral index as fast as the graph allows
+        self.assertEqual(
+            self.solver.find_path("lateral"),
+            [(0, 2, 0), (1, 1, 0), (2, 0, 0), (3, 0, 0)],
+        )
+        self.assertEqual(
+            self.solver.find_path("centre"),
+            [(0, 2, 0), (1, 2, 0), (2, 2, 0), (3, 2, 0)],
+        )
+
+    def test_solve(self):
+        solutions = self.solver.solve()
+        self.assertEqual(set(solutions), {"lateral", "centre"})
+        self.assertEqual(solutions["lateral"].objectives["lateral"], 3)
+        self.assertEqual(solutions["centre"].objectives["centre"], 0)
+        self.assertEqual(
+            self.solver.get_ideal_point(solutions), {"lateral": 3, "centre": 0}
+        )
+
+    def test_find_path_without_destination(self):
+        graph = nx.DiGraph()
+        graph.add_node((0, 2, 0), lateral_heuristic=0, centre_heuristic=0)
+        solver = BaselineSolver(MockRoutingGraphManager(graph), MockConfig())
+        with self.assertRaises(ValueError):
+            solver.find_path("lateral")
+
+        solver = BaselineSolver(MockRoutingGraphManager(nx.DiGraph()), MockConfig())
+        with self.assertRaises(ValueError):
+            solver.find_path("lateral")
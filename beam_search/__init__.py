@@ -0,0 +1 @@
+from .beam_search import BeamSearch
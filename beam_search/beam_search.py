@@ -0,0 +1,194 @@
+import numpy as np
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+from pymoo.operators.survival.rank_and_crowding.metrics import calc_crowding_distance
+
+from aco.executor import evaluate_batch
+from performance_model import Flight
+from routing_graph import RoutingGraph, ArrayGraph
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from config import Config
+    from routing_graph import RoutingGraphManager
+    from _types import IndexPath, IndexPoint3D, Objectives
+
+
+class BeamSearch:
+    def __init__(self, routing_graph_manager: "RoutingGraphManager", config: "Config"):
+        """
+        Multi-objective beam search over the layered routing graph, which keeps
+        the best BEAM_WIDTH partial paths at every layer so its latency is
+        bounded by the beam width
+        """
+        self.routing_graph_manager: "RoutingGraphManager" = routing_graph_manager
+        self.routing_graph: "RoutingGraph" = routing_graph_manager.get_routing_graph()
+        self.config: "Config" = config
+        self.beam_width: int = config.BEAM_WIDTH
+
+        self.objectives: list[str] = [
+            str(objective(self.routing_graph_manager.performance_model, self.config))
+            for objective in config.OBJECTIVES
+        ]
+        self.objectives_over_time: list["Objectives"] = []
+        self.node_costs: dict["IndexPoint3D", np.ndarray] = {}
+
+        graph = self.routing_graph
+        if isinstance(graph, RoutingGraph):
+            graph = graph.routing_graph
+        self.array_graph: ArrayGraph or None = (
+            graph if isinstance(graph, ArrayGraph) else None
+        )
+        self.costs_to_go: dict["IndexPoint3D", np.ndarray] = {}
+        self.array_costs_to_go: np.ndarray or None = None
+
+    def get_node_cost(self, node: "IndexPoint3D") -> np.ndarray:
+        """
+        Gets the cost of visiting a node for each objective, from its heuristics
+        """
+        if node not in self.node_costs:
+            heuristics = self.routing_graph.nodes[node]
+            self.node_costs[node] = np.array(
+                [-heuristics[f"{objective}_heuristic"] for objective in self.objectives]
+            )
+        return self.node_costs[node]
+
+    def calculate_costs_to_go(self) -> np.ndarray:
+        """
+        Estimates the cost from every node of an array-backed graph to the
+        destination, layer by layer from the last, as the cheapest successor
+        cost plus its cost to go in each objective
+        """
+        graph = self.array_graph
+        node_costs = -np.column_stack(
+            [
+                np.asarray(graph.arrays[f"{objective}_heuristic"], dtype=float)
+                for objective in self.objectives
+            ]
+        )
+        costs_to_go = np.zeros_like(node_costs)
+
+        # Group the edges by the layer of their source, keeping the CSR order
+        # so the edges of each source stay contiguous
+        edge_sources = graph.get_edge_sources()
+        edge_layers = graph.arrays["nodes"][edge_sources, 0]
+        order = np.argsort(edge_layers, kind="stable")
+        layers, layer_starts = np.unique(edge_layers[order], return_index=True)
+        layer_ends = np.append(layer_starts[1:], len(order))
+
+        for start, end in reversed(list(zip(layer_starts, layer_ends))):
+            edges = order[start:end]
+            sources = edge_sources[edges]
+            targets = graph.indices[edges]
+            source_starts = np.flatnonzero(np.diff(sources, prepend=-1))
+            costs_to_go[sources[source_starts]] = np.minimum.reduceat(
+                node_costs[targets] + costs_to_go[targets], source_starts, axis=0
+            )
+        return costs_to_go
+
+    def get_cost_to_go(self, node: "IndexPoint3D") -> np.ndarray:
+        """
+        Gets the estimated cost from a node to the destination. Graphs without
+        arrays are only expanded from the nodes the beam reaches.
+        """
+        if self.array_graph is not None:
+            if self.array_costs_to_go is None:
+                self.array_costs_to_go = self.calculate_costs_to_go()
+            return self.array_costs_to_go[self.array_graph.node_ids[node]]
+
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if current in self.costs_to_go:
+                stack.pop()
+                continue
+            successors = list(self.routing_graph[current])
+            pending = [n for n in successors if n not in self.costs_to_go]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if successors:
+                self.costs_to_go[current] = np.min(
+                    [self.get_node_cost(n) + self.costs_to_go[n] for n in successors],
+                    axis=0,
+                )
+            else:
+                self.costs_to_go[current] = np.zeros(len(self.objectives))
+        return self.costs_to_go[node]
+
+    def select(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Selects the best candidates by non-dominated sorting, breaking ties in
+        the last front by crowding distance
+        """
+        if len(scores) <= self.beam_width:
+            return np.arange(len(scores))
+
+        selected = []
+        for front in NonDominatedSorting().do(scores):
+            remaining = self.beam_width - len(selected)
+            if len(front) <= remaining:
+                selected.extend(front)
+            else:
+                crowding = calc_crowding_distance(scores[front])
+                selected.extend(front[np.argsort(-crowding, kind="stable")[:remaining]])
+            if len(selected) == self.beam_width:
+                break
+        return np.array(selected)
+
+    def run_beam_search(self) -> list[Flight]:
+        """
+        Runs the beam search and generates a pareto front of solutions
+        """
+        departure = (0, self.config.GRID_WIDTH, self.config.STARTING_ALTITUDE)
+        paths: list["IndexPath"] = [[departure]]
+        path_costs = self.get_node_cost(departure)[np.newaxis, :]
+
+        while True:
+            # Expand every path in the beam by all of its successors
+            parents, nodes = [], []
+            for i, path in enumerate(paths):
+                for node in self.routing_graph[path[-1]]:
+                    parents.append(i)
+                    nodes.append(node)
+            if not nodes:
+                break
+
+            parents = np.array(parents)
+            node_costs = np.array([self.get_node_cost(node) for node in nodes])
+            partial_costs = path_costs[parents] + node_costs
+            estimates = np.array([self.get_cost_to_go(node) for node in nodes])
+
+            keep = self.select(partial_costs + estimates)
+            paths = [paths[parents[k]] + [nodes[k]] for k in keep]
+            path_costs = partial_costs[keep]
+
+        return self.evaluate_beam(paths)
+
+    def evaluate_beam(self, paths: list["IndexPath"]) -> list[Flight]:
+        """
+        Runs the performance model on the final beam, keeping the non-dominated
+        flights
+        """
+        results = evaluate_batch(self.routing_graph_manager, self.config, paths)
+        solutions = []
+        for indices, (flight_path, objectives) in zip(paths, results):
+            solution = Flight(self.routing_graph_manager, flight_path, self.config)
+            solution.indices = indices
+            solution.objectives = objectives
+            solutions.append(solution)
+
+        objective_values = np.array(
+            [
+                [solution.objectives[objective] for objective in self.objectives]
+                for solution in solutions
+            ]
+        )
+        pareto_front = NonDominatedSorting().do(
+            objective_values, only_non_dominated_front=True
+        )
+        self.objectives_over_time.append(
+            dict(zip(self.objectives, objective_values.min(axis=0)))
+        )
+        return [solutions[i] for i in pareto_front]
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import networkx as nx
+from ..beam_search import BeamSearch
+from routing_graph import ArrayGraph
+from utils.testing import MockConfig, MockRoutingGraphManager, create_lattice_graph
+
+
+class MockBeamConfig(MockConfig):
+    BEAM_WIDTH = 3
+
+
+class TestBeamSearch(unittest.TestCase):
+    def setUp(self):
+        self.graph = create_lattice_graph()
+        self.beam_search = BeamSearch(
+            MockRoutingGraphManager(self.graph), MockBeamConfig()
+        )
+
+    def test_get_cost_to_go(self):
+        np.testing.assert_array_equal(
+            self.beam_search.get_cost_to_go((3, 0, 0)), [0, 0]
+        )
+        np.testing.assert_array_equal(
+            self.beam_search.get_cost_to_go((2, 0, 0)), [0, 1]
+        )
+        np.testing.assert_array_equal(
+            self.beam_search.get_cost_to_go((0, 2, 0)), [1, 0]
+        )
+
+    def test_calculate_costs_to_go(self):
+        nodes = list(self.graph.nodes)
+        node_ids = {node: i for i, node in enumerate(nodes)}
+        arrays = {
+            "nodes": np.array(nodes),
+            "indptr": np.cumsum([0] + [len(self.graph[node]) for node in nodes]),
+            "indices": np.array(
+                [node_ids[v] for node in nodes for v in self.graph[node]]
+            ),
+            "lateral_heuristic": np.array(
+                [self.graph.nodes[node]["lateral_heuristic"] for node in nodes]
+            ),
+            "centre_heuristic": np.array(
+                [self.graph.nodes[node]["centre_heuristic"] for node in nodes]
+            ),
+        }
+        beam_search = BeamSearch(
+            MockRoutingGraphManager(ArrayGraph(arrays)), MockBeamConfig()
+        )
+        costs_to_go = beam_search.calculate_costs_to_go()
+        for node in nodes:
+            np.testing.assert_array_equal(
+                costs_to_go[node_ids[node]], self.beam_search.get_cost_to_go(node)
+            )
+        self.assertEqual(
+            [solution.indices for solution in beam_search.run_beam_search()],
+            [solution.indices for solution in self.beam_search.run_beam_search()],
+        )
+
+    def test_select(self):
+        scores = np.array([[1, 4], [4, 1], [2, 2], [3, 3], [5, 5]])
+        selected = self.beam_search.select(scores)
+        self.assertEqual(sorted(selected), [0, 1, 2])
+
+    def test_run_beam_search(self):
+        pareto_set = self.beam_search.run_beam_search()
+        self.assertTrue(0 < len(pareto_set) <= 3)
+        for solution in pareto_set:
+            self.assertEqual(len(solution.indices), 4)
+            for u, v in nx.utils.pairwise(solution.indices):
+                self.assertTrue(self.graph.has_edge(u, v))
+        # The path straight down the centre is optimal for the centre objective
+        self.assertIn(0, [solution.objectives["centre"] for solution in pareto_set])
@@ -0,0 +1,7 @@
+from .cache import (
+    Cache,
+    ROUTING_GRID_FIELDS,
+    ALTITUDE_GRID_FIELDS,
+    WEATHER_FIELDS,
+    COCIP_WEATHER_FIELDS,
+)
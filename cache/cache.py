@@ -0,0 +1,264 @@
+import contextlib
+import fcntl
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    from config import Config
+
+# Config fields which shape the routing grid and everything derived from it
+ROUTING_GRID_FIELDS = [
+    "DEPARTURE_AIRPORT",
+    "DESTINATION_AIRPORT",
+    "NO_OF_POINTS",
+    "GRID_WIDTH",
+    "GRID_SPACING",
+    "OFFSET_VAR",
+    "R",
+]
+ALTITUDE_GRID_FIELDS = ROUTING_GRID_FIELDS + [
+    "STARTING_ALTITUDE",
+    "ALTITUDE_STEP",
+    "MAX_ALTITUDE",
+    "MAX_ALTITUDE_VAR",
+]
+WEATHER_FIELDS = ["DEPARTURE_DATE", "WEATHER_BOUND"]
+COCIP_WEATHER_FIELDS = [
+    "WEATHER_MARGIN",
+    "COCIP_MAX_AGE",
+    "COCIP_WIND_SPEED",
+    "COCIP_PRESSURE_LEVELS",
+]
+
+# Bumped whenever artefacts change for the same config, to invalidate old ones
+CACHE_VERSION = 3
+
+# Most entries one store may evict, which bounds the work done under the lock
+ENTRY_EVICTION_BATCH = 64
+
+
+class Cache:
+    def __init__(self, config: "Config"):
+        """
+        Content-addressed cache for derived artefacts, keyed by a hash of the
+        config fields and upstream artefacts which produced them
+        """
+        self.config: "Config" = config
+        self.directory: str = config.CACHE_DIRECTORY
+        self.max_size: int = config.CACHE_MAX_SIZE
+        self.manifest_path: str = os.path.join(self.directory, "manifest.json")
+        self.lock_path: str = os.path.join(self.directory, "manifest.lock")
+        self.hits: int = 0
+        self.misses: int = 0
+        # Artefacts this run has looked up may be open or memory-mapped, so
+        # are never evicted by it
+        self.pinned: set[str] = set()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_key(
+        self, name: str, fields: list[str], upstream: list[str] or None = None
+    ) -> str:
+        """
+        Hashes the config fields and upstream keys an artefact depends on
+        """
+        content = {
+            "version": CACHE_VERSION,
+            "name": name,
+            "fields": {field: repr(getattr(self.config, field)) for field in fields},
+            "upstream": upstream or [],
+        }
+        return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]
+
+    def get_path(self, name: str, key: str, extension: str = "") -> str:
+        return os.path.join(self.directory, f"{name}-{key}{extension}")
+
+    def lookup(self, name: str, key: str, extension: str = "") -> tuple[str, bool]:
+        """
+        Gets the path of an artefact and whether it is already cached
+        """
+        path = self.get_path(name, key, extension)
+        self.pinned.add(path)
+        with self._lock_manifest():
+            manifest = self._load_manifest()
+            cached = path in manifest and os.path.exists(path)
+            if cached:
+                manifest[path]["last_access"] = time.time()
+                self._save_manifest(manifest)
+        self._count(cached)
+        return path, cached
+
+    def store(self, path: str) -> None:
+        """
+        Records a newly written artefact, then evicts the least recently used
+        artefacts until the cache fits in CACHE_MAX_SIZE. Artefacts in use by
+        this run are kept even if the cache stays over its size.
+        """
+        self.pinned.add(path)
+        with self._lock_manifest():
+            manifest = self._load_manifest()
+            manifest[path] = {
+                "size": self._get_size(path),
+                "created": time.time(),
+                "last_access": time.time(),
+            }
+            self._evict(manifest)
+            self._save_manifest(manifest)
+
+    def lookup_entry(self, name: str, key: str) -> tuple[str, bool]:
+        """
+        Gets the path of a small artefact which is kept with many others of the
+        same name, such as a CoCiP result, and whether it is already cached.
+        Entries must be written atomically, so that one which exists is
+        complete. The manifest isn't read; a hit is a path which exists, and
+        its modification time records its last access.
+        """
+        directory = self.get_path(name, "entries")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, key)
+        self.pinned.update([directory, path])
+        cached = os.path.exists(path)
+        if cached:
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(path)
+        self._count(cached)
+        return path, cached
+
+    def store_entry(self, path: str) -> None:
+        """
+        Records a newly written entry by adding its size to its directory's,
+        then evicts as store does. If the cache is still too big, the least
+        recently used entries not in use by this run are evicted.
+        """
+        directory = os.path.dirname(path)
+        self.pinned.update([directory, path])
+        with self._lock_manifest():
+            manifest = self._load_manifest()
+            if directory in manifest:
+                entry = manifest[directory]
+                entry["size"] += self._get_size(path)
+            else:
+                entry = manifest[directory] = {
+                    "size": self._get_size(directory),
+                    "created": time.time(),
+                }
+            entry["last_access"] = time.time()
+            if self._evict(manifest) > self.max_size:
+                self._evict_entries(manifest)
+            self._save_manifest(manifest)
+
+    def report(self) -> str:
+        """
+        Summarises the hits, misses and size of the cache
+        """
+        size = sum(entry["size"] for entry in self._load_manifest().values())
+        return (
+            f"Cache: {self.hits} hits, {self.misses} misses, "
+            f"{size / 1024**2:.1f} MB used"
+        )
+
+    def _count(self, cached: bool) -> None:
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _evict(self, manifest: dict) -> int:
+        """
+        Evicts the least recently used artefacts not in use by this run until
+        the cache fits in CACHE_MAX_SIZE, and gets its size
+        """
+        total_size = sum(entry["size"] for entry in manifest.values())
+        by_last_access = sorted(manifest, key=lambda p: manifest[p]["last_access"])
+        for old_path in by_last_access:
+            if total_size <= self.max_size:
+                break
+            if old_path in self.pinned:
+                continue
+            total_size -= manifest.pop(old_path)["size"]
+            self._remove(old_path)
+        return total_size
+
+    def _evict_entries(self, manifest: dict) -> None:
+        """
+        Re-measures the entry directories in use by this run, then evicts up to
+        ENTRY_EVICTION_BATCH of their least recently used entries, by their
+        modification times, until the cache fits
+        """
+        entries = []
+        for directory, entry in manifest.items():
+            if directory not in self.pinned or not directory.endswith("-entries"):
+                continue
+            entry["size"] = 0
+            with os.scandir(directory) as dir_entries:
+                for dir_entry in dir_entries:
+                    if dir_entry.name.endswith(".tmp"):
+                        continue
+                    # Other processes may remove entries as they're measured
+                    try:
+                        stat = dir_entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entry["size"] += stat.st_size
+                    if dir_entry.path not in self.pinned:
+                        entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+
+        total_size = sum(entry["size"] for entry in manifest.values())
+        for _, size, path in heapq.nsmallest(ENTRY_EVICTION_BATCH, entries):
+            if total_size <= self.max_size:
+                break
+            manifest[os.path.dirname(path)]["size"] -= size
+            total_size -= size
+            self._remove(path)
+
+    @contextlib.contextmanager
+    def _lock_manifest(self) -> typing.Iterator[None]:
+        """
+        Holds an exclusive lock on the manifest, so that processes sharing the
+        cache don't overwrite each other's changes
+        """
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r") as f:
+            manifest = json.load(f)
+        # Drop entries whose files have been deleted by hand
+        return {path: entry for path, entry in manifest.items() if os.path.exists(path)}
+
+    def _save_manifest(self, manifest: dict) -> None:
+        # Only the holder of the lock saves, but a crash mustn't leave a
+        # partly written manifest
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _get_size(self, path: str) -> int:
+        if os.path.isdir(path):
+            return sum(
+                self._get_size(os.path.join(root, filename))
+                for root, _, filenames in os.walk(path)
+                for filename in filenames
+            )
+        # Other processes may move or remove files as they're measured
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _remove(self, path: str) -> None:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
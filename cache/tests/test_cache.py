@@ -0,0 +1,159 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ..cache import Cache
+
+
+def store_many(config, name, count):
+    cache = Cache(config)
+    for i in range(count):
+        path = cache.lookup(name, str(i), ".bin")[0]
+        with open(path, "wb") as f:
+            f.write(b"0")
+        cache.store(path)
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        class MockConfig:
+            CACHE_DIRECTORY = self.directory.name
+            CACHE_MAX_SIZE = 100
+            GRID_WIDTH = 10
+            NO_OF_POINTS = 20
+
+        self.MockConfig = MockConfig
+        self.mock_config = MockConfig()
+        self.cache = Cache(self.mock_config)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, key, size):
+        path, cached = self.cache.lookup(name, key, ".bin")
+        with open(path, "wb") as f:
+            f.write(b"0" * size)
+        self.cache.store(path)
+        return path
+
+    def test_get_key(self):
+        key = self.cache.get_key("grid", ["GRID_WIDTH"])
+        self.assertEqual(key, self.cache.get_key("grid", ["GRID_WIDTH"]))
+        self.assertNotEqual(key, self.cache.get_key("grid", ["NO_OF_POINTS"]))
+        self.assertNotEqual(key, self.cache.get_key("other", ["GRID_WIDTH"]))
+        self.assertNotEqual(
+            key, self.cache.get_key("grid", ["GRID_WIDTH"], upstream=["abc"])
+        )
+
+        self.mock_config.GRID_WIDTH = 11
+        self.assertNotEqual(key, self.cache.get_key("grid", ["GRID_WIDTH"]))
+
+    def test_lookup(self):
+        path, cached = self.cache.lookup("grid", "abc", ".bin")
+        self.assertFalse(cached)
+        self.write("grid", "abc", 10)
+
+        self.assertEqual(self.cache.lookup("grid", "abc", ".bin"), (path, True))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+        # Files deleted outside the cache are misses
+        os.remove(path)
+        self.assertFalse(self.cache.lookup("grid", "abc", ".bin")[1])
+
+    def test_eviction(self):
+        first = self.write("grid", "a", 40)
+        second = self.write("grid", "b", 40)
+        # A later run touching the first artefact makes the second the least
+        # recently used
+        self.cache = Cache(self.mock_config)
+        self.cache.lookup("grid", "a", ".bin")
+        third = self.write("grid", "c", 40)
+
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(third))
+
+    def test_pinned_not_evicted(self):
+        first = self.write("grid", "a", 60)
+        # Another run which hasn't used the first artefact may evict it
+        other_cache = Cache(self.mock_config)
+        second = other_cache.lookup("grid", "b", ".bin")[0]
+        with open(second, "wb") as f:
+            f.write(b"0" * 60)
+
+        self.cache.store(second)
+        self.assertTrue(os.path.exists(first))
+        other_cache.store(second)
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+    def write_entry(self, cache, key, size):
+        path, cached = cache.lookup_entry("cocip", key)
+        with open(path, "wb") as f:
+            f.write(b"0" * size)
+        cache.store_entry(path)
+        return path
+
+    def test_entries(self):
+        path = self.write_entry(self.cache, "a", 10)
+        manifest_mtime = os.stat(self.cache.manifest_path).st_mtime_ns
+        os.utime(path, (0, 0))
+
+        # Hits don't rewrite the manifest, but record their access on the entry
+        self.assertEqual(self.cache.lookup_entry("cocip", "a"), (path, True))
+        self.assertEqual(os.stat(self.cache.manifest_path).st_mtime_ns, manifest_mtime)
+        self.assertGreater(os.stat(path).st_mtime, 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        with open(self.cache.manifest_path) as f:
+            self.assertEqual(json.load(f)[os.path.dirname(path)]["size"], 10)
+
+    def test_entry_eviction(self):
+        first = self.write_entry(self.cache, "a", 40)
+        second = self.write_entry(self.cache, "b", 40)
+        os.utime(first, (0, 0))
+        # A later run evicts the least recently used entries it isn't using
+        cache = Cache(self.mock_config)
+        third = self.write_entry(cache, "c", 40)
+
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+        self.assertTrue(os.path.exists(third))
+
+    def test_entry_eviction_batch(self):
+        paths = [self.write_entry(self.cache, key, 20) for key in "abcd"]
+        for i, path in enumerate(paths):
+            os.utime(path, (i, i))
+        # Entries are only re-measured when evicting, and one store evicts at
+        # most a batch of them, oldest first
+        cache = Cache(self.mock_config)
+        with mock.patch("cache.cache.ENTRY_EVICTION_BATCH", 1):
+            last = self.write_entry(cache, "e", 60)
+
+        self.assertEqual([os.path.exists(path) for path in paths], [False] + [True] * 3)
+        self.assertTrue(os.path.exists(last))
+        with open(self.cache.manifest_path) as f:
+            self.assertEqual(json.load(f)[os.path.dirname(last)]["size"], 120)
+
+    def test_concurrent_stores(self):
+        # Processes storing at once mustn't drop each other's manifest entries
+        config = self.MockConfig()
+        config.CACHE_MAX_SIZE = 1000
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=store_many, args=(config, f"grid{i}", 20))
+            for i in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        with open(self.cache.manifest_path) as f:
+            self.assertEqual(len(json.load(f)), 80)
+
+    def test_report(self):
+        self.write("grid", "a", 10)
+        self.assertIn("0 hits, 1 misses", self.cache.report())
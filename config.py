@@ -22,9 +22,16 @@ class Config:
     WEATHER_BOUND: pd.Timedelta = (
         pd.Timedelta("12h") - pd.Timedelta("45m") - pd.Timedelta("57s")
     )
+    WEATHER_INTERPOLATION: str = "linear"  # "nearest" or "linear" weather lookups
+    WEATHER_MARGIN: float = 2  # degrees of weather kept around the routing grid
+    COCIP_MAX_AGE: pd.Timedelta = pd.Timedelta("12h")  # longest contrails are followed
+    COCIP_WIND_SPEED: float = 30  # m/s, typical wind CoCiP's weather margin allows for
+    WEATHER_STORE: str or None = None  # multi-day weather store directory, if any
+    SHARE_WEATHER: bool = True  # memory-map the weather so workers share one copy
     NO_OF_POINTS: int = 10
     GRID_WIDTH: int = 40
     GRID_SPACING: int = 20  # km
+    IMPLICIT_GRAPH: bool = False  # compute edges as they are visited, for large grids
 
     # ACO
     EVAPORATION_RATE: float = 0.3
@@ -37,6 +44,31 @@ class Config:
     TAU_MAX: float = 1
     NO_OF_ANTS: int = 8
     NO_OF_ITERATIONS: int = 1
+    WARM_START: bool = False  # seed the pheromones with the baseline solutions
+
+    # Optimiser engine: "aco", "nsga2", "nsga3" or "beam"
+    OPTIMISER: str = "aco"
+
+    # NSGA
+    POPULATION_SIZE: int = 40
+    NO_OF_GENERATIONS: int = 10
+
+    # Beam search
+    BEAM_WIDTH: int = 16
+
+    # Ant evaluation
+    EXECUTOR: str = "local"  # "local" process pool or "socket" workers
+    NO_OF_WORKERS: int or None = None  # defaults to the number of CPUs
+    EXECUTOR_ADDRESS: tuple[str, int] = ("127.0.0.1", 6000)  # local workers only
+    MIN_REMOTE_WORKERS: int = 1
+    WORKER_REGISTRATION_TIMEOUT: float = 300  # s
+
+    # Asynchronous CoCiP
+    ASYNC_COCIP: bool = False  # evaluate deferred objectives in a separate queue
+    COCIP_WORKERS: int = 2
+    COCIP_BUDGET: int = 4  # most promising solutions queued per iteration
+    COCIP_BACKLOG: int = 16  # most solutions waiting for a CoCiP worker
+    COCIP_TIMEOUT: float = 300  # s from dispatch, before an evaluation is abandoned
 
     # Aircraft
     AIRCRAFT_TYPE: str = "B77W"
@@ -49,6 +81,7 @@ class Config:
     # Search Constraints
     FLIGHT_LEVELS: list[int] = [310, 330, 350, 370, 390]
     PRESSURE_LEVELS: list[int] = [300, 250, 200]
+    COCIP_PRESSURE_LEVELS: list[int] = [350, 300, 250, 200]  # lets contrails sink
     STARTING_ALTITUDE: float = 31000
     INITIAL_THRUST: float = 0.84
     MAX_THRUST_VAR: float = 0.01
@@ -62,6 +95,11 @@ class Config:
     # Objective Functions
     OBJECTIVES: list["Objective"] = [ContrailObjective, CO2Objective, TimeObjective]
 
+    # Cache of derived artefacts
+    CACHE_DIRECTORY: str = "data/cache"
+    CACHE_MAX_SIZE: int = 20 * 1024**3  # bytes
+    CACHE_COCIP: bool = True  # keep CoCiP results of each trajectory in the cache
+
     # Earth radius in km
     R: int = 6371
 
@@ -77,6 +115,7 @@ class CocipConfig(Config):
     NAME: str = "cocip"
     OBJECTIVES: list["Objective"] = [CocipObjective, CO2Objective, TimeObjective]
     CONTRAIL_WEIGHT: float = 1
+    ASYNC_COCIP: bool = True
 
 
 class CO2Config(Config):
@@ -228,7 +228,7 @@ def show_flight_path_comparison(
     maps.show_path(geodesic_path, map_axs[2], color="k", linestyle="--")
 
     for ant_path in pareto_set:
-        path_df = pd.DataFrame(ant_path.flight_path, columns=["latitude", "longitude"])
+        path_df = ant_path.flight_path.to_dataframe(columns=["latitude", "longitude"])
         maps.show_path(path_df, map_axs[2], color="gray", linewidth=0.5)
 
     maps.show_path(chosen_pareto_path_df, map_axs[2], color="red", linewidth=2)
@@ -28,6 +28,9 @@ from objectives import ContrailObjective, CO2Objective, TimeObjective, CocipObje
 from routing_graph import RoutingGraphManager
 from performance_model import PerformanceModel, RealFlight, RandomFlight
 from aco import ACO
+from nsga import NSGA
+from beam_search import BeamSearch
+from baseline import BaselineSolver
 from display import Display
 
 
@@ -120,11 +123,25 @@ def run_aco(config: Config, choose_path=False):
 
     _ = routing_graph_manager.get_routing_graph()
 
-    # Run ACO
-    ant_colony = ACO(routing_graph_manager, config)
-    pareto_set = ant_colony.run_aco_colony()
-    objectives = ant_colony.objectives_over_time
-    print("[bold green]:white_check_mark: ACO complete.[/bold green]")
+    # Solve each objective alone, which gives the ideal point of the fronts
+    baseline = BaselineSolver(routing_graph_manager, config)
+    baseline_solutions = baseline.solve()
+
+    # Run the optimiser
+    if config.OPTIMISER == "aco":
+        optimiser = ACO(routing_graph_manager, config)
+        if config.WARM_START:
+            optimiser.warm_start(baseline_solutions)
+        pareto_set = optimiser.run_aco_colony()
+    elif config.OPTIMISER == "beam":
+        optimiser = BeamSearch(routing_graph_manager, config)
+        pareto_set = optimiser.run_beam_search()
+    else:
+        optimiser = NSGA(routing_graph_manager, config)
+        pareto_set = optimiser.run_nsga()
+    objectives = optimiser.objectives_over_time
+    print("[bold green]:white_check_mark: Optimisation complete.[/bold green]")
+    print(f"[blue]{routing_graph_manager.get_cache().report()}[/blue]")
 
     # Run performance model on a real flight
     with Progress(
@@ -171,9 +188,14 @@ def run_aco(config: Config, choose_path=False):
         real_flight.config = config
         random_flight_path.calculate_objectives()
         real_flight.calculate_objectives()
-        for path in pareto_set:
+        # Warm started seeds may already be in the pareto set
+        baseline_paths = [
+            path for path in baseline_solutions.values() if path not in pareto_set
+        ]
+        for path in pareto_set + baseline_paths:
             path.config = config
             path.calculate_objectives()
+        ideal_point = baseline.get_ideal_point(baseline_solutions)
 
     print_results_table(real_flight, random_flight_path, pareto_set, None)
 
@@ -198,14 +220,12 @@ def run_aco(config: Config, choose_path=False):
         transient=True,
     ) as progress:
         progress.add_task(description="Running CoCiP for both flights...", total=None)
-        fp_ef, fp_df, fp_cocip = cocip_manager.calculate_ef_from_flight_path(
-            real_flight.flight_path
-        )
-        aco_ef, aco_df, aco_cocip = cocip_manager.calculate_ef_from_flight_path(
-            chosen_pareto_path.flight_path
-        )
-        rand_ef, rand_df, rand_cocip = cocip_manager.calculate_ef_from_flight_path(
-            random_flight_path.flight_path
+        fp_cocip, aco_cocip, rand_cocip = cocip_manager.calculate_ef_from_flight_paths(
+            [
+                real_flight.flight_path,
+                chosen_pareto_path.flight_path,
+                random_flight_path.flight_path,
+            ]
         )
     print(
         "[bold green]:white_check_mark: CoCiP calculated for both flights.[/bold green]"
@@ -223,6 +243,7 @@ def run_aco(config: Config, choose_path=False):
         rand_cocip,
         contrail_grid,
         contrail_polys,
+        ideal_point,
     )
 
 
@@ -239,6 +260,7 @@ def save_results(dir: str, results, config):
         rand_cocip,
         contrail_grid,
         contrail_polys,
+        ideal_point,
     ) = results
     save_pickle(f"{dir}geodesic_path.pkl", geodesic_path)
     save_pickle(f"{dir}real_flight.pkl", real_flight)
@@ -265,6 +287,7 @@ def save_results(dir: str, results, config):
         f"{dir}random_objectives.csv",
         pd.DataFrame(random_flight_path.objectives, index=[0]),
     )
+    save_csv(f"{dir}ideal_point.csv", pd.DataFrame(ideal_point, index=[0]))
 
 
 def load_results(dir: str):
@@ -311,18 +334,16 @@ def save_figs(dir: str, results, config):
         rand_cocip,
         contrail_grid,
         contrail_polys,
+        ideal_point,
     ) = results
     geodesic_path = pd.DataFrame(geodesic_path, columns=["latitude", "longitude"])
-    real_flight_df = pd.DataFrame(
-        real_flight.flight_path,
+    real_flight_df = real_flight.flight_path.to_dataframe(
         columns=["latitude", "longitude", "time", "altitude_ft"],
     )
-    chosen_pareto_path_df = pd.DataFrame(
-        chosen_pareto_path.flight_path,
+    chosen_pareto_path_df = chosen_pareto_path.flight_path.to_dataframe(
         columns=["latitude", "longitude", "time", "altitude_ft"],
     )
-    random_path_df = pd.DataFrame(
-        random_flight_path.flight_path,
+    random_path_df = random_flight_path.flight_path.to_dataframe(
         columns=["latitude", "longitude", "time", "altitude_ft"],
     )
     fig1 = graphs.show_flight_path_comparison(
@@ -455,18 +476,28 @@ def compare_fronts():
     ]
     answers = inquirer.prompt(questions)
     dfs = []
+    ideal_points = []
 
-    # Load all CSVs in the directory
+    # Load all CSVs in the directory, keeping the ideal points apart
     for filename in os.listdir(answers["dir"]):
         if filename.endswith(".csv"):
             filepath = os.path.join(answers["dir"], filename)
             df = pd.read_csv(filepath)
             df.name = os.path.splitext(filename)[0]
-            dfs.append(df)
+            if df.name.startswith("ideal_point"):
+                ideal_points.append(df)
+            else:
+                dfs.append(df)
 
     display = Display()
-    concat_dfs = pd.concat(dfs).values
-    ideal, nadir = distance_indicator.derive_ideal_and_nadir_from_pf(concat_dfs)
+    concat_dfs = pd.concat(dfs)
+    ideal, nadir = distance_indicator.derive_ideal_and_nadir_from_pf(concat_dfs.values)
+    # Anchor each objective at the best of its single-objective solutions
+    for ideal_point in ideal_points:
+        for objective, value in ideal_point.iloc[0].items():
+            if objective in concat_dfs.columns:
+                i = concat_dfs.columns.get_loc(objective)
+                ideal[i] = min(ideal[i], value)
     normalization = ZeroToOneNormalization(ideal, nadir)
 
     # Normalise all dataframes
@@ -588,6 +619,12 @@ def main():
                 choices=["Default", "ContrailMax", "Contrail", "CO2", "Time", "CoCiP"],
                 carousel=True,
             ),
+            inquirer.List(
+                "optimiser",
+                message="Which optimiser would you like to use?",
+                choices=["ACO", "NSGA-II", "NSGA-III", "Beam Search"],
+                carousel=True,
+            ),
             inquirer.List(
                 "iterations",
                 message="How many iterations would you like to run?",
@@ -621,7 +658,15 @@ def main():
         else:
             config = ContrailMaxConfig()
 
+        if answers["optimiser"] == "NSGA-II":
+            config.OPTIMISER = "nsga2"
+        elif answers["optimiser"] == "NSGA-III":
+            config.OPTIMISER = "nsga3"
+        elif answers["optimiser"] == "Beam Search":
+            config.OPTIMISER = "beam"
+
         config.NO_OF_ITERATIONS = answers["iterations"]
+        config.NO_OF_GENERATIONS = answers["iterations"]
         config.EVAPORATION_RATE = answers["evaporation_rate"]
         config.NO_OF_ANTS = answers["no_of_ants"]
 
@@ -639,6 +684,7 @@ def main():
             rand_cocip,
             contrail_grid,
             contrail_polys,
+            ideal_point,
         ) = results
 
         questions = [
@@ -673,16 +719,13 @@ def main():
             print("[bold green]:white_check_mark: Results saved.[/bold green]")
 
     geodesic_path = pd.DataFrame(geodesic_path, columns=["latitude", "longitude"])
-    real_flight_df = pd.DataFrame(
-        real_flight.flight_path,
+    real_flight_df = real_flight.flight_path.to_dataframe(
         columns=["latitude", "longitude", "time", "altitude_ft"],
     )
-    chosen_pareto_path_df = pd.DataFrame(
-        chosen_pareto_path.flight_path,
+    chosen_pareto_path_df = chosen_pareto_path.flight_path.to_dataframe(
         columns=["latitude", "longitude", "time", "altitude_ft"],
     )
-    random_path_df = pd.DataFrame(
-        random_flight_path.flight_path,
+    random_path_df = random_flight_path.flight_path.to_dataframe(
         columns=["latitude", "longitude", "time", "altitude_ft"],
     )
 
@@ -0,0 +1 @@
+from .nsga import NSGA
@@ -0,0 +1,139 @@
+import math
+import numpy as np
+from rich import print
+from pymoo.algorithms.moo.nsga2 import NSGA2
+from pymoo.algorithms.moo.nsga3 import NSGA3
+from pymoo.util.ref_dirs import get_reference_directions
+from pymoo.optimize import minimize
+
+from aco.executor import create_executor
+from performance_model import Flight
+from .problem import RoutingProblem
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from pymoo.core.algorithm import Algorithm
+    from config import Config
+    from routing_graph import RoutingGraphManager, RoutingGraph
+    from aco.executor import Executor, EvaluationResult
+    from _types import IndexPath, Objectives
+
+
+class NSGA:
+    def __init__(self, routing_graph_manager: "RoutingGraphManager", config: "Config"):
+        """
+        Class to run NSGA-II or NSGA-III over the routing graph, as an
+        alternative to the Ant Colony Optimisation algorithm
+        """
+        self.routing_graph_manager: "RoutingGraphManager" = routing_graph_manager
+        self.routing_graph: "RoutingGraph" = routing_graph_manager.get_routing_graph()
+        self.config: "Config" = config
+
+        self.objectives: list[str] = [
+            str(objective(self.routing_graph_manager.performance_model, self.config))
+            for objective in config.OBJECTIVES
+        ]
+        self.objectives_over_time: list["Objectives"] = []
+        self.evaluated: dict[tuple, "EvaluationResult"] = {}
+        self.executor: "Executor" or None = None
+
+    def create_algorithm(self) -> "Algorithm":
+        """
+        Creates the pymoo algorithm chosen in the config
+        """
+        if self.config.OPTIMISER == "nsga3" and len(self.objectives) < 2:
+            # Reference directions need at least two objectives
+            print(
+                "[yellow]NSGA-III needs at least two objectives, so NSGA-II is "
+                "used instead[/yellow]"
+            )
+        elif self.config.OPTIMISER == "nsga3":
+            ref_dirs = get_reference_directions(
+                "das-dennis", len(self.objectives), n_partitions=self.get_partitions()
+            )
+            # Niching needs at least one member per reference direction
+            pop_size = max(self.config.POPULATION_SIZE, len(ref_dirs))
+            if pop_size > self.config.POPULATION_SIZE:
+                print(
+                    f"[yellow]NSGA-III population enlarged from "
+                    f"{self.config.POPULATION_SIZE} to {pop_size} to cover its "
+                    f"{len(ref_dirs)} reference directions[/yellow]"
+                )
+            return NSGA3(ref_dirs=ref_dirs, pop_size=pop_size)
+        return NSGA2(pop_size=self.config.POPULATION_SIZE)
+
+    def get_partitions(self) -> int:
+        """
+        Gets the most das-dennis partitions whose reference directions fit in
+        the population, and at least one. Needs at least two objectives.
+        """
+        no_of_objectives = len(self.objectives)
+        assert no_of_objectives >= 2, "Reference directions need two objectives"
+        partitions = 1
+        # There are at least as many directions as partitions, which bounds this
+        while (
+            partitions < self.config.POPULATION_SIZE
+            and math.comb(partitions + no_of_objectives, no_of_objectives - 1)
+            <= self.config.POPULATION_SIZE
+        ):
+            partitions += 1
+        return partitions
+
+    def evaluate_paths(self, index_paths: list["IndexPath"]) -> list["Objectives"]:
+        """
+        Evaluates a population of index paths in one batch, skipping any path
+        which has already been evaluated
+        """
+        keys = [tuple(indices) for indices in index_paths]
+        new_keys = list(dict.fromkeys(key for key in keys if key not in self.evaluated))
+        results = self.executor.evaluate([list(key) for key in new_keys])
+        self.evaluated.update(zip(new_keys, results))
+
+        return [self.evaluated[key][1] for key in keys]
+
+    def track_objectives(self, algorithm: "Algorithm") -> None:
+        """
+        Records the best value of each objective found so far
+        """
+        best_objectives = dict(zip(self.objectives, algorithm.pop.get("F").min(axis=0)))
+        if self.objectives_over_time:
+            previous_best = self.objectives_over_time[-1]
+            for objective in self.objectives:
+                best_objectives[objective] = min(
+                    best_objectives[objective], previous_best[objective]
+                )
+        self.objectives_over_time.append(best_objectives)
+
+    def run_nsga(self) -> list[Flight]:
+        """
+        Runs the genetic algorithm and generates a pareto front of solutions
+        """
+        problem = RoutingProblem(
+            self.routing_graph,
+            (0, self.config.GRID_WIDTH, self.config.STARTING_ALTITUDE),
+            self.config.NO_OF_POINTS,
+            self.objectives,
+            self.evaluate_paths,
+        )
+        with create_executor(self.config) as executor:
+            self.executor = executor
+            executor.start(self.routing_graph_manager)
+            result = minimize(
+                problem,
+                self.create_algorithm(),
+                ("n_gen", self.config.NO_OF_GENERATIONS),
+                callback=self.track_objectives,
+            )
+            self.executor = None
+
+        pareto_set = []
+        index_paths = [problem.decode(x) for x in np.atleast_2d(result.opt.get("X"))]
+        for key in dict.fromkeys(tuple(indices) for indices in index_paths):
+            flight_path, objectives = self.evaluated[key]
+            solution = Flight(self.routing_graph_manager, flight_path, self.config)
+            solution.indices = list(key)
+            solution.objectives = objectives
+            pareto_set.append(solution)
+
+        return pareto_set
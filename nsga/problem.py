@@ -0,0 +1,73 @@
+import numpy as np
+from pymoo.core.problem import Problem
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from routing_graph import RoutingGraph
+    from _types import IndexPath, IndexPoint3D
+
+
+class RoutingProblem(Problem):
+    def __init__(
+        self,
+        routing_graph: "RoutingGraph",
+        departure: "IndexPoint3D",
+        no_of_layers: int,
+        objectives: list[str],
+        evaluate_paths: typing.Callable[[list["IndexPath"]], list[dict]],
+    ):
+        """
+        Encodes a route as a (lateral, altitude) choice per layer of the routing
+        graph. Each choice is a key in [0, 1) which is decoded against the
+        successors of the previous node, so every individual is a valid path.
+        """
+        self.routing_graph: "RoutingGraph" = routing_graph
+        self.departure: "IndexPoint3D" = departure
+        self.objectives: list[str] = objectives
+        self.evaluate_paths = evaluate_paths
+        super().__init__(
+            n_var=2 * no_of_layers,
+            n_obj=len(objectives),
+            xl=0,
+            xu=1,
+        )
+
+    def decode(self, x: np.ndarray) -> "IndexPath":
+        """
+        Decodes the choice keys of an individual into an index path
+        """
+        indices = [self.departure]
+        neighbours = list(self.routing_graph[self.departure])
+        layer = 0
+        while neighbours and layer < self.n_var // 2:
+            altitude_key, lateral_key = x[2 * layer], x[2 * layer + 1]
+
+            altitudes = sorted({neighbour[2] for neighbour in neighbours})
+            altitude = altitudes[
+                min(int(altitude_key * len(altitudes)), len(altitudes) - 1)
+            ]
+            laterals = [
+                neighbour for neighbour in neighbours if neighbour[2] == altitude
+            ]
+            choice = laterals[min(int(lateral_key * len(laterals)), len(laterals) - 1)]
+
+            indices.append(choice)
+            neighbours = list(self.routing_graph[choice])
+            layer += 1
+
+        return indices
+
+    def _evaluate(self, X: np.ndarray, out: dict, *args, **kwargs) -> None:
+        """
+        Evaluates a whole population in a single batch
+        """
+        index_paths = [self.decode(x) for x in X]
+        objectives = self.evaluate_paths(index_paths)
+        out["F"] = np.array(
+            [
+                [solution[objective] for objective in self.objectives]
+                for solution in objectives
+            ],
+            dtype=float,
+        )
@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+import networkx as nx
+from pymoo.algorithms.moo.nsga2 import NSGA2
+from ..nsga import NSGA
+from ..problem import RoutingProblem
+from utils.testing import MockConfig, MockRoutingGraphManager, MockLateralObjective
+
+
+def create_graph():
+    graph = nx.DiGraph()
+    for xi in range(3):
+        for yi in range(3):
+            for altitude in (0, 1):
+                for next_yi in range(max(yi - 1, 0), min(yi + 1, 2) + 1):
+                    for next_altitude in range(altitude, 2):
+                        graph.add_edge(
+                            (xi, yi, altitude), (xi + 1, next_yi, next_altitude)
+                        )
+    return graph
+
+
+class MockAltitudeObjective(MockLateralObjective):
+    def __init__(self, performance_model, config):
+        super().__init__(performance_model, config)
+        self.name = "altitude"
+
+    def _run_objective_function(self, flight_path):
+        return sum(
+            2 - point["longitude"] - point["altitude_ft"] for point in flight_path
+        )
+
+
+class MockNSGAConfig(MockConfig):
+    GRID_WIDTH = 1
+    NO_OF_POINTS = 3
+    OBJECTIVES = [MockLateralObjective, MockAltitudeObjective]
+    EXECUTOR = "local"
+    NO_OF_WORKERS = 1
+    OPTIMISER = "nsga2"
+    POPULATION_SIZE = 8
+    NO_OF_GENERATIONS = 3
+
+
+class TestRoutingProblem(unittest.TestCase):
+    def setUp(self):
+        self.graph = create_graph()
+        self.problem = RoutingProblem(
+            self.graph, (0, 1, 0), 3, ["lateral"], lambda paths: []
+        )
+
+    def test_decode(self):
+        indices = self.problem.decode(np.array([0, 0, 0.99, 0.99, 0.5, 0.5]))
+        self.assertEqual(indices, [(0, 1, 0), (1, 0, 0), (2, 1, 1), (3, 1, 1)])
+
+    def test_decode_follows_edges(self):
+        for x in np.random.default_rng(0).random((20, 6)):
+            indices = self.problem.decode(x)
+            self.assertEqual(len(indices), 4)
+            for u, v in nx.utils.pairwise(indices):
+                self.assertTrue(self.graph.has_edge(u, v))
+
+
+class TestNSGA(unittest.TestCase):
+    def test_nsga3_reference_directions(self):
+        config = MockNSGAConfig()
+        config.OPTIMISER = "nsga3"
+        config.POPULATION_SIZE = 40
+        nsga = NSGA(MockRoutingGraphManager(create_graph()), config)
+        nsga.objectives = ["lateral", "altitude", "time"]
+
+        # 3 objectives fit 36 directions with 7 partitions, but 45 with 8
+        self.assertEqual(nsga.get_partitions(), 7)
+        algorithm = nsga.create_algorithm()
+        self.assertEqual(len(algorithm.ref_dirs), 36)
+        self.assertGreaterEqual(algorithm.pop_size, len(algorithm.ref_dirs))
+
+    def test_nsga3_edge_cases(self):
+        config = MockNSGAConfig()
+        config.OPTIMISER = "nsga3"
+        config.POPULATION_SIZE = 2
+        nsga = NSGA(MockRoutingGraphManager(create_graph()), config)
+
+        # Too few members for the directions of three objectives enlarges the
+        # population
+        nsga.objectives = ["lateral", "altitude", "time"]
+        self.assertEqual(nsga.get_partitions(), 1)
+        self.assertEqual(nsga.create_algorithm().pop_size, 3)
+
+        # A single objective falls back to NSGA-II
+        nsga.objectives = ["lateral"]
+        self.assertIsInstance(nsga.create_algorithm(), NSGA2)
+
+    def test_run_nsga(self):
+        nsga = NSGA(MockRoutingGraphManager(create_graph()), MockNSGAConfig())
+        pareto_set = nsga.run_nsga()
+
+        self.assertTrue(pareto_set)
+        self.assertEqual(len(nsga.objectives_over_time), 3)
+        for solution in pareto_set:
+            self.assertEqual(len(solution.flight_path), 4)
+            # Assert no solution in the pareto set is dominated by another
+            for other in pareto_set:
+                self.assertFalse(
+                    all(
+                        other.objectives[objective] < solution.objectives[objective]
+                        for objective in nsga.objectives
+                    )
+                )
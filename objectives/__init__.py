@@ -1,10 +1,10 @@
 import pandas as pd
 from openap import Emission
-import geopy.distance as gd
-import math
+import numpy as np
 import typing
 
 from performance_model import PerformanceModel
+from utils import geodesy
 
 if typing.TYPE_CHECKING:
     from config import Config
@@ -20,6 +20,9 @@ class Objective:
         self.weight: float = 1
         self.performance_model: PerformanceModel = performance_model
         self.name: str or NotImplemented = NotImplemented
+        # Deferred objectives are too expensive to run on every ant, so can be
+        # left to a CocipQueue
+        self.deferred: bool = False
 
     def _run_objective_function(self, flight_path: "FlightPath") -> float:
         """
@@ -27,6 +30,14 @@ class Objective:
         """
         return NotImplemented
 
+    def _run_objective_functions(self, flight_paths: list["FlightPath"]) -> np.ndarray:
+        """
+        Runs the objective function on many flight paths
+        """
+        return np.array(
+            [self._run_objective_function(flight_path) for flight_path in flight_paths]
+        )
+
     def calculate_objective(self, flight_path: "FlightPath") -> float:
         """
         Runs the objective function and multiplies by the weight
@@ -36,25 +47,52 @@ class Objective:
     def calculate_heuristic(self, flight_path: "FlightPath") -> float:
         return NotImplemented
 
-    def _calculate_time_estimation(self, point: "FlightPoint") -> tuple:
+    def calculate_heuristics(self, points: np.ndarray) -> np.ndarray:
         """
-        Calculates a rough time estimation based off an arbitrary speed from the departure to this point
+        Calculates the heuristic for an array of (lat, lon, altitude) points
+        """
+        return np.array([self.calculate_heuristic(tuple(point)) for point in points])
+
+    def calculate_heuristics_by_time(
+        self, points: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the heuristic for an array of (lat, lon, altitude) points at
+        each of some times, as the times in nanoseconds since the epoch and the
+        heuristics of shape (n_points, n_times)
         """
-        flat_distance_from_departure = gd.distance(
-            (point[0], point[1]),
-            self.config.DEPARTURE_AIRPORT,
-        ).m
-        distance_from_departure = math.sqrt(
+        return NotImplemented
+
+    def _calculate_time_estimations(
+        self, points: np.ndarray
+    ) -> tuple[np.ndarray, pd.DatetimeIndex]:
+        """
+        Calculates rough time estimations based off an arbitrary speed from the departure to an array of (lat, lon, altitude) points
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        flat_distance_from_departure = geodesy.distance(
+            points[:, 0],
+            points[:, 1],
+            *self.config.DEPARTURE_AIRPORT,
+        )
+        distance_from_departure = np.sqrt(
             flat_distance_from_departure**2
-            + (point[2] - self.config.STARTING_ALTITUDE) ** 2
+            + (points[:, 2] - self.config.STARTING_ALTITUDE) ** 2
         )
         speed = (
             self.config.NOMINAL_THRUST * 343
         )  # times by speed of sound for rough speed estimate
         time_to_point = distance_from_departure / speed
-        time_at_point = self.config.DEPARTURE_DATE + pd.Timedelta(time_to_point, "s")
+        time_at_point = self.config.DEPARTURE_DATE + pd.to_timedelta(time_to_point, "s")
         return time_to_point, time_at_point
 
+    def _calculate_time_estimation(self, point: "FlightPoint") -> tuple:
+        """
+        Calculates a rough time estimation based off an arbitrary speed from the departure to this point
+        """
+        time_to_point, time_at_point = self._calculate_time_estimations(point[:3])
+        return time_to_point[0], time_at_point[0]
+
     def __str__(self) -> str:
         return self.name
 
@@ -74,6 +112,11 @@ class ContrailObjective(Objective):
         )
         return contrail_ef
 
+    def _run_objective_functions(self, flight_paths: list["FlightPath"]) -> np.ndarray:
+        return self.performance_model.contrail_grid.interpolate_contrail_grids(
+            flight_paths
+        )
+
     def calculate_heuristic(self, point: "FlightPoint") -> float:
         contrails_at_point = max(
             self.performance_model.contrail_grid.interpolate_contrail_point(point),
@@ -81,18 +124,38 @@ class ContrailObjective(Objective):
         )
         return -contrails_at_point
 
+    def calculate_heuristics(self, points: np.ndarray) -> np.ndarray:
+        contrails_at_points = np.maximum(
+            self.performance_model.contrail_grid.interpolate_contrail_points(points),
+            0.01,
+        )
+        return -contrails_at_points
+
+    def calculate_heuristics_by_time(
+        self, points: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        contrail_grid = self.performance_model.contrail_grid
+        contrails_at_points = np.maximum(
+            contrail_grid.interpolate_contrail_points_by_time(points), 0.01
+        )
+        return contrail_grid.get_times(), -contrails_at_points
+
 
 class CocipObjective(Objective):
     def __init__(self, performance_model: PerformanceModel, config: "Config"):
         super().__init__(performance_model, config)
         self.name: str = "cocip"
         self.weight: float = config.CONTRAIL_WEIGHT
+        self.deferred: bool = True
 
     def _run_objective_function(self, flight_path: "FlightPath") -> float:
-        ef, _, _ = self.performance_model.cocip_manager.calculate_ef_from_flight_path(
-            flight_path,
+        return self._run_objective_functions([flight_path])[0].item()
+
+    def _run_objective_functions(self, flight_paths: list["FlightPath"]) -> np.ndarray:
+        results = self.performance_model.cocip_manager.calculate_ef_from_flight_paths(
+            flight_paths, waypoints=False
         )
-        return ef.sum()
+        return np.array([result.ef for result in results], dtype=float)
 
     def calculate_heuristic(self, point: "FlightPoint") -> float:
         contrails_at_point = max(
@@ -101,6 +164,22 @@ class CocipObjective(Objective):
         )
         return -contrails_at_point
 
+    def calculate_heuristics(self, points: np.ndarray) -> np.ndarray:
+        contrails_at_points = np.maximum(
+            self.performance_model.contrail_grid.interpolate_contrail_points(points),
+            0.01,
+        )
+        return -contrails_at_points
+
+    def calculate_heuristics_by_time(
+        self, points: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        contrail_grid = self.performance_model.contrail_grid
+        contrails_at_points = np.maximum(
+            contrail_grid.interpolate_contrail_points_by_time(points), 0.01
+        )
+        return contrail_grid.get_times(), -contrails_at_points
+
 
 class CO2Objective(Objective):
     def __init__(self, performance_model: PerformanceModel, config: "Config"):
@@ -113,24 +192,33 @@ class CO2Objective(Objective):
 
     def _run_objective_function(self, flight_path: "FlightPath") -> float:
         co2_kg = (
-            sum(point["CO2"] for point in flight_path)
+            flight_path["CO2"].sum()
             * self._calculate_flight_duration(flight_path)
             * 3600
             / 1000  # convert g/s to kg
         )
         return co2_kg
 
+    def get_emission(self) -> Emission:
+        """
+        Gets the emission model of the aircraft, shared by every heuristic
+        """
+        if not hasattr(self, "emission"):
+            self.emission = Emission(ac=self.config.AIRCRAFT_TYPE)
+        return self.emission
+
     def calculate_heuristic(self, point: "FlightPoint") -> float:
-        time_to_point, time_at_point = self._calculate_time_estimation(point)
-        ps_grid = self.performance_model.ps_grid
-        point = {
-            "latitude": point[0],
-            "longitude": point[1],
-            "altitude_ft": point[2],
-            "time": time_at_point,
-        }
-        fuel_flow_estimation = ps_grid.get_performance_data_at_point(point)["fuel_flow"]
-        co2 = Emission(ac=self.config.AIRCRAFT_TYPE).co2(fuel_flow_estimation)
+        return self.calculate_heuristics(np.array([point[:3]]))[0].item()
+
+    def calculate_heuristics(self, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        _, times_at_points = self._calculate_time_estimations(points)
+        fuel_flow_estimations = (
+            self.performance_model.get_ps_grid().get_fuel_flow_at_points(
+                points[:, 0], points[:, 1], points[:, 2], times_at_points
+            )
+        )
+        co2 = self.get_emission().co2(fuel_flow_estimations)
         return -co2
 
 
@@ -149,3 +237,7 @@ class TimeObjective(Objective):
     def calculate_heuristic(self, point: "FlightPoint") -> float:
         time_to_point, _ = self._calculate_time_estimation(point)
         return -time_to_point
+
+    def calculate_heuristics(self, points: np.ndarray) -> np.ndarray:
+        time_to_points, _ = self._calculate_time_estimations(points)
+        return -time_to_points
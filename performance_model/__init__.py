@@ -9,6 +9,7 @@ from .flight import RealFlight, Flight, RandomFlight
 if typing.TYPE_CHECKING:
     from config import Config
     from routing_graph import RoutingGraphManager, RoutingGrid, AltitudeGrid
+    from cache import Cache
     from _types import FlightPath
 
 
@@ -21,6 +22,7 @@ class PerformanceModel:
         self.routing_grid: "RoutingGrid" = routing_graph_manager.get_routing_grid()
         self.altitude_grid: "AltitudeGrid" = routing_graph_manager.get_altitude_grid()
         self.routing_graph_manager: "RoutingGraphManager" = routing_graph_manager
+        self.cache: "Cache" = routing_graph_manager.get_cache()
         self.get_apm()
         self.get_weather_grid()
         self.get_ps_grid()
@@ -46,7 +48,7 @@ class PerformanceModel:
         """
         if hasattr(self, "ps_grid") is False:
             weather_grid = self.get_weather_grid()
-            self.ps_grid = PSGridManager(weather_grid, self.config)
+            self.ps_grid = PSGridManager(weather_grid, self.config, self.cache)
         return self.ps_grid
 
     def get_apm(self) -> AircraftPerformanceModel:
@@ -63,8 +65,10 @@ class PerformanceModel:
         Gets the weather grid
         """
         if hasattr(self, "weather_grid") is False:
-            self.weather_grid = WeatherGrid(self.altitude_grid, self.config)
+            self.weather_grid = WeatherGrid(self.altitude_grid, self.config, self.cache)
             self.weather_grid.get_weather_grid()
+            if self.config.SHARE_WEATHER:
+                self.weather_grid.share_weather()
         return self.weather_grid
 
     def get_cocip_manager(self) -> CocipManager:
@@ -73,7 +77,7 @@ class PerformanceModel:
         """
         if hasattr(self, "cocip_manager") is False:
             weather_grid = self.get_weather_grid()
-            self.cocip_manager = CocipManager(weather_grid, self.config)
+            self.cocip_manager = CocipManager(weather_grid, self.config, self.cache)
         return self.cocip_manager
 
     def get_contrail_grid(self) -> ContrailGrid:
@@ -91,6 +95,6 @@ class PerformanceModel:
         """
         if hasattr(self, "contrail_manager") is False:
             self.contrail_manager = ContrailGridManager(
-                self.routing_grid.get_routing_grid(), self.config
+                self.routing_grid.get_routing_grid(), self.config, self.cache
             )
         return self.contrail_manager
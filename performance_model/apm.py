@@ -1,243 +1,264 @@
-from geopy import distance as gp
-import pandas as pd
 import numpy as np
 from openap import FuelFlow, Emission
-import math
-import pycontrails as pc
 import typing
 
-from utils import Conversions
+from utils import Conversions, FlightPath, geodesy
+from utils.interpolation import get_bracket
 from .weather import WeatherGrid
 
 if typing.TYPE_CHECKING:
     from config import Config
-    from _types import FlightPoint, FlightPath, WindVector, Point2D
+    from _types import FlightPoint, WindVector, Point2D
+
+Columns = dict[str, np.ndarray]
 
 
 class AircraftPerformanceModel:
     def __init__(self, weather_grid: "WeatherGrid", config: "Config"):
         self.weather_grid: "WeatherGrid" = weather_grid
         self.config: "Config" = config
+        self.fuelflow: FuelFlow = FuelFlow(ac=self.config.AIRCRAFT_TYPE)
+        self.emission: Emission = Emission(ac=self.config.AIRCRAFT_TYPE)
 
     def calculate_flight_characteristics(
-        self, flight_path: "FlightPath"
+        self, flight_path: "FlightPath" or list["FlightPoint"]
     ) -> "FlightPath":
         """
         Calculate flight characteristics for the whole flight path
         """
+        flight_path = FlightPath.coerce(flight_path)
+        columns = self.get_columns(
+            flight_path, ["latitude", "longitude", "altitude_ft", "thrust"]
+        )
+        columns = self.calculate_coarse_characteristics(columns)
+        if columns["segment_length"][0] > 100000:
+            flight_path = self.resample(self.set_columns(flight_path, columns))
+            columns = self.get_columns(
+                flight_path, ["latitude", "longitude", "altitude_ft", "time"]
+            )
+        columns = self.recalculate_flight_characteristics(columns)
+        columns = self.calculate_emission_data(columns)
 
-        flight_path = self.calculate_coarse_characteristics(flight_path)
-        if flight_path[0]["segment_length"] > 100000:
-            flight_path = self.resample(flight_path)
-        fuelflow = FuelFlow(ac=self.config.AIRCRAFT_TYPE)
-        emission = Emission(ac=self.config.AIRCRAFT_TYPE)
-        for i, point in enumerate(flight_path):
-            if i != len(flight_path) - 1:
-                next_point = flight_path[i + 1]
-            else:
-                next_point = None
-
-            if i == 0:
-                previous_point = None
-            else:
-                previous_point = flight_path[i - 1]
-
-            point = self.recalculate_flight_characteristics(i, point, next_point)
+        return self.set_columns(flight_path, columns)
 
-            point = self.calculate_emission_data(
-                i, point, previous_point, emission, fuelflow
-            )
+    def get_columns(self, flight_path: "FlightPath", fields: list[str]) -> Columns:
+        """
+        Gets the arrays of some fields of a flight path
+        """
+        return {field: flight_path[field] for field in fields}
 
+    def set_columns(self, flight_path: "FlightPath", columns: Columns) -> "FlightPath":
+        """
+        Sets arrays of fields on a flight path
+        """
+        for field, column in columns.items():
+            flight_path[field] = column
         return flight_path
 
-    def calculate_coarse_characteristics(
-        self, flight_path: "FlightPath"
-    ) -> "FlightPath":
+    def calculate_coarse_characteristics(self, columns: Columns) -> Columns:
         """
         Calculate basic initial characteristics for the first flight path
         """
-        for i in range(len(flight_path)):
-            point = flight_path[i]
-
-            if i != len(flight_path) - 1:
-                next_point = flight_path[i + 1]
-                point["course"] = self.calculate_course_at_point(point, next_point)
-                point["climb_angle"] = self.calculate_climb_angle(point, next_point)
-                point["segment_length"] = self.calculate_segment_length(
-                    next_point, point
-                )
-            else:
-                point["segment_length"] = 0
-                point["course"] = 0
-                point["climb_angle"] = 0
-
-            if i == 0:
-                point["time"] = self.config.DEPARTURE_DATE
-            else:
-                previous_point = flight_path[i - 1]
-                time_elapsed = self.calculate_time_at_point(point, previous_point)
-                point["time"] = previous_point["time"] + time_elapsed.round("s")
-
-            weather_at_point = self.weather_grid.get_weather_data_at_point(point)
-            temperature = self.weather_grid.get_temperature_at_point(weather_at_point)
-            wind_vector = self.weather_grid.get_wind_vector_at_point(weather_at_point)
-
-            point["true_airspeed"] = self.calculate_true_air_speed(
-                point["thrust"], temperature
+        columns.update(self.calculate_geometry(columns))
+        levels = self.calculate_levels(columns["altitude_ft"])
+        distances = columns.pop("distance")
+
+        columns["time"] = self.calculate_times(columns, distances, levels)
+        temperature, wind_vector = self.weather_grid.get_weather_at_points(
+            columns["latitude"], columns["longitude"], columns["time"], levels
+        )
+        columns.update(
+            self.calculate_speeds(columns, columns["thrust"], temperature, wind_vector)
+        )
+        return columns
+
+    def calculate_times(
+        self, columns: Columns, distances: np.ndarray, levels: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculates the time at each point, which depends on the ground speed in
+        the weather at the previous point's time. The weather at every point is
+        looked up at each time of the weather grid in one batch, then the times
+        are stepped forward in one pass, interpolating that weather in time.
+        """
+        weather_times = self.weather_grid.get_weather_times()
+        no_of_points, no_of_times = len(levels), len(weather_times)
+        temperature, (u, v) = self.weather_grid.get_weather_at_points(
+            np.repeat(columns["latitude"], no_of_times),
+            np.repeat(columns["longitude"], no_of_times),
+            np.tile(weather_times.astype("datetime64[ns]"), no_of_points),
+            np.repeat(levels, no_of_times),
+        )
+        temperature = temperature.reshape(no_of_points, no_of_times).tolist()
+        u = u.reshape(no_of_points, no_of_times).tolist()
+        v = v.reshape(no_of_points, no_of_times).tolist()
+
+        axis = weather_times.astype(float).tolist()
+        method = self.config.WEATHER_INTERPOLATION
+        thrust = columns["thrust"].tolist()
+        course = columns["course"].tolist()
+        climb_angle = columns["climb_angle"].tolist()
+        distances = distances.tolist()
+
+        times = np.empty(no_of_points, dtype=np.int64)
+        time = np.datetime64(self.config.DEPARTURE_DATE, "ns").astype(np.int64)
+        times[0] = time
+        for i in range(no_of_points - 1):
+            lower, upper, weight = get_bracket(axis, float(time), method)
+            true_airspeed = self.calculate_true_air_speed(
+                thrust[i],
+                (1 - weight) * temperature[i][lower] + weight * temperature[i][upper],
+            )
+            ground_speed = self.calculate_ground_speed(
+                course[i],
+                climb_angle[i],
+                true_airspeed,
+                (
+                    (1 - weight) * u[i][lower] + weight * u[i][upper],
+                    (1 - weight) * v[i][lower] + weight * v[i][upper],
+                ),
             )
-            crabbing_angle = self.calculate_crabbing_angle(point, wind_vector)
-            point["heading"] = point["course"] - crabbing_angle
-            point["ground_speed"] = self.calculate_ground_speed(point, wind_vector)
+            time += round(distances[i] / ground_speed) * 1_000_000_000
+            times[i + 1] = time
 
-        return flight_path
+        return times.astype("datetime64[ns]")
 
-    def recalculate_flight_characteristics(
-        self, i: int, point: "FlightPoint", next_point: "FlightPoint"
-    ) -> "FlightPoint":
+    def recalculate_flight_characteristics(self, columns: Columns) -> Columns:
         """
         Recalculate several flight characteristics for the new resampled flight path
         """
-        if next_point is not None:
-            point["course"] = self.calculate_course_at_point(point, next_point)
-            point["climb_angle"] = self.calculate_climb_angle(point, next_point)
-            point["segment_length"] = self.calculate_segment_length(next_point, point)
-        else:
-            point["segment_length"] = 0
-            point["course"] = 0
-            point["climb_angle"] = 0
-
-        point["level"] = Conversions().convert_altitude_to_pressure_bounded(
-            point["altitude_ft"],
-            self.config.PRESSURE_LEVELS[-1],
-            self.config.PRESSURE_LEVELS[0],
+        columns.update(self.calculate_geometry(columns))
+        columns.pop("distance")
+        columns["level"] = self.calculate_levels(columns["altitude_ft"])
+        columns["thrust"] = np.full(
+            len(columns["latitude"]), float(self.config.NOMINAL_THRUST)
         )
-        weather_at_point = self.weather_grid.get_weather_data_at_point(point)
-        temperature = self.weather_grid.get_temperature_at_point(weather_at_point)
-        wind_vector = self.weather_grid.get_wind_vector_at_point(weather_at_point)
-        point["thrust"] = self.config.NOMINAL_THRUST
-
-        point["true_airspeed"] = self.calculate_true_air_speed(
-            point["thrust"], temperature
+        temperature, wind_vector = self.weather_grid.get_weather_at_points(
+            columns["latitude"], columns["longitude"], columns["time"], columns["level"]
+        )
+        columns.update(
+            self.calculate_speeds(columns, columns["thrust"], temperature, wind_vector)
         )
-        crabbing_angle = self.calculate_crabbing_angle(point, wind_vector)
-        point["heading"] = point["course"] - crabbing_angle
-        point["ground_speed"] = self.calculate_ground_speed(point, wind_vector)
-        return point
+        return columns
 
-    def calculate_emission_data(
-        self,
-        i: int,
-        point: "FlightPoint",
-        previous_point: "FlightPoint",
-        emission: "Emission",
-        fuelflow: "FuelFlow",
-    ) -> "FlightPoint":
-        """
-        Calculate emissions for the new resampled flight path
-        """
-        if i == 0:
-            point["aircraft_mass"] = self.config.STARTING_WEIGHT
-            fuel_flow = self.calculate_fuel_flow(
-                point, point["aircraft_mass"], fuelflow
-            )
-            point["fuel_flow"] = fuel_flow
-            point["CO2"] = self.calculate_emissions(fuel_flow, emission)
-        else:
-            fuel_flow = self.calculate_fuel_flow(
-                point, previous_point["aircraft_mass"], fuelflow
-            )
-            time_elapsed = pd.Timedelta(point["time"] - previous_point["time"]).seconds
-            point["fuel_flow"] = fuel_flow
-            point["CO2"] = (
-                self.calculate_emissions(fuel_flow, emission) * time_elapsed
-            ) / 1000  # kg
-            point["aircraft_mass"] = (
-                previous_point["aircraft_mass"] - point["fuel_flow"] * time_elapsed
+    def calculate_emission_data(self, columns: Columns) -> Columns:
+        """
+        Calculate fuel flow, emissions and mass along the flight path.
+
+        The fuel flow at each point depends on the mass after the previous
+        point, so the masses are stepped forward in one pass over the columns.
+        """
+        elapsed_seconds = np.diff(columns["time"]).astype("timedelta64[s]")
+        # Matches pd.Timedelta.seconds, which excludes whole days
+        time_elapsed = np.concatenate(
+            ([0.0], elapsed_seconds.astype(np.int64) % 86400)
+        ).astype(float)
+
+        altitudes = columns["altitude_ft"].astype(float).tolist()
+        true_airspeeds = columns["true_airspeed"].tolist()
+        headings = columns["heading"].tolist()
+        fuel_flow = np.empty(len(time_elapsed))
+        aircraft_mass = np.empty(len(time_elapsed))
+        mass = float(self.config.STARTING_WEIGHT)
+        for i, elapsed in enumerate(time_elapsed.tolist()):
+            fuel_flow[i] = self.fuelflow.enroute(
+                mass=mass,
+                alt=altitudes[i],
+                tas=true_airspeeds[i],
+                path_angle=headings[i],
             )
+            mass -= fuel_flow[i] * elapsed
+            aircraft_mass[i] = mass
 
-        return point
+        co2 = self.calculate_emissions(fuel_flow)
+        columns["fuel_flow"] = fuel_flow
+        columns["CO2"] = np.concatenate(
+            ([co2[0]], co2[1:] * time_elapsed[1:] / 1000)  # kg
+        )
+        columns["aircraft_mass"] = aircraft_mass
+        return columns
 
     def resample(self, flight_path: "FlightPath") -> "FlightPath":
         """
         Resamples a coarse flight path to a path with points every minute
         """
-        flight_path_df = pd.DataFrame(flight_path)
-
-        flight = pc.Flight(
-            flight_path_df,
-        )
+        flight = flight_path.to_flight()
         resample_path = flight.resample_and_fill(
             "1min", nominal_rocd=4.45
         )  # Calculated through trial and error
         resample_df = resample_path.dataframe
         resample_df["altitude_ft"] = resample_df["altitude"] * 3.28084
-        resample_path = resample_df.to_dict("records")
-        return resample_path
-
-    def calculate_segment_length(
-        self, point: "FlightPoint", previous_point: "FlightPoint"
-    ) -> float:
-        """
-        Calculates the segment length between two points
-        """
-        flat_distance = gp.distance(
-            (point["latitude"], point["longitude"]),
-            (previous_point["latitude"], previous_point["longitude"]),
-        ).m
-        euclidean_distance = math.sqrt(
-            flat_distance**2
-            + ((point["altitude_ft"] - previous_point["altitude_ft"]) / 3.281) ** 2
-        )
-        return euclidean_distance
+        return FlightPath.from_dataframe(resample_df)
 
-    def calculate_time_at_point(
-        self, point: "FlightPoint", previous_point: "FlightPoint"
-    ) -> pd.Timedelta:
+    def calculate_geometry(self, columns: Columns) -> Columns:
         """
-        Calculates the time between two points
+        Calculates the course, climb angle, flat distance and segment length from
+        each point to the next. The last point has none.
         """
-        distance = gp.distance(
-            (point["latitude"], point["longitude"]),
-            (previous_point["latitude"], previous_point["longitude"]),
-        ).m
-        time_from_previous_point = pd.Timedelta(
-            seconds=distance / previous_point["ground_speed"]
+        latitudes, longitudes = columns["latitude"], columns["longitude"]
+        altitudes = columns["altitude_ft"]
+        distance = geodesy.distance(
+            latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:]
         )
-        return time_from_previous_point
+        change_in_altitude = np.diff(altitudes)
 
-    def calculate_bearing(self, p1: "Point2D", p2: "Point2D"):
-        """
-        Calculates the bearing between two points
-        """
-        lat1, lon1 = p1
-        lat2, lon2 = p2
-        delta_lon = lon2 - lon1
+        course = self.calculate_bearing(
+            (latitudes[:-1], longitudes[:-1]), (latitudes[1:], longitudes[1:])
+        )
+        climb_angle = np.arctan2(change_in_altitude / 3281, distance / 1000)
+        segment_length = np.sqrt(distance**2 + (change_in_altitude / 3.281) ** 2)
 
-        lat1 = np.radians(lat1)
-        lat2 = np.radians(lat2)
-        delta_lon = np.radians(delta_lon)
+        return {
+            "distance": distance,
+            "course": np.append(course, 0.0),
+            "climb_angle": np.append(climb_angle, 0.0),
+            "segment_length": np.append(segment_length, 0.0),
+        }
 
-        x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(
-            delta_lon
+    def calculate_levels(self, altitudes: np.ndarray) -> np.ndarray:
+        """
+        Calculates the pressure level of each altitude, bounded by the pressure
+        levels of the weather data
+        """
+        pressure = Conversions().calculate_pressure_from_altitude_ft(altitudes)
+        return np.maximum(
+            self.config.PRESSURE_LEVELS[-1],
+            np.minimum(pressure, self.config.PRESSURE_LEVELS[0]),
         )
-        y = np.sin(delta_lon) * np.cos(lat1)
-        z = np.arctan2(y, x) % (2 * np.pi)  # Convert to range [0, 2pi]
 
-        return z
-
-    def calculate_course_at_point(
-        self, point: "FlightPoint", next_point: "FlightPoint"
-    ) -> float:
+    def calculate_speeds(
+        self,
+        columns: Columns,
+        thrust: np.ndarray,
+        temperature: np.ndarray,
+        wind_vector: "WindVector",
+    ) -> Columns:
         """
-        Calculates the course between two points
+        Calculates the true airspeed, heading and ground speed at each point
         """
-        bearing = self.calculate_bearing(
-            (point["longitude"], point["latitude"]),
-            (next_point["longitude"], next_point["latitude"]),
+        true_airspeed = self.calculate_true_air_speed(thrust, temperature)
+        crabbing_angle = self.calculate_crabbing_angle(
+            columns["course"], true_airspeed, wind_vector
         )
-        return bearing
+        return {
+            "true_airspeed": true_airspeed,
+            "heading": columns["course"] - crabbing_angle,
+            "ground_speed": self.calculate_ground_speed(
+                columns["course"], columns["climb_angle"], true_airspeed, wind_vector
+            ),
+        }
+
+    def calculate_bearing(self, p1: "Point2D", p2: "Point2D") -> np.ndarray:
+        """
+        Calculates the bearing between two points
+        """
+        lat1, lon1 = p1
+        lat2, lon2 = p2
+        return geodesy.initial_bearing(lat1, lon1, lat2, lon2)
 
-    def calculate_true_air_speed(self, mach: float, temperature: float) -> float:
+    def calculate_true_air_speed(
+        self, mach: np.ndarray, temperature: np.ndarray
+    ) -> np.ndarray:
         """
         Calculates the true air speed for a given MACH value and temperature
         """
@@ -249,66 +270,37 @@ class AircraftPerformanceModel:
         return true_air_speed  # in m/s
 
     def calculate_crabbing_angle(
-        self, point: "FlightPoint", wind_vector: "WindVector"
-    ) -> float:
+        self, course: np.ndarray, true_airspeed: np.ndarray, wind_vector: "WindVector"
+    ) -> np.ndarray:
         """
         Calculates the crabbing angle accounting for wind
         """
         u, v = wind_vector
-        numerator = (v * np.sin(point["course"])) - (u * np.cos(point["course"]))
-        crabbing_angle = np.arcsin(numerator / point["true_airspeed"])
+        numerator = (v * np.sin(course)) - (u * np.cos(course))
+        crabbing_angle = np.arcsin(numerator / true_airspeed)
         return crabbing_angle
 
-    def calculate_climb_angle(
-        self, point: "FlightPoint", next_point: "FlightPoint"
-    ) -> float:
-        """
-        Calculates the climb angle between two points
-        """
-        change_in_altitude = next_point["altitude_ft"] - point["altitude_ft"]
-        change_in_altitude_km = change_in_altitude / 3281
-        distance = gp.distance(
-            (point["latitude"], point["longitude"]),
-            (next_point["latitude"], next_point["longitude"]),
-        ).km
-        angle = np.arctan2(change_in_altitude_km, distance)
-        return angle
-
     def calculate_ground_speed(
-        self, point: "FlightPoint", wind_vector: "WindVector"
-    ) -> float:
+        self,
+        course: np.ndarray,
+        climb_angle: np.ndarray,
+        true_airspeed: np.ndarray,
+        wind_vector: "WindVector",
+    ) -> np.ndarray:
         """
         Calculates the ground speed of a point, accounting for wind
         """
         u, v = wind_vector
-        climb_angle = point["climb_angle"]
-        first_component = v * np.cos(point["course"]) + u * np.sin(point["course"])
+        first_component = v * np.cos(course) + u * np.sin(course)
         second_component = np.sqrt(
-            np.power((point["true_airspeed"] * np.cos(climb_angle)), 2)
-            - np.power(
-                ((v * np.sin(point["course"])) - (u * np.cos(point["course"]))), 2
-            )
+            np.power((true_airspeed * np.cos(climb_angle)), 2)
+            - np.power(((v * np.sin(course)) - (u * np.cos(course))), 2)
         )
         ground_speed = first_component + second_component
         return ground_speed
 
-    def calculate_emissions(self, FF: float, emission: "Emission") -> float:
+    def calculate_emissions(self, FF: np.ndarray) -> np.ndarray:
         """
         Calculates the emissinos of a point
         """
-        return emission.co2(FF)  # g/s
-
-    def calculate_fuel_flow(
-        self, point: "FlightPoint", mass: float, fuelflow: "FuelFlow"
-    ) -> float:
-        """
-        Calculates the fuel flow of a point
-        """
-
-        FF = fuelflow.enroute(
-            mass=mass,
-            alt=point["altitude_ft"],
-            tas=point["true_airspeed"],
-            path_angle=point["heading"],
-        )
-        return FF
+        return np.asarray(self.emission.co2(FF), dtype=float)  # g/s
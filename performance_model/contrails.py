@@ -1,87 +1,245 @@
+import numpy as np
 import pandas as pd
 import requests
 import xarray as xr
-import pycontrails as pc
 from pycontrails.models.cocip import Cocip
 from pycontrails.models.humidity_scaling import ConstantHumidityScaling
 import os
+import shutil
 import tempfile
 import json
 from pycontrails.models.ps_model import PSGrid
 from rich import print
 import typing
 
-from utils import Conversions
+from utils import Conversions, GridInterpolator
+from utils.flight_path import NAT
+from cache import ROUTING_GRID_FIELDS, WEATHER_FIELDS
 
 if typing.TYPE_CHECKING:
+    from cache import Cache
     from .weather import WeatherGrid
     from config import Config
     from _types import FlightPath, FlightPoint, Point3D, Grid2D
 
 
+class CocipResult(typing.NamedTuple):
+    """
+    The CoCiP outputs of a flight: its total ef, its waypoints, and its
+    contrail segments if it formed any
+    """
+
+    ef: float
+    flight: pd.DataFrame
+    contrail: pd.DataFrame or None
+
+
 class CocipManager:
-    def __init__(self, weather_grid: "WeatherGrid", config: "Config"):
+    # Parameters CoCiP is run with, which its cached results are keyed by
+    PARAMS: dict = {"process_emissions": False, "radiative_heating_effects": True}
+    RHI_ADJ: float = 0.98
+
+    def __init__(
+        self, weather_grid: "WeatherGrid", config: "Config", cache: "Cache" = None
+    ):
         """
-        Wrapper around the CoCiP model from pycontrails
+        Wrapper around the CoCiP model from pycontrails. Results are kept in the
+        cache by a fingerprint of each trajectory, so re-evaluating a
+        trajectory on the same weather is a lookup.
         """
         self.config: "Config" = config
-        self.met: xr.Dataset = weather_grid.met
-        self.rad: xr.Dataset = weather_grid.rad
+        self.weather_grid: "WeatherGrid" = weather_grid
+        self.cache: "Cache" or None = cache if config.CACHE_COCIP else None
+        if self.cache is not None:
+            self.cache_key: str = self.cache.get_key(
+                "cocip",
+                ["AIRCRAFT_TYPE", "WINGSPAN", "N_ENGINES", "NOMINAL_ENGINE_EFFICIENCY"],
+                upstream=[
+                    weather_grid.cocip_met_key,
+                    weather_grid.cocip_rad_key,
+                    repr({**self.PARAMS, "rhi_adj": self.RHI_ADJ}),
+                ],
+            )
+
+    def get_cocip(self) -> Cocip:
+        """
+        Gets the CoCiP model, set up with the met and rad once and reused for
+        every evaluation
+        """
+        if not hasattr(self, "cocip"):
+            params = {
+                **self.PARAMS,
+                "humidity_scaling": ConstantHumidityScaling(rhi_adj=self.RHI_ADJ),
+                "max_age": self.config.COCIP_MAX_AGE,
+            }
+            self.cocip = Cocip(*self.weather_grid.get_cocip_weather(), params=params)
+        return self.cocip
+
+    def __getstate__(self) -> dict:
+        # The model is set up again where it's needed rather than pickled
+        state = self.__dict__.copy()
+        state.pop("cocip", None)
+        return state
 
     def calculate_ef_from_flight_path(self, flight_path: "FlightPath") -> tuple:
         """
         Runs CoCiP on a given flight path
         """
-        flight_path_df = pd.DataFrame(flight_path)
+        result = self.calculate_ef_from_flight_paths([flight_path])[0]
+        return result.ef, result.flight, result
 
+    def calculate_ef_from_flight_paths(
+        self, flight_paths: list["FlightPath"], waypoints: bool = True
+    ) -> list[CocipResult]:
+        """
+        Runs CoCiP on many flight paths at once, as one fleet, taking the
+        results of trajectories already evaluated from the cache. Without
+        waypoints only the total ef of each flight is returned and cached.
+        """
+        results = [None] * len(flight_paths)
+        paths = {}
+        for i, flight_path in enumerate(flight_paths):
+            if self.cache is None or not len(flight_path):
+                continue
+            key = self.cache.get_key(
+                "cocip", [], upstream=[self.cache_key, flight_path.fingerprint()]
+            )
+            path, cached = self.cache.lookup_entry("cocip", key)
+            if cached:
+                results[i] = self._load_result(path, waypoints)
+            paths[i] = path
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        evaluated = self._evaluate([flight_paths[i] for i in missing])
+        for i, result in zip(missing, evaluated):
+            results[i] = result
+            if i in paths:
+                self._store_result(paths[i], result, waypoints)
+            if not waypoints:
+                results[i] = CocipResult(result.ef, pd.DataFrame(), None)
+
+        return results
+
+    def _evaluate(self, flight_paths: list["FlightPath"]) -> list[CocipResult]:
+        """
+        Runs CoCiP on flight paths as one fleet
+        """
         attrs = {
-            "flight_id": 123,
             "aircraft_type": self.config.AIRCRAFT_TYPE,
             "wingspan": self.config.WINGSPAN,
             "nvpm_ei_n": 1.897264e15,
             "n_engine": self.config.N_ENGINES,
             "engine_efficiency": self.config.NOMINAL_ENGINE_EFFICIENCY,
         }
+        # Empty flights are dropped from fleets, so aren't evaluated
+        flight_ids = [
+            i for i, flight_path in enumerate(flight_paths) if len(flight_path)
+        ]
+        flights = [
+            flight_paths[i].to_flight(attrs={**attrs, "flight_id": i})
+            for i in flight_ids
+        ]
 
-        flight = pc.Flight(data=flight_path_df, flight_id=123, attrs=attrs)
-
-        params = {
-            "process_emissions": False,
-            "radiative_heating_effects": True,
-            "humidity_scaling": ConstantHumidityScaling(rhi_adj=0.98),
-        }
-        cocip = Cocip(self.met, self.rad, params=params)
-        output_flight = cocip.eval(source=flight)
+        results = [CocipResult(0, pd.DataFrame(), None)] * len(flight_paths)
+        if not flights:
+            return results
+
+        cocip = self.get_cocip()
+        # Evaluations which form no contrails leave the previous ones in place
+        cocip.contrail = None
+        output_flights = cocip.eval(source=flights)
+        contrail = cocip.contrail
+        for flight_id, output_flight in zip(flight_ids, output_flights):
+            df = output_flight.dataframe
+            if not df["ef"].empty:
+                ef = df["ef"].sum()
+            else:
+                ef = 0
+            flight_contrail = None
+            if contrail is not None:
+                flight_contrail = contrail[contrail["flight_id"] == flight_id]
+                flight_contrail = flight_contrail.reset_index(drop=True)
+            results[flight_id] = CocipResult(ef, df, flight_contrail)
 
-        df = output_flight.dataframe
-        if not df["ef"].empty:
-            ef = df["ef"].sum()
-        else:
-            ef = 0
+        return results
 
-        return ef, df, cocip
+    def _load_result(self, path: str, waypoints: bool) -> CocipResult or None:
+        """
+        Loads a cached result, or None if it has gone or its waypoints are
+        needed but weren't cached
+        """
+        # Another process may evict the result after it was looked up
+        try:
+            with open(os.path.join(path, "result.json"), "r") as f:
+                ef = json.load(f)["ef"]
+        except FileNotFoundError:
+            return None
+        if not waypoints:
+            return CocipResult(ef, pd.DataFrame(), None)
+
+        flight_path = os.path.join(path, "flight.nc")
+        if not os.path.exists(flight_path):
+            return None
+        with xr.open_dataset(flight_path) as flight:
+            df = flight.load().to_dataframe().reset_index(drop=True)
+        contrail = None
+        contrail_path = os.path.join(path, "contrail.nc")
+        if os.path.exists(contrail_path):
+            with xr.open_dataset(contrail_path) as dataset:
+                contrail = dataset.load().to_dataframe().reset_index(drop=True)
+        return CocipResult(ef, df, contrail)
+
+    def _store_result(self, path: str, result: CocipResult, waypoints: bool) -> None:
+        """
+        Caches the total ef of a result, and its waypoints and contrail segments
+        as columns in netCDF files if wanted
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        with open(os.path.join(tmp_path, "result.json"), "w") as f:
+            json.dump({"ef": float(result.ef)}, f)
+        if waypoints:
+            xr.Dataset.from_dataframe(result.flight.reset_index(drop=True)).to_netcdf(
+                os.path.join(tmp_path, "flight.nc")
+            )
+            if result.contrail is not None:
+                xr.Dataset.from_dataframe(
+                    result.contrail.reset_index(drop=True)
+                ).to_netcdf(os.path.join(tmp_path, "contrail.nc"))
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        self.cache.store_entry(path)
 
 
 class PSGridManager:
-    def __init__(self, weather_grid: "WeatherGrid", config: "Config"):
+    DIMS: list[str] = ["time", "level", "latitude", "longitude"]
+
+    def __init__(self, weather_grid: "WeatherGrid", config: "Config", cache: "Cache"):
         """
         Retrieves a performance grid for a given weather grid
         """
         self.config: "Config" = config
+        self.cache: "Cache" = cache
+        self.cache_key: str = cache.get_key(
+            "ps_grid", ["AIRCRAFT_TYPE"], upstream=[weather_grid.met_key]
+        )
         self.ps_grid: xr.Dataset = self._get_ps_grid(weather_grid)
 
     def _get_ps_grid(self, weather_grid: "WeatherGrid") -> xr.Dataset:
         """
         Calculates the PS grid, or retrieves it if it already exists
         """
-        if os.path.exists("data/ps_grid.nc"):
-            return xr.open_dataset("data/ps_grid.nc")
+        path, cached = self.cache.lookup("ps_grid", self.cache_key, ".nc")
+        if cached:
+            return xr.open_dataset(path)
         else:
             ps_grid = PSGrid(
                 weather_grid.met, aircraft_type=self.config.AIRCRAFT_TYPE
             ).eval()
-            ps_grid.data.to_netcdf("data/ps_grid.nc")
-            return xr.open_dataset("data/ps_grid.nc")
+            ps_grid.data.to_netcdf(path)
+            self.cache.store(path)
+            return xr.open_dataset(path)
 
     def get_performance_data_at_point(self, point: "FlightPoint") -> xr.Dataset:
         """
@@ -102,14 +260,71 @@ class PSGridManager:
 
         return performance_data
 
+    def get_interpolator(self) -> GridInterpolator:
+        """
+        Gets an interpolator for the fuel flow over time, level, latitude and
+        longitude
+        """
+        if not hasattr(self, "interpolator"):
+            self.interpolator = GridInterpolator.from_dataarrays(
+                [self.ps_grid["fuel_flow"]], self.DIMS
+            )
+        return self.interpolator
+
+    def get_fuel_flow_at_points(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        altitudes_ft: np.ndarray,
+        times: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Retrieves the fuel flow at many points in one lookup, with altitudes
+        bounded to the pressure levels as in get_performance_data_at_point
+        """
+        pressures = Conversions().calculate_pressure_from_altitude_ft(
+            np.asarray(altitudes_ft, dtype=float)
+        )
+        levels = np.maximum(
+            self.config.PRESSURE_LEVELS[-1],
+            np.minimum(pressures, self.config.PRESSURE_LEVELS[0]),
+        )
+        interpolator = self.get_interpolator()
+        index = interpolator.get_index([times, levels, latitudes, longitudes])
+        return interpolator.interpolate(index)[0]
+
 
 class ContrailGrid:
+    DIMS: list[str] = ["time", "flight_level", "latitude", "longitude"]
+
     def __init__(self, contrail_grid: xr.Dataset):
         """
         Wrapper around the 4D contrail grid dataset
         """
         self.contrail_grid: xr.Dataset = contrail_grid
 
+    def get_interpolator(self) -> GridInterpolator:
+        """
+        Gets an interpolator for the ef_per_m over time, flight level, latitude
+        and longitude
+        """
+        if not hasattr(self, "interpolator"):
+            self.interpolator = GridInterpolator.from_dataarrays(
+                [self.contrail_grid["ef_per_m"]], self.DIMS
+            )
+        return self.interpolator
+
+    def get_spatial_interpolator(self) -> GridInterpolator:
+        """
+        Gets an interpolator for the ef_per_m over flight level, latitude and
+        longitude, with each time as a separate variable
+        """
+        if not hasattr(self, "spatial_interpolator"):
+            self.spatial_interpolator = GridInterpolator.from_dataarrays(
+                [self.contrail_grid["ef_per_m"]], self.DIMS[1:]
+            )
+        return self.spatial_interpolator
+
     def interpolate_contrail_point(
         self,
         point: "Point3D",
@@ -117,11 +332,39 @@ class ContrailGrid:
         """
         Interpolates the ef_per_m at a flight point
         """
-        da = self.contrail_grid["ef_per_m"]
-        ef_per_m = da.interp(
-            latitude=point[0], longitude=point[1], flight_level=point[2] / 100
+        return self.interpolate_contrail_points(np.array([point[:3]]))[0].item()
+
+    def interpolate_contrail_points(self, points: np.ndarray) -> np.ndarray:
+        """
+        Interpolates the ef_per_m at an array of (lat, lon, altitude) points,
+        summed over every time
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        interpolator = self.get_spatial_interpolator()
+        index = interpolator.get_index(
+            [points[:, 2] / 100, points[:, 0], points[:, 1]], out_of_bounds="nan"
+        )
+        return np.nansum(interpolator.interpolate(index), axis=0)
+
+    def get_times(self) -> np.ndarray:
+        """
+        Gets the times of the grid as nanoseconds since the epoch
+        """
+        return (
+            self.contrail_grid["time"].values.astype("datetime64[ns]").astype(np.int64)
         )
-        return ef_per_m.sum().item()
+
+    def interpolate_contrail_points_by_time(self, points: np.ndarray) -> np.ndarray:
+        """
+        Interpolates the ef_per_m at an array of (lat, lon, altitude) points at
+        every time of the grid, of shape (n_points, n_times)
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        interpolator = self.get_spatial_interpolator()
+        index = interpolator.get_index(
+            [points[:, 2] / 100, points[:, 0], points[:, 1]], out_of_bounds="nan"
+        )
+        return np.nan_to_num(interpolator.interpolate(index).T)
 
     def interpolate_contrail_grid(
         self,
@@ -130,30 +373,71 @@ class ContrailGrid:
         """
         Interpolates a flight path against the contral grid, to get a total ef for the flight
         """
-        da = self.contrail_grid["ef_per_m"]
+        return self.interpolate_contrail_grids([flight_path])[0].item()
 
-        flight_path = pd.DataFrame(
-            flight_path,
-            columns=["latitude", "longitude", "altitude_ft", "time", "segment_length"],
+    def interpolate_contrail_grids(
+        self, flight_paths: list["FlightPath"]
+    ) -> np.ndarray:
+        """
+        Interpolates many flight paths against the contrail grid at once, to get
+        a total ef for each flight
+        """
+        shape = (
+            len(flight_paths),
+            max((len(flight_path) for flight_path in flight_paths), default=0),
         )
-
-        fl_ds = flight_path.copy()
-        fl_ds.pop("segment_length")
-        fl_ds["flight_level"] = fl_ds.pop("altitude_ft") / 100
-        fl_ds = xr.Dataset.from_dataframe(fl_ds)
-
-        ef_per_m = da.interp(**fl_ds.data_vars)
-        total_flight = ef_per_m * flight_path["segment_length"]
-
-        return total_flight.sum().item()
+        columns = {
+            field: np.full(shape, np.nan)
+            for field in ["time", "altitude_ft", "latitude", "longitude"]
+        }
+        columns["segment_length"] = np.zeros(shape)
+        for i, flight_path in enumerate(flight_paths):
+            for field, values in columns.items():
+                values[i, : len(flight_path)] = flight_path.columns[field]
+            times = flight_path.columns["time"]
+            columns["time"][i, : len(flight_path)][times == NAT] = np.nan
+        return self.interpolate_contrail_batch(**columns)
+
+    def interpolate_contrail_batch(
+        self,
+        time: np.ndarray,
+        altitude_ft: np.ndarray,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        segment_length: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Interpolates a stack of flight paths, as (n_paths, n_points) arrays with
+        times in nanoseconds since the epoch, against the contrail grid. Gets
+        the total ef of each path, weighting the ef_per_m by segment length.
+        Points outside the grid add nothing, and padding points should have a
+        segment length of zero.
+        """
+        interpolator = self.get_interpolator()
+        index = interpolator.get_index(
+            [
+                np.ravel(time),
+                np.ravel(altitude_ft) / 100,
+                np.ravel(latitude),
+                np.ravel(longitude),
+            ],
+            out_of_bounds="nan",
+        )
+        ef_per_m = interpolator.interpolate(index)[0].reshape(np.shape(latitude))
+        return np.nansum(ef_per_m * segment_length, axis=-1)
 
 
 class ContrailGridManager:
-    def __init__(self, routing_grid: "Grid2D", config: "Config"):
+    def __init__(self, routing_grid: "Grid2D", config: "Config", cache: "Cache"):
         """
         Wrapper for the contrail grid and contrail polys
         """
         self.config: "Config" = config
+        self.cache: "Cache" = cache
+        self.cache_key: str = cache.get_key(
+            "contrail_grid",
+            ROUTING_GRID_FIELDS + WEATHER_FIELDS + ["FLIGHT_LEVELS", "AIRCRAFT_TYPE"],
+        )
         self.routing_grid: "Grid2D" = routing_grid
         self.contrail_polys: dict = self._get_contrail_polys()
         self.contrail_grid: ContrailGrid = ContrailGrid(self._get_contrail_grid())
@@ -162,24 +446,28 @@ class ContrailGridManager:
         """
         Downloads the contrail grid or retrieves it
         """
-        if os.path.exists("data/contrail_grid.nc"):
-            return xr.open_dataset("data/contrail_grid.nc")
+        path, cached = self.cache.lookup("contrail_grid", self.cache_key, ".nc")
+        if cached:
+            return xr.open_dataset(path)
         else:
             contrail_grid = self._download_contrail_grid()
-            contrail_grid.to_netcdf("data/contrail_grid.nc")
+            contrail_grid.to_netcdf(path)
+            self.cache.store(path)
             return contrail_grid
 
     def _get_contrail_polys(self) -> dict:
         """
         Downloads the contrail polys or retrieves it
         """
-        if os.path.exists("data/contrail_polys.json"):
-            with open("data/contrail_polys.json", "r") as f:
+        path, cached = self.cache.lookup("contrail_polys", self.cache_key, ".json")
+        if cached:
+            with open(path, "r") as f:
                 return json.load(f)
         else:
             contrail_polys = self._download_contrail_grid(format="geojson")
-            with open("data/contrail_polys.json", "w") as f:
+            with open(path, "w") as f:
                 json.dump(contrail_polys, f)
+            self.cache.store(path)
             return contrail_polys
 
     def _download_contrail_grid(self, format: str = "netcdf") -> xr.Dataset or dict:
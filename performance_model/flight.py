@@ -1,6 +1,7 @@
 import random
 import pandas as pd
-from utils import Conversions
+import numpy as np
+from utils import Conversions, FlightPath
 import typing
 
 if typing.TYPE_CHECKING:
@@ -24,7 +25,7 @@ class Flight:
         self.performance_model: "PerformanceModel" = (
             routing_graph_manager.get_performance_model()
         )
-        self.flight_path: "FlightPath" = flight_path
+        self.flight_path: "FlightPath" = FlightPath.coerce(flight_path)
         self.config: "Config" = config
         self.indices: "IndexPath" = []
         self.objectives: "Objectives" or None = None
@@ -39,6 +40,15 @@ class Flight:
         point["aircraft_mass"] = self.config.STARTING_WEIGHT
         self.flight_path[0] = point
 
+    def set_index_path(self, indices: "IndexPath") -> None:
+        """
+        Sets the whole flight path from an index path, starting at departure
+        """
+        self.indices = list(indices)
+        self.flight_path = self.routing_graph_manager.convert_index_path(indices)
+        self.flight_path[0]["time"] = self.config.DEPARTURE_DATE
+        self.flight_path[0]["aircraft_mass"] = self.config.STARTING_WEIGHT
+
     def run_performance_model(self) -> None:
         """
         Runs the performance model on the flight path
@@ -69,6 +79,29 @@ class Flight:
         self.objectives = objectives
         return objectives
 
+    @staticmethod
+    def calculate_batch_objectives(
+        flights: list["Flight"], skip_deferred: bool = False
+    ) -> None:
+        """
+        Calculates the objective values for many flights, running each objective
+        over all of their flight paths at once. Deferred objectives can be
+        skipped, to be evaluated later.
+        """
+        if not flights:
+            return
+        config = flights[0].config
+        flight_paths = [flight.flight_path for flight in flights]
+        for flight in flights:
+            flight.objectives = {}
+        for objective in config.OBJECTIVES:
+            objective = objective(flights[0].performance_model, config)
+            if skip_deferred and objective.deferred:
+                continue
+            objective_values = objective._run_objective_functions(flight_paths)
+            for flight, objective_value in zip(flights, objective_values):
+                flight.objectives[str(objective)] = objective_value
+
 
 class RealFlight(Flight):
     def __init__(
@@ -82,32 +115,31 @@ class RealFlight(Flight):
             [],
             config,
         )
-        self.flight_path = pd.read_csv(f"data/{flight_name}")
+        self.flight_path_df: pd.DataFrame = pd.read_csv(f"data/{flight_name}")
         self.flight_path: "FlightPath" = self.convert_real_flight_path()
         self.config: "Config" = config
 
     def convert_real_flight_path(self) -> "FlightPath":
         """
-        Converts a dataframe of a real flight path to a list of dictionaries
+        Converts a dataframe of a real flight path to a FlightPath
         """
-        path = []
-        for _, row in self.flight_path.iterrows():
-            path_point = {
-                "latitude": row["latitude"],
-                "longitude": row["longitude"],
-                "altitude_ft": row["altitude_ft"],
+        df = self.flight_path_df
+        pressure = Conversions().calculate_pressure_from_altitude_ft(
+            df["altitude_ft"].values
+        )
+        return FlightPath(
+            {
+                "latitude": df["latitude"].values,
+                "longitude": df["longitude"].values,
+                "altitude_ft": df["altitude_ft"].values,
                 "thrust": self.config.NOMINAL_THRUST,
-                "time": row["time"],
-                "level": Conversions().convert_altitude_to_pressure_bounded(
-                    row["altitude_ft"],
+                "time": df["time"].values,
+                "level": np.maximum(
                     self.config.PRESSURE_LEVELS[-1],
-                    self.config.PRESSURE_LEVELS[0],
+                    np.minimum(pressure, self.config.PRESSURE_LEVELS[0]),
                 ),
             }
-
-            path.append(path_point)
-
-        return path
+        )
 
 
 class RandomFlight(Flight):
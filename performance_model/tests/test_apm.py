@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 import pandas as pd
 from ..apm import AircraftPerformanceModel
 
@@ -6,14 +7,12 @@ from ..apm import AircraftPerformanceModel
 class TestAircraftPerformanceModel(unittest.TestCase):
     def setUp(self):
         class MockWeatherGrid:
-            def get_weather_data_at_point(self, point):
-                return {"temperature": 25, "wind_u": 10, "wind_v": 5}
+            def get_weather_at_points(self, latitudes, longitudes, times, levels):
+                n = len(latitudes)
+                return np.full(n, 25.0), (np.full(n, 10.0), np.full(n, 5.0))
 
-            def get_temperature_at_point(self, weather_data):
-                return weather_data["temperature"]
-
-            def get_wind_vector_at_point(self, weather_data):
-                return weather_data["wind_u"], weather_data["wind_v"]
+            def get_weather_times(self):
+                return np.array([0], dtype=np.int64)
 
         class MockConfig:
             DEPARTURE_DATE = pd.Timestamp(
@@ -24,6 +23,7 @@ class TestAircraftPerformanceModel(unittest.TestCase):
             AIRCRAFT_TYPE = "A320"
             PRESSURE_LEVELS = [0, 1, 2, 3]
             NOMINAL_THRUST = 1
+            WEATHER_INTERPOLATION = "linear"
 
         self.mock_weather_grid = MockWeatherGrid()
         self.mock_config = MockConfig()
@@ -46,3 +46,100 @@ class TestAircraftPerformanceModel(unittest.TestCase):
         self.assertIn("fuel_flow", flight_path[0])
         self.assertIn("CO2", flight_path[0])
         self.assertIn("aircraft_mass", flight_path[0])
+
+    def test_calculate_geometry(self):
+        apm = AircraftPerformanceModel(self.mock_weather_grid, self.mock_config)
+        # Due east along the equator, then due north
+        geometry = apm.calculate_geometry(
+            {
+                "latitude": np.array([0.0, 0.0, 1.0]),
+                "longitude": np.array([0.0, 1.0, 1.0]),
+                "altitude_ft": np.array([35000.0, 35000.0, 35000.0]),
+            }
+        )
+        np.testing.assert_allclose(geometry["course"], [np.pi / 2, 0, 0], atol=1e-9)
+        np.testing.assert_allclose(geometry["climb_angle"], [0, 0, 0])
+
+    def test_mass_matches_fuel_burned(self):
+        apm = AircraftPerformanceModel(self.mock_weather_grid, self.mock_config)
+        flight_path = [
+            {"latitude": 0, "longitude": 0, "altitude_ft": 30000, "thrust": 1},
+            {"latitude": 0.2, "longitude": 0.2, "altitude_ft": 31000, "thrust": 1},
+            {"latitude": 0.4, "longitude": 0.4, "altitude_ft": 31000, "thrust": 1},
+        ]
+        flight_path = apm.calculate_flight_characteristics(flight_path)
+        self.assertEqual(flight_path[0]["aircraft_mass"], 100000)
+        for previous_point, point in zip(flight_path, flight_path[1:]):
+            time_elapsed = (point["time"] - previous_point["time"]).seconds
+            self.assertGreater(time_elapsed, 0)
+            self.assertAlmostEqual(
+                point["aircraft_mass"],
+                previous_point["aircraft_mass"] - point["fuel_flow"] * time_elapsed,
+            )
+
+    def test_matches_point_by_point(self):
+        departure = self.mock_config.DEPARTURE_DATE
+
+        class MockChangingWeatherGrid:
+            # Hourly weather, where the wind strengthens over time
+            def get_weather_times(self):
+                hours = np.arange(-1, 4) * np.timedelta64(1, "h")
+                times = np.datetime64(departure.floor("h"), "ns") + hours
+                return times.astype(np.int64)
+
+            def get_weather_at_points(self, latitudes, longitudes, times, levels):
+                weather_times = self.get_weather_times()
+                times = np.asarray(times, dtype="datetime64[ns]").astype(np.int64)
+                times = np.clip(times, weather_times[0], weather_times[-1])
+                hours = (times - weather_times[0]) / 3.6e12
+                u = 20 + 60 * hours + np.asarray(longitudes)
+                return 220 + np.asarray(latitudes), (u, np.full(len(u), 5.0))
+
+        weather_grid = MockChangingWeatherGrid()
+        apm = AircraftPerformanceModel(weather_grid, self.mock_config)
+        flight_path = [
+            {
+                "latitude": 0.3 * i,
+                "longitude": -0.3 * i,
+                "altitude_ft": 35000,
+                "thrust": 1,
+            }
+            for i in range(40)
+        ]
+        result = apm.calculate_flight_characteristics(flight_path)
+
+        # Step through the points one at a time, as the APM used to
+        geometry = apm.calculate_geometry(apm.get_columns(result, flight_path[0]))
+        times = [departure]
+        for i in range(len(flight_path) - 1):
+            temperature, (u, v) = weather_grid.get_weather_at_points(
+                [flight_path[i]["latitude"]],
+                [flight_path[i]["longitude"]],
+                [np.datetime64(times[i], "ns")],
+                [0],
+            )
+            true_airspeed = apm.calculate_true_air_speed(1, temperature[0])
+            ground_speed = apm.calculate_ground_speed(
+                geometry["course"][i],
+                geometry["climb_angle"][i],
+                true_airspeed,
+                (u[0], v[0]),
+            )
+            time_elapsed = pd.Timedelta(
+                seconds=geometry["distance"][i] / ground_speed
+            ).round("s")
+            times.append(times[i] + time_elapsed)
+        self.assertEqual([point["time"] for point in result], times)
+
+        mass = self.mock_config.STARTING_WEIGHT
+        for i, point in enumerate(result):
+            fuel_flow = apm.fuelflow.enroute(
+                mass=mass,
+                alt=point["altitude_ft"],
+                tas=point["true_airspeed"],
+                path_angle=point["heading"],
+            )
+            if i > 0:
+                mass -= fuel_flow * (times[i] - times[i - 1]).seconds
+            self.assertAlmostEqual(point["fuel_flow"], fuel_flow)
+            self.assertAlmostEqual(point["aircraft_mass"], mass, places=6)
@@ -0,0 +1,242 @@
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import xarray as xr
+from utils import FlightPath
+from cache import Cache
+from ..contrails import CocipManager, ContrailGrid, PSGridManager
+
+
+class TestContrailGrid(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        coords = {
+            "longitude": np.arange(-10, 10.5, 0.5),
+            "latitude": np.arange(40, 60.5, 0.5),
+            "flight_level": [310, 330, 350],
+            "time": pd.date_range("2024-01-31 12:00", periods=4, freq="1h"),
+        }
+        shape = tuple(len(values) for values in coords.values())
+        self.dataset = xr.Dataset(
+            {"ef_per_m": (list(coords), rng.normal(size=shape))}, coords=coords
+        )
+        self.contrail_grid = ContrailGrid(self.dataset)
+        self.flight_paths = []
+        for no_of_points in [5, 3, 8]:
+            self.flight_paths.append(
+                FlightPath(
+                    {
+                        "latitude": rng.uniform(41, 59, no_of_points),
+                        "longitude": rng.uniform(-9, 9, no_of_points),
+                        "altitude_ft": rng.uniform(31000, 35000, no_of_points),
+                        "time": pd.Timestamp("2024-01-31 12:00")
+                        + pd.to_timedelta(rng.uniform(0, 3 * 3600, no_of_points), "s"),
+                        "segment_length": rng.uniform(0, 1e5, no_of_points),
+                    }
+                )
+            )
+
+    def get_expected_ef(self, flight_path: FlightPath) -> float:
+        ef_per_m = self.dataset["ef_per_m"].interp(
+            latitude=xr.DataArray(flight_path["latitude"]),
+            longitude=xr.DataArray(flight_path["longitude"]),
+            flight_level=xr.DataArray(flight_path["altitude_ft"] / 100),
+            time=xr.DataArray(flight_path["time"]),
+        )
+        return np.nansum(ef_per_m.values * flight_path["segment_length"])
+
+    def test_interpolate_contrail_grids(self):
+        ef = self.contrail_grid.interpolate_contrail_grids(self.flight_paths)
+        np.testing.assert_allclose(
+            ef, [self.get_expected_ef(flight_path) for flight_path in self.flight_paths]
+        )
+        self.assertAlmostEqual(
+            self.contrail_grid.interpolate_contrail_grid(self.flight_paths[1]), ef[1]
+        )
+
+    def test_missing_times(self):
+        # Points without a time don't contribute to the ef
+        flight_path = self.flight_paths[0].copy()
+        flight_path[2]["time"] = None
+        expected = self.get_expected_ef(flight_path[:2]) + self.get_expected_ef(
+            flight_path[3:]
+        )
+        np.testing.assert_allclose(
+            self.contrail_grid.interpolate_contrail_grids([flight_path]), [expected]
+        )
+
+    def test_interpolate_contrail_points_by_time(self):
+        points = np.column_stack(
+            (
+                self.flight_paths[2]["latitude"],
+                self.flight_paths[2]["longitude"],
+                self.flight_paths[2]["altitude_ft"],
+            )
+        )
+        ef_per_m = self.contrail_grid.interpolate_contrail_points_by_time(points)
+        self.assertEqual(ef_per_m.shape, (8, 4))
+        np.testing.assert_allclose(
+            ef_per_m.sum(axis=1), self.contrail_grid.interpolate_contrail_points(points)
+        )
+        expected = (
+            self.dataset["ef_per_m"]
+            .isel(time=2)
+            .interp(
+                latitude=xr.DataArray(points[:, 0]),
+                longitude=xr.DataArray(points[:, 1]),
+                flight_level=xr.DataArray(points[:, 2] / 100),
+            )
+        )
+        np.testing.assert_allclose(ef_per_m[:, 2], expected.values)
+
+
+class MockConfig:
+    PRESSURE_LEVELS = [300, 250, 200]
+
+
+class TestPSGridManager(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        coords = {
+            "longitude": np.arange(-10, 10.5, 0.5),
+            "latitude": np.arange(40, 60.5, 0.5),
+            "level": [200, 250, 300],
+            "time": pd.date_range("2024-01-31 12:00", periods=4, freq="1h"),
+        }
+        shape = tuple(len(values) for values in coords.values())
+        self.ps_grid = PSGridManager.__new__(PSGridManager)
+        self.ps_grid.config = MockConfig()
+        self.ps_grid.ps_grid = xr.Dataset(
+            {"fuel_flow": (list(coords), rng.uniform(1, 3, shape))}, coords=coords
+        )
+
+    def test_get_fuel_flow_at_points(self):
+        points = [
+            {
+                "latitude": 50.2,
+                "longitude": -3.1,
+                "altitude_ft": 34000,
+                "time": pd.Timestamp("2024-01-31 13:20"),
+            },
+            {
+                "latitude": 41.7,
+                "longitude": 8.4,
+                "altitude_ft": 25000,  # below the lowest level
+                "time": pd.Timestamp("2024-01-31 12:05"),
+            },
+        ]
+        fuel_flow = self.ps_grid.get_fuel_flow_at_points(
+            np.array([point["latitude"] for point in points]),
+            np.array([point["longitude"] for point in points]),
+            np.array([point["altitude_ft"] for point in points]),
+            pd.DatetimeIndex([point["time"] for point in points]),
+        )
+        np.testing.assert_allclose(
+            fuel_flow,
+            [
+                self.ps_grid.get_performance_data_at_point(point)["fuel_flow"].item()
+                for point in points
+            ],
+        )
+
+
+class MockCocip:
+    def __init__(self):
+        self.no_of_evaluations = 0
+        self.contrail = "stale"
+
+    def eval(self, source):
+        self.no_of_evaluations += 1
+        for flight in source:
+            flight["ef"] = flight["latitude"] * 10
+        self.contrail = pd.DataFrame(
+            {"flight_id": [flight.attrs["flight_id"] for flight in source]}
+        )
+        return source
+
+
+class MockCocipConfig:
+    AIRCRAFT_TYPE = "B77W"
+    WINGSPAN = 60.920
+    N_ENGINES = 4
+    NOMINAL_ENGINE_EFFICIENCY = 0.33
+    CACHE_COCIP = False
+    CACHE_MAX_SIZE = 1024**2
+
+
+class MockWeatherGrid:
+    cocip_met_key = "met"
+    cocip_rad_key = "rad"
+
+
+class TestCocipManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = MockCocipConfig()
+        self.config.CACHE_DIRECTORY = self.directory.name
+        self.cocip_manager = CocipManager(MockWeatherGrid(), self.config)
+        self.cocip_manager.cocip = MockCocip()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_cached_manager(self) -> CocipManager:
+        self.config.CACHE_COCIP = True
+        cocip_manager = CocipManager(MockWeatherGrid(), self.config, Cache(self.config))
+        cocip_manager.cocip = MockCocip()
+        return cocip_manager
+
+    def get_flight_path(self, latitudes: list[float]) -> FlightPath:
+        return FlightPath(
+            {
+                "latitude": np.array(latitudes, dtype=float),
+                "longitude": np.zeros(len(latitudes)),
+                "altitude": np.full(len(latitudes), 10000.0),
+                "time": pd.date_range("2024-01-31 12:00", periods=len(latitudes)),
+            }
+        )
+
+    def test_calculate_ef_from_flight_paths(self):
+        results = self.cocip_manager.calculate_ef_from_flight_paths(
+            [
+                self.get_flight_path([1, 2]),
+                FlightPath(),
+                self.get_flight_path([3, 4, 5]),
+            ]
+        )
+        # Every flight is evaluated in one run, in order
+        self.assertEqual(self.cocip_manager.cocip.no_of_evaluations, 1)
+        self.assertEqual([result.ef for result in results], [30, 0, 120])
+        self.assertEqual(list(results[2].contrail["flight_id"]), [2])
+        self.assertIsNone(results[1].contrail)
+
+    def test_cached_results(self):
+        flight_paths = [self.get_flight_path([1, 2]), self.get_flight_path([3, 4, 5])]
+        results = self.get_cached_manager().calculate_ef_from_flight_paths(flight_paths)
+
+        # A new manager finds every trajectory in the cache
+        cocip_manager = self.get_cached_manager()
+        cached_results = cocip_manager.calculate_ef_from_flight_paths(flight_paths)
+        self.assertEqual(cocip_manager.cocip.no_of_evaluations, 0)
+        for i, (result, cached_result) in enumerate(zip(results, cached_results)):
+            self.assertEqual(cached_result.ef, result.ef)
+            pd.testing.assert_frame_equal(
+                cached_result.flight, result.flight, check_dtype=False
+            )
+            self.assertEqual(list(cached_result.contrail["flight_id"]), [i])
+
+    def test_cached_results_without_waypoints(self):
+        flight_path = self.get_flight_path([1, 2])
+        cocip_manager = self.get_cached_manager()
+        cocip_manager.calculate_ef_from_flight_paths([flight_path], waypoints=False)
+        [result] = cocip_manager.calculate_ef_from_flight_paths(
+            [flight_path], waypoints=False
+        )
+        self.assertEqual(result.ef, 30)
+        self.assertEqual(cocip_manager.cocip.no_of_evaluations, 1)
+
+        # Waypoints which weren't cached are evaluated again
+        [result] = cocip_manager.calculate_ef_from_flight_paths([flight_path])
+        self.assertEqual(cocip_manager.cocip.no_of_evaluations, 2)
+        self.assertEqual(len(result.flight), 2)
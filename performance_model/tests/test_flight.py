@@ -1,4 +1,5 @@
 import unittest
+import pandas as pd
 from unittest.mock import MagicMock
 from ..flight import Flight, RealFlight
 from config import Config
@@ -20,7 +21,7 @@ class TestFlight(unittest.TestCase):
                 return MagicMock()
 
         class MockConfig(Config):
-            DEPARTURE_DATE = "2024-01-01"
+            DEPARTURE_DATE = pd.Timestamp("2024-01-01")
             STARTING_WEIGHT = 100000
 
         self.mock_routing_graph_manager = MockRoutingGraphManager()
@@ -35,7 +36,7 @@ class TestFlight(unittest.TestCase):
         self.assertEqual(flight.flight_path[0]["longitude"], 0)
         self.assertEqual(flight.flight_path[0]["altitude_ft"], 0)
         self.assertEqual(flight.flight_path[0]["thrust"], 1)
-        self.assertEqual(flight.flight_path[0]["time"], "2024-01-01")
+        self.assertEqual(flight.flight_path[0]["time"], pd.Timestamp("2024-01-01"))
         self.assertEqual(flight.flight_path[0]["aircraft_mass"], 100000)
 
     def test_run_performance_model(self):
@@ -0,0 +1,226 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import xarray as xr
+from ..weather import WeatherGrid, WeatherTable
+
+
+class TestWeatherTable(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        coords = {
+            "longitude": np.arange(-10, 10.5, 0.5),
+            "latitude": np.arange(60, 40, -0.5),
+            "level": [300, 250, 200],
+            "time": pd.date_range("2024-01-31 12:00", periods=4, freq="1h"),
+        }
+        shape = tuple(len(values) for values in coords.values())
+        self.dataset = xr.Dataset(
+            {
+                variable: (list(coords), rng.normal(size=shape))
+                for variable in ["air_temperature", "eastward_wind", "northward_wind"]
+            },
+            coords=coords,
+        )
+        self.table = WeatherTable(
+            self.dataset, ["air_temperature", "eastward_wind", "northward_wind"]
+        )
+        n = 500
+        self.latitudes = rng.uniform(41, 59, n)
+        self.longitudes = rng.uniform(-9, 9, n)
+        self.levels = rng.uniform(200, 300, n)
+        self.times = (
+            pd.Timestamp("2024-01-31 12:00")
+            + pd.to_timedelta(rng.uniform(0, 3 * 3600, n), "s")
+        ).values
+
+    def get_indexers(self):
+        return {
+            "latitude": xr.DataArray(self.latitudes, dims="points"),
+            "longitude": xr.DataArray(self.longitudes, dims="points"),
+            "level": xr.DataArray(self.levels, dims="points"),
+            "time": xr.DataArray(self.times, dims="points"),
+        }
+
+    def test_nearest(self):
+        index = self.table.get_index(
+            self.latitudes, self.longitudes, self.times, self.levels, "nearest"
+        )
+        expected = self.dataset.sel(**self.get_indexers(), method="nearest")
+        for values, variable in zip(self.table.lookup(index), self.table.variables):
+            np.testing.assert_array_equal(values, expected[variable].values)
+
+    def test_linear(self):
+        index = self.table.get_index(
+            self.latitudes, self.longitudes, self.times, self.levels, "linear"
+        )
+        expected = self.dataset.interp(**self.get_indexers())
+        for values, variable in zip(self.table.lookup(index), self.table.variables):
+            np.testing.assert_allclose(values, expected[variable].values, atol=1e-9)
+
+    def test_outside_table(self):
+        index = self.table.get_index(
+            [70], [0], [np.datetime64("2024-02-01")], [100], "linear"
+        )
+        expected = self.dataset.isel(latitude=0, time=-1).sel(longitude=0, level=200)
+        np.testing.assert_allclose(
+            self.table.lookup(index)[:, 0],
+            [expected[variable].item() for variable in self.table.variables],
+        )
+        with self.assertRaises(ValueError):
+            self.table.get_index([0], [0], [0], [0], "cubic")
+
+
+class MockConfig:
+    WEATHER_MARGIN = 2
+    COCIP_MAX_AGE = pd.Timedelta("12h")
+    COCIP_WIND_SPEED = 30
+    R = 6371
+    FLIGHT_LEVELS = [310, 330, 350]
+    PRESSURE_LEVELS = [300, 250, 200, 150]
+    COCIP_PRESSURE_LEVELS = [400, 350, 300, 250, 200, 150]
+
+
+class MockAltitudeGrid:
+    latitudes = np.array([[50.0, 51.0], [52.0, np.nan]])
+    longitudes = np.array([[-5.0, -4.0], [-3.0, np.nan]])
+    altitudes = np.array([32000, 34000])
+
+
+class TestWeatherGridCorridor(unittest.TestCase):
+    def setUp(self):
+        self.weather_grid = WeatherGrid.__new__(WeatherGrid)
+        self.weather_grid.config = MockConfig()
+        self.weather_grid.altitude_grid = MockAltitudeGrid()
+        self.weather_grid.bounds = self.weather_grid.get_bounds()
+        self.weather_grid.pressure_levels = self.weather_grid.get_pressure_levels()
+
+    def test_bounds(self):
+        self.assertEqual(self.weather_grid.bounds, (48, -7, 54, -1))
+
+    def test_pressure_levels(self):
+        # FL310-FL350 spans roughly 287-238 hPa
+        self.assertEqual(self.weather_grid.pressure_levels, [300, 250, 200])
+        self.assertEqual(
+            self.weather_grid.get_pressure_levels(levels_below=1), [300, 250, 200]
+        )
+        self.assertEqual(
+            self.weather_grid.get_pressure_levels(
+                levels_below=1, pressure_levels=MockConfig.COCIP_PRESSURE_LEVELS
+            ),
+            [350, 300, 250, 200],
+        )
+
+    def test_cocip_bounds(self):
+        # Contrails drift about 1300 km, or 11.7 degrees, in 12 h at 30 m/s
+        south, west, north, east = self.weather_grid.get_cocip_bounds()
+        self.assertAlmostEqual(south, 50 - 11.655, places=2)
+        self.assertAlmostEqual(north, 52 + 11.655, places=2)
+        # Degrees of longitude are shorter at the corridor's highest latitude
+        self.assertAlmostEqual(west, -5 - 11.655 / np.cos(np.radians(north)), places=2)
+        self.assertAlmostEqual(east, -3 + 11.655 / np.cos(np.radians(north)), places=2)
+
+    def test_antimeridian(self):
+        # Margins stop at the antimeridian
+        self.weather_grid.altitude_grid = MockAltitudeGrid()
+        self.weather_grid.altitude_grid.longitudes = np.array(
+            [[170.0, 171.0], [178.0, np.nan]]
+        )
+        self.assertEqual(self.weather_grid.get_bounds(5)[3], 180)
+
+        # Grids which cross it aren't supported
+        self.weather_grid.altitude_grid.longitudes = np.array(
+            [[178.0, 179.0], [-179.0, np.nan]]
+        )
+        with self.assertRaises(ValueError):
+            self.weather_grid.get_bounds()
+
+    def test_crop(self):
+        coords = {
+            "longitude": np.arange(-20, 20.5, 0.5),
+            "latitude": np.arange(30, 70.5, 0.5),
+            "level": MockConfig.COCIP_PRESSURE_LEVELS,
+        }
+        dataset = xr.Dataset(
+            {"air_temperature": (list(coords), np.zeros((81, 81, 6)))}, coords=coords
+        )
+        cropped = self.weather_grid.crop(dataset)
+        self.assertEqual(cropped["longitude"].values.min(), -7)
+        self.assertEqual(cropped["longitude"].values.max(), -1)
+        self.assertEqual(cropped["latitude"].values.min(), 48)
+        self.assertEqual(cropped["latitude"].values.max(), 54)
+        self.assertEqual(list(cropped["level"].values), [300, 250, 200])
+
+
+class MockCache:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def get_key(self, name, fields, upstream=[]):
+        return "key"
+
+    def lookup(self, name, key, extension=""):
+        return os.path.join(self.directory, f"{name}-{key}{extension}"), False
+
+    def store(self, path):
+        pass
+
+
+class MockMet:
+    def __init__(self, dataset):
+        self.data = dataset
+
+
+class TestWeatherAlongGrid(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        coords = {
+            "longitude": np.arange(-5, 5.5, 0.5),
+            "latitude": np.arange(45, 55.5, 0.5),
+            "level": [200, 250, 300],
+            "time": pd.date_range("2024-01-31 12:00", periods=6, freq="1h"),
+        }
+        shape = tuple(len(values) for values in coords.values())
+        rng = np.random.default_rng(0)
+        self.dataset = xr.Dataset(
+            {
+                variable: (list(coords), rng.normal(size=shape))
+                for variable in WeatherGrid.WEATHER_VARIABLES + ["specific_humidity"]
+            },
+            coords=coords,
+        )
+        self.weather_grid = WeatherGrid.__new__(WeatherGrid)
+        self.weather_grid.cache = MockCache(self.directory.name)
+        self.weather_grid.met = MockMet(self.dataset)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_weather_grid(self):
+        # The along-grid weather is the met's variables, with nothing written
+        weather = self.weather_grid.get_weather_grid()
+        xr.testing.assert_identical(
+            weather, self.dataset[WeatherGrid.WEATHER_VARIABLES]
+        )
+        self.assertTrue(
+            np.shares_memory(
+                weather["air_temperature"].values,
+                self.dataset["air_temperature"].values,
+            )
+        )
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_weather_table(self):
+        self.weather_grid.get_weather_grid()
+        temperature, _ = self.weather_grid.get_weather_at_points(
+            [50.25], [0.25], [pd.Timestamp("2024-01-31 13:30").value], [225], "linear"
+        )
+        expected = self.dataset["air_temperature"].interp(
+            longitude=0.25,
+            latitude=50.25,
+            level=225,
+            time=pd.Timestamp("2024-01-31 13:30"),
+        )
+        self.assertAlmostEqual(temperature[0], expected.item())
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import xarray as xr
+from ..weather_store import WeatherStore
+
+
+def make_dataset(start: str, periods: int, area: tuple[float]) -> xr.Dataset:
+    south, west, north, east = area
+    coords = {
+        "longitude": np.arange(west, east + 0.25, 0.25),
+        "latitude": np.arange(south, north + 0.25, 0.25),
+        "level": [300, 250, 200],
+        "time": pd.date_range(start, periods=periods, freq="1h"),
+    }
+    shape = tuple(len(values) for values in coords.values())
+    values = np.broadcast_to(
+        coords["longitude"][:, None, None, None]
+        + coords["latitude"][None, :, None, None],
+        shape,
+    )
+    return xr.Dataset({"air_temperature": (list(coords), values)}, coords=coords)
+
+
+class TestWeatherStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = WeatherStore(self.directory.name)
+        self.area = (48, -6, 52, -2)
+        self.levels = [300, 250, 200]
+        self.time_bounds = (
+            pd.Timestamp("2024-01-31 20:30"),
+            pd.Timestamp("2024-02-01 02:15"),
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ingest_and_open(self):
+        missing = self.store.get_missing_days(self.time_bounds, self.area, self.levels)
+        self.assertEqual(
+            [day for day, _, _ in missing],
+            [pd.Timestamp("2024-01-31"), pd.Timestamp("2024-02-01")],
+        )
+        self.store.ingest(
+            make_dataset("2024-01-31", 48, self.area), self.area, self.levels
+        )
+        self.assertEqual(
+            self.store.get_missing_days(self.time_bounds, self.area, self.levels), []
+        )
+
+        dataset = self.store.open(self.time_bounds)
+        # Variables are read lazily, one time and level per chunk
+        self.assertIsNotNone(dataset["air_temperature"].chunks)
+        self.assertEqual(
+            list(dataset["time"].values),
+            list(pd.date_range("2024-01-31 20:00", "2024-02-01 03:00", freq="1h")),
+        )
+        self.assertEqual(
+            dataset["air_temperature"].sel(longitude=-3, latitude=50).values.max(), 47
+        )
+
+    def test_growing_area(self):
+        self.store.ingest(
+            make_dataset("2024-01-31", 24, self.area), self.area, self.levels
+        )
+        missing = self.store.get_missing_days(
+            self.time_bounds[:1] * 2, (49, -8, 51, -4), [350, 300]
+        )
+        self.assertEqual(
+            missing,
+            [(pd.Timestamp("2024-01-31"), (48, -8, 52, -2), [350, 300, 250, 200])],
+        )
@@ -1,128 +1,445 @@
-import os
 from pycontrails.models.cocip import Cocip
 from pycontrails.datalib.ecmwf import ERA5
 from pycontrails.core.met import MetDataset
+import os
+import shutil
+import hashlib
+import numpy as np
 import pandas as pd
 import xarray as xr
 import typing
 
 from routing_graph import AltitudeGrid
+from .weather_store import WeatherStore
+from cache import (
+    ALTITUDE_GRID_FIELDS,
+    COCIP_WEATHER_FIELDS,
+    ROUTING_GRID_FIELDS,
+    WEATHER_FIELDS,
+)
+from utils import Conversions, GridInterpolator, InterpolationIndex, memmap
 
 if typing.TYPE_CHECKING:
     from config import Config
-    from _types import FlightPoint, WindVector
+    from cache import Cache
+    from _types import WindVector
+
+
+class WeatherTable(GridInterpolator):
+    DIMS: list[str] = ["time", "level", "latitude", "longitude"]
+
+    def __init__(self, dataset: xr.Dataset, variables: list[str]):
+        """
+        Weather variables held as one contiguous array over sorted (time, level,
+        latitude, longitude) axes, for batched lookups of many points
+        """
+        interpolator = GridInterpolator.from_dataarrays(
+            [dataset[variable] for variable in variables], self.DIMS
+        )
+        super().__init__(interpolator.axes, interpolator.values)
+        self.variables: list[str] = variables
+
+    def get_index(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        times: np.ndarray,
+        levels: np.ndarray,
+        method: str = "linear",
+    ) -> InterpolationIndex:
+        """
+        Precomputes the indices and weights of points in the table
+        """
+        return super().get_index([times, levels, latitudes, longitudes], method)
+
+    def lookup(self, index: InterpolationIndex) -> np.ndarray:
+        """
+        Gets the values of every variable at the points of a precomputed index,
+        of shape (n_variables, n_points)
+        """
+        return self.interpolate(index)
+
+
+class CorridorERA5(ERA5):
+    def __init__(self, *args, area: list[float], **kwargs):
+        """
+        ERA5 data source which only requests an area of [north, west, south,
+        east] from the CDS API
+        """
+        super().__init__(*args, **kwargs)
+        self.area: list[float] = area
+
+    @property
+    def hash(self) -> str:
+        # Cropped files mustn't be confused with other areas in pycontrails' cache
+        return hashlib.sha1(bytes(f"{super().hash}{self.area}", "utf-8")).hexdigest()
+
+    def _set_cds(self) -> None:
+        super()._set_cds()
+        retrieve = self.cds.retrieve
+
+        def retrieve_area(name: str, request: dict, target: str = None):
+            return retrieve(name, {**request, "area": self.area}, target)
+
+        self.cds.retrieve = retrieve_area
 
 
 class WeatherGrid:
-    def __init__(self, altitude_grid: "AltitudeGrid", config: "Config"):
+    PL_VARIABLES: list = Cocip.met_variables + Cocip.optional_met_variables
+    SL_VARIABLES: list = Cocip.rad_variables
+    WEATHER_VARIABLES: list[str] = [
+        "air_temperature",
+        "eastward_wind",
+        "northward_wind",
+    ]
+
+    def __init__(self, altitude_grid: "AltitudeGrid", config: "Config", cache: "Cache"):
         """
-        Class to interpolate weather data along the routing grid
+        Class to interpolate weather data along the routing grid. Weather is
+        retrieved and loaded only for the corridor around the grid, and the
+        pressure levels which bracket its altitudes. CoCiP gets its own wider
+        met and rad, as contrails drift and sink away from the flight.
         """
         self.config: "Config" = config
-        time_bounds = (
+        self.cache: "Cache" = cache
+        self.altitude_grid: "AltitudeGrid" = altitude_grid
+        self.shared_directory: str or None = None
+        self.bounds: tuple[float] = self.get_bounds()
+        self.pressure_levels: list[int] = self.get_pressure_levels()
+        self.met_key: str = cache.get_key(
+            "met",
+            ALTITUDE_GRID_FIELDS
+            + WEATHER_FIELDS
+            + ["PRESSURE_LEVELS", "FLIGHT_LEVELS", "WEATHER_MARGIN"],
+        )
+        self.rad_key: str = cache.get_key(
+            "rad", ROUTING_GRID_FIELDS + WEATHER_FIELDS + ["WEATHER_MARGIN"]
+        )
+        self.cocip_met_key: str = cache.get_key(
+            "cocip_met",
+            ALTITUDE_GRID_FIELDS
+            + WEATHER_FIELDS
+            + ["PRESSURE_LEVELS", "FLIGHT_LEVELS"]
+            + COCIP_WEATHER_FIELDS,
+        )
+        self.cocip_rad_key: str = cache.get_key(
+            "cocip_rad", ROUTING_GRID_FIELDS + WEATHER_FIELDS + COCIP_WEATHER_FIELDS
+        )
+        self.met: MetDataset = self._get_weather(
+            "met",
+            self.met_key,
+            self.get_time_bounds(),
+            self.bounds,
+            self.pressure_levels,
+        )
+        self.rad: MetDataset = self._get_weather(
+            "rad", self.rad_key, self.get_time_bounds(), self.bounds
+        )
+
+    def get_time_bounds(
+        self, extension: pd.Timedelta = pd.Timedelta(0)
+    ) -> tuple[pd.Timestamp]:
+        return (
             self.config.DEPARTURE_DATE,
-            self.config.DEPARTURE_DATE + self.config.WEATHER_BOUND,
+            self.config.DEPARTURE_DATE + self.config.WEATHER_BOUND + extension,
         )
-        pressure_levels = self.config.PRESSURE_LEVELS
-        self.era5pl: ERA5 = ERA5(
+
+    def get_cocip_weather(self) -> tuple[MetDataset, MetDataset]:
+        """
+        Gets the met and rad for CoCiP, which are loaded when first needed. They
+        run COCIP_MAX_AGE past the weather window, over a corridor widened by
+        the distance a contrail drifts in that time at COCIP_WIND_SPEED, and
+        include a level of COCIP_PRESSURE_LEVELS below the lowest flight level
+        for contrails to sink into.
+        """
+        if not hasattr(self, "cocip_met"):
+            time_bounds = self.get_time_bounds(self.config.COCIP_MAX_AGE)
+            bounds = self.get_cocip_bounds()
+            self.cocip_met: MetDataset = self._get_weather(
+                "met",
+                self.cocip_met_key,
+                time_bounds,
+                bounds,
+                self.get_pressure_levels(
+                    levels_below=1, pressure_levels=self.config.COCIP_PRESSURE_LEVELS
+                ),
+            )
+            self.cocip_rad: MetDataset = self._get_weather(
+                "rad", self.cocip_rad_key, time_bounds, bounds
+            )
+        return self.cocip_met, self.cocip_rad
+
+    def _get_era5(
+        self,
+        time_bounds: tuple[pd.Timestamp],
+        bounds: tuple[float],
+        variables: list,
+        pressure_levels: list[int] or None = None,
+    ) -> ERA5:
+        """
+        Gets an ERA5 source for a time window and (south, west, north, east)
+        bounds, on single levels when no pressure levels are given
+        """
+        south, west, north, east = bounds
+        kwargs = {}
+        if pressure_levels is not None:
+            kwargs["pressure_levels"] = pressure_levels
+        return CorridorERA5(
             time=time_bounds,
             timestep_freq="1h",
-            variables=Cocip.met_variables + Cocip.optional_met_variables,
-            pressure_levels=pressure_levels,
+            variables=variables,
+            area=[north, west, south, east],
+            **kwargs,
         )
-        self.era5sl: ERA5 = ERA5(time=time_bounds, variables=Cocip.rad_variables)
-        self.met: MetDataset = self._get_met()
-        self.rad: MetDataset = self._get_rad()
-        self.altitude_grid: "AltitudeGrid" = altitude_grid
 
-    def get_weather_grid(self) -> xr.Dataset:
+    def get_bounds(
+        self, margin: float or None = None, longitude_margin: float or None = None
+    ) -> tuple[float]:
         """
-        Gets the weather data along the grid
+        Gets the (south, west, north, east) bounds of the routing grid, plus a
+        margin in degrees, which defaults to WEATHER_MARGIN. Bounds are a single
+        box, so grids crossing the antimeridian aren't supported, and margins
+        stop at it.
         """
-        self.weather_grid: xr.Dataset = self._init_weather_data_along_grid()
-        return self.weather_grid
+        margin = self.config.WEATHER_MARGIN if margin is None else margin
+        longitude_margin = margin if longitude_margin is None else longitude_margin
+        latitudes = self.altitude_grid.latitudes
+        longitudes = self.altitude_grid.longitudes
+        if (np.abs(np.diff(longitudes, axis=0)) > 180).any():
+            raise ValueError("Routing grids crossing the antimeridian aren't supported")
+        return (
+            max(float(np.nanmin(latitudes)) - margin, -90.0),
+            max(float(np.nanmin(longitudes)) - longitude_margin, -180.0),
+            min(float(np.nanmax(latitudes)) + margin, 90.0),
+            min(float(np.nanmax(longitudes)) + longitude_margin, 180.0),
+        )
 
-    def _get_met(self) -> MetDataset:
+    def get_cocip_bounds(self) -> tuple[float]:
         """
-        Retrieves the met dataset, or creates it if it doesn't exist
+        Gets the bounds of the routing grid plus the distance a contrail drifts
+        over COCIP_MAX_AGE at COCIP_WIND_SPEED, and at least WEATHER_MARGIN
         """
-        if not os.path.exists("data/met.nc"):
-            met = self.era5pl.open_metdataset()
+        distance = (
+            self.config.COCIP_MAX_AGE.total_seconds()
+            * self.config.COCIP_WIND_SPEED
+            / 1000
+        )
+        margin = max(np.degrees(distance / self.config.R), self.config.WEATHER_MARGIN)
+        # Degrees of longitude are shortest at the corridor's highest latitude,
+        # so the margin is sized there, up to half the globe either way
+        south, _, north, _ = self.get_bounds(margin)
+        shrinkage = np.cos(np.radians(max(abs(south), abs(north))))
+        longitude_margin = min(margin / max(shrinkage, 1e-6), 180.0)
+        return self.get_bounds(margin, longitude_margin)
 
-            met.data.to_netcdf("data/met.nc")
-        else:
-            met = xr.open_dataset("data/met.nc")
-            met = MetDataset(met)
+    def get_pressure_levels(
+        self, levels_below: int = 0, pressure_levels: list[int] or None = None
+    ) -> list[int]:
+        """
+        Gets the pressure levels, of PRESSURE_LEVELS unless others are given,
+        which bracket the altitudes of the grid and the contrail flight levels,
+        plus some levels below them if wanted
+        """
+        if pressure_levels is None:
+            pressure_levels = self.config.PRESSURE_LEVELS
+        altitudes = np.concatenate(
+            (self.altitude_grid.altitudes, np.array(self.config.FLIGHT_LEVELS) * 100)
+        )
+        pressures = Conversions().calculate_pressure_from_altitude_ft(
+            altitudes.astype(float)
+        )
+        levels = np.sort(pressure_levels)
+        below = levels[levels <= pressures.min()]
+        above = levels[levels >= pressures.max()]
+        lowest = below.max() if len(below) else levels.min()
+        highest = above.min() if len(above) else levels.max()
+        if levels_below:
+            highest = levels[levels >= highest][: levels_below + 1].max()
+        return [level for level in pressure_levels if lowest <= level <= highest]
 
-        return met
+    def crop(
+        self,
+        dataset: xr.Dataset,
+        bounds: tuple[float] or None = None,
+        pressure_levels: list[int] or None = None,
+    ) -> xr.Dataset:
+        """
+        Crops a dataset to bounds and pressure levels, which default to the
+        corridor's
+        """
+        bounds = self.bounds if bounds is None else bounds
+        pressure_levels = (
+            self.pressure_levels if pressure_levels is None else pressure_levels
+        )
+        south, west, north, east = bounds
+        latitudes = dataset["latitude"].values
+        longitudes = dataset["longitude"].values
+        indexers = {
+            "latitude": np.flatnonzero((latitudes >= south) & (latitudes <= north)),
+            "longitude": np.flatnonzero((longitudes >= west) & (longitudes <= east)),
+        }
+        # Single level datasets have a level of -1
+        if "level" in dataset.dims and (dataset["level"].values > 0).all():
+            indexers["level"] = np.flatnonzero(
+                np.isin(dataset["level"].values, pressure_levels)
+            )
+        return dataset.isel(**indexers)
 
-    def _get_rad(self) -> MetDataset:
+    def get_weather_grid(self) -> xr.Dataset:
         """
-        Retrieves the met dataset, or creates it if it doesn't exist
+        Gets the temperature and wind along the grid. The met is already cropped
+        to the corridor around the grid, so these are its variables as they
+        are, without a copy.
         """
-        if not os.path.exists("data/rad.nc"):
-            rad = self.era5sl.open_metdataset()
-            rad.data.to_netcdf("data/rad.nc")
-        else:
-            rad = xr.open_dataset("data/rad.nc")
-            rad = MetDataset(rad)
+        self.weather_grid: xr.Dataset = self.met.data[self.WEATHER_VARIABLES]
+        return self.weather_grid
 
-        return rad
+    def get_weather_table(self) -> WeatherTable:
+        """
+        Gets the temperature and wind along the grid as a lookup table
+        """
+        if not hasattr(self, "weather_table"):
+            self.weather_table = WeatherTable(self.weather_grid, self.WEATHER_VARIABLES)
+        return self.weather_table
 
-    def _init_weather_data_along_grid(self) -> xr.Dataset:
+    def share_weather(self) -> None:
         """
-        Initializes the weather data along the grid
+        Exports the met, rad and along-grid weather table into memory-mapped
+        files in the cache. Processes which unpickle this grid map them read-only rather
+        than each holding a copy.
         """
-        if not os.path.exists("data/weather_data.nc"):
-            grid = self.altitude_grid.altitude_grid.copy()
-            for alt in grid:
-                grid[alt] = [x for x in sum(grid[alt], []) if x is not None]
+        key = self.cache.get_key(
+            "shared_weather",
+            ALTITUDE_GRID_FIELDS,
+            upstream=[self.met_key, self.rad_key],
+        )
+        path, cached = self.cache.lookup("shared_weather", key)
+        if not cached:
+            tmp_path = f"{path}.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+            memmap.save_dataset(self.met.data, os.path.join(tmp_path, "met"))
+            memmap.save_dataset(self.rad.data, os.path.join(tmp_path, "rad"))
+            self.get_weather_table().save(os.path.join(tmp_path, "weather_table"))
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+            self.cache.store(path)
 
-            grid = [
-                (lat, lon, key) for key, values in grid.items() for lat, lon in values
-            ]
+        self.shared_directory = path
+        self._map_shared_weather()
+        self.get_weather_table().map(os.path.join(path, "weather_table"))
 
-            flight_path = pd.DataFrame(
-                grid,
-                columns=["latitude", "longitude", "altitude_ft"],
-            )
+    def _map_shared_weather(self) -> None:
+        """
+        Maps the exported met and rad, and takes the along-grid weather from
+        the met
+        """
+        path = self.shared_directory
+        self.met = MetDataset(
+            memmap.load_dataset(os.path.join(path, "met")), copy=False
+        )
+        self.rad = MetDataset(
+            memmap.load_dataset(os.path.join(path, "rad")), copy=False
+        )
+        self.get_weather_grid()
 
-            fl_ds = flight_path.copy()
-            fl_ds = fl_ds.set_index(["altitude_ft", "latitude", "longitude"])
-            fl_ds = xr.Dataset.from_dataframe(fl_ds)
-            weather = self.met.data.interp(**fl_ds.data_vars)
+    def __getstate__(self) -> dict:
+        # Shared weather is re-mapped on unpickling rather than copied
+        state = self.__dict__.copy()
+        if self.shared_directory is not None:
+            for key in ["met", "rad", "weather_grid"]:
+                state.pop(key, None)
+        # CoCiP's weather is opened again from the cache where it's needed
+        for key in ["cocip_met", "cocip_rad"]:
+            state.pop(key, None)
+        return state
 
-            weather.to_netcdf("data/weather_data.nc")
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.shared_directory is not None:
+            self._map_shared_weather()
 
-        weather_data = xr.open_dataset("data/weather_data.nc")
+    def _get_weather(
+        self,
+        name: str,
+        key: str,
+        time_bounds: tuple[pd.Timestamp],
+        bounds: tuple[float],
+        pressure_levels: list[int] or None = None,
+    ) -> MetDataset:
+        """
+        Retrieves the met ("met", on pressure levels) or rad ("rad") dataset for
+        a time window and bounds, or creates it if it doesn't exist
+        """
+        variables = self.PL_VARIABLES if name == "met" else self.SL_VARIABLES
+        if self.config.WEATHER_STORE is not None:
+            return self._get_stored_weather(
+                name, variables, time_bounds, bounds, pressure_levels
+            )
+        path, cached = self.cache.lookup(name, key, ".nc")
+        if cached:
+            return MetDataset(xr.open_dataset(path))
 
-        return weather_data
+        era5 = self._get_era5(time_bounds, bounds, variables, pressure_levels)
+        dataset = self.crop(era5.open_metdataset().data, bounds, pressure_levels)
+        dataset.to_netcdf(path)
+        self.cache.store(path)
+        return MetDataset(dataset, copy=False)
 
-    def get_weather_data_at_point(self, point: "FlightPoint") -> xr.Dataset:
+    def _get_stored_weather(
+        self,
+        name: str,
+        variables: list,
+        time_bounds: tuple[pd.Timestamp],
+        bounds: tuple[float],
+        pressure_levels: list[int] or None = None,
+    ) -> MetDataset:
         """
-        Gets the weather data at a point in the grid
+        Gets a weather dataset from the multi-day weather store, ingesting any
+        days it doesn't yet hold for the bounds. Stored days are read lazily
+        and cropped to the bounds, so this works offline once ingested.
         """
-        data = self.weather_grid.sel(
-            latitude=point["latitude"],
-            longitude=point["longitude"],
-            time=point["time"],
-            level=point["level"],
-            method="nearest",
+        store = WeatherStore(os.path.join(self.config.WEATHER_STORE, name))
+        for day, missing_bounds, levels in store.get_missing_days(
+            time_bounds, bounds, pressure_levels
+        ):
+            era5 = self._get_era5(
+                (day, day + pd.Timedelta("23h")), missing_bounds, variables, levels
+            )
+            store.ingest(era5.open_metdataset().data, missing_bounds, levels)
+        return MetDataset(
+            store.open(
+                time_bounds,
+                lambda dataset: self.crop(dataset, bounds, pressure_levels),
+            ),
+            copy=False,
         )
-        return data
 
-    def get_wind_vector_at_point(self, point: xr.Dataset) -> "WindVector":
+    def get_weather_times(self) -> np.ndarray:
         """
-        Gets the wind vector at a point and returns it as a tuple
+        Gets the times of the weather along the grid, as nanoseconds since the
+        epoch
         """
-        u = point["eastward_wind"].values
-        v = point["northward_wind"].values
+        return self.get_weather_table().axes[0].astype(np.int64)
 
-        return (u, v)
-
-    def get_temperature_at_point(self, point: xr.Dataset) -> float:
+    def get_weather_at_points(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        times: np.ndarray,
+        levels: np.ndarray,
+        method: str or None = None,
+    ) -> tuple[np.ndarray, "WindVector"]:
         """
-        Gets the temperature at a point and returns it
+        Gets the temperature and wind vector at many points in one lookup
         """
-        temperature = point["air_temperature"].values
-        return temperature
+        weather_table = self.get_weather_table()
+        index = weather_table.get_index(
+            latitudes,
+            longitudes,
+            times,
+            levels,
+            method or self.config.WEATHER_INTERPOLATION,
+        )
+        temperature, u, v = weather_table.lookup(index)
+        return temperature, (u, v)
@@ -0,0 +1,113 @@
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+import typing
+
+# Dims stored one step per chunk, so a route reads only the steps it needs
+CHUNKED_DIMS = ["time", "level"]
+
+
+class WeatherStore:
+    def __init__(self, directory: str):
+        """
+        Local store of weather spanning many days, as one chunked netCDF file
+        per day. Days are appended as they are ingested, and opened lazily with
+        dask so that only the chunks a route needs are read from disk.
+        """
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, day: pd.Timestamp) -> str:
+        return os.path.join(self.directory, f"{day:%Y-%m-%d}.nc")
+
+    def get_days(self, time_bounds: tuple[pd.Timestamp]) -> pd.DatetimeIndex:
+        """
+        Gets the days which a time window spans
+        """
+        start, end = time_bounds
+        return pd.date_range(start.floor("D"), end.floor("D"), freq="D")
+
+    def get_missing_days(
+        self,
+        time_bounds: tuple[pd.Timestamp],
+        area: tuple[float],
+        levels: list[int] or None = None,
+    ) -> list[tuple[pd.Timestamp, tuple[float], list[int] or None]]:
+        """
+        Gets the days of a time window which aren't stored for a (south, west,
+        north, east) area and pressure levels, with the area and levels to
+        ingest them for. These cover both the request and anything already
+        stored, so stored days only ever grow.
+        """
+        missing = []
+        for day in self.get_days(time_bounds):
+            path = self.get_path(day)
+            if not os.path.exists(path):
+                missing.append((day, tuple(area), levels))
+                continue
+            with xr.open_dataset(path) as dataset:
+                stored_area = tuple(np.atleast_1d(dataset.attrs["store_area"]))
+                stored_levels = list(np.atleast_1d(dataset.attrs["store_levels"]))
+            union_area = (
+                min(area[0], stored_area[0]),
+                min(area[1], stored_area[1]),
+                max(area[2], stored_area[2]),
+                max(area[3], stored_area[3]),
+            )
+            union_levels = None
+            if levels is not None:
+                union_levels = sorted(set(levels) | set(stored_levels), reverse=True)
+            if union_area != stored_area or (
+                levels is not None and len(union_levels) != len(stored_levels)
+            ):
+                missing.append((day, union_area, union_levels))
+        return missing
+
+    def ingest(
+        self, dataset: xr.Dataset, area: tuple[float], levels: list[int] or None = None
+    ) -> None:
+        """
+        Writes each day of a dataset into the store, recording the area and
+        levels it was retrieved for
+        """
+        times = pd.DatetimeIndex(dataset["time"].values)
+        for day in times.floor("D").unique():
+            day_dataset = dataset.sel(time=(times.floor("D") == day)).copy()
+            day_dataset.attrs.update(
+                store_area=list(area), store_levels=list(levels or [])
+            )
+            encoding = {}
+            for name, variable in day_dataset.data_vars.items():
+                variable.encoding = {}
+                encoding[name] = {
+                    "zlib": True,
+                    "chunksizes": tuple(
+                        1 if dim in CHUNKED_DIMS else size
+                        for dim, size in zip(variable.dims, variable.shape)
+                    ),
+                }
+            path = self.get_path(day)
+            tmp_path = f"{path}.tmp"
+            day_dataset.to_netcdf(tmp_path, encoding=encoding)
+            os.replace(tmp_path, path)
+
+    def open(
+        self,
+        time_bounds: tuple[pd.Timestamp],
+        preprocess: typing.Callable[[xr.Dataset], xr.Dataset] or None = None,
+    ) -> xr.Dataset:
+        """
+        Lazily opens the hours spanning a time window as one dask-backed
+        dataset. The preprocess function crops each day before they're
+        combined, so that days stored for different areas line up.
+        """
+        paths = [self.get_path(day) for day in self.get_days(time_bounds)]
+        dataset = xr.open_mfdataset(
+            paths,
+            chunks={dim: 1 for dim in CHUNKED_DIMS},
+            preprocess=preprocess,
+            combine="by_coords",
+        )
+        start, end = time_bounds
+        return dataset.sel(time=slice(start.floor("h"), end.ceil("h")))
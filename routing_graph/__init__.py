@@ -2,11 +2,14 @@ from .routing_grid import RoutingGrid
 from .altitude_grid import AltitudeGrid
 from .geodesic_path import GeodesicPath
 from .routing_graph import RoutingGraph
+from .array_graph import ArrayGraph
+from .implicit_graph import ImplicitGraph
+from cache import Cache
 import typing
 
 if typing.TYPE_CHECKING:
     from config import Config
-    from _types import IndexPoint3D, FlightPoint
+    from _types import IndexPoint3D, IndexPath, FlightPoint, FlightPath
     from performance_model import PerformanceModel
 
 
@@ -16,6 +19,7 @@ class RoutingGraphManager:
         External interface for the routing graph and all its components
         """
         self.config: "Config" = config
+        self.cache: Cache = Cache(config)
 
         self.geodesic_path: "GeodesicPath" = GeodesicPath(self.config)
         self.routing_grid: "RoutingGrid" = RoutingGrid(self.geodesic_path, self.config)
@@ -29,13 +33,22 @@ class RoutingGraphManager:
         """
         return self.altitude_grid.convert_index_to_point(index)
 
+    def convert_index_path(self, indices: "IndexPath") -> "FlightPath":
+        """
+        Converts an IndexPath to a FlightPath
+        """
+        return self.altitude_grid.convert_index_path(indices)
+
     def get_routing_graph(self) -> "RoutingGraph":
         """
         Retrieves the routing graph, or creates it if it doesn't exist
         """
         if not hasattr(self, "routing_graph"):
             self.routing_graph = RoutingGraph(
-                self.get_altitude_grid(), self.get_performance_model(), self.config
+                self.get_altitude_grid(),
+                self.get_performance_model(),
+                self.config,
+                cache=self.cache,
             )
         return self.routing_graph
 
@@ -53,6 +66,12 @@ class RoutingGraphManager:
             raise ValueError("Performance model not set")
         return self.performance_model
 
+    def get_cache(self) -> Cache:
+        """
+        Retrieves the cache of derived artefacts
+        """
+        return self.cache
+
     def get_routing_grid(self) -> "RoutingGrid":
         """
         Retrieves the routing grid
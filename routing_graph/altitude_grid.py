@@ -1,8 +1,9 @@
+import numpy as np
 import typing
-from utils import Conversions
+from utils import Conversions, FlightPath
 
 if typing.TYPE_CHECKING:
-    from _types import Grid2D, Grid3D, IndexPoint3D, FlightPoint
+    from _types import Grid2D, Grid3D, IndexPoint3D, IndexPath, FlightPoint, FlightPath
     from config import Config
 
 
@@ -13,7 +14,13 @@ class AltitudeGrid:
 
     def __init__(self, routing_grid: "Grid2D", config: "Config"):
         """
-        Constructs an AltitudeGrid object from a routing grid
+        Constructs an AltitudeGrid object from a routing grid.
+
+        The grid is held as arrays of latitudes and longitudes of shape
+        (n_steps, n_lateral), with lateral indices left-aligned in each step,
+        and a mask of shape (n_altitudes, n_steps, n_lateral) of which points
+        are reachable at each altitude. The nested lists of points at each
+        altitude are only built from these when indexed.
         """
         self.config: "Config" = config
         self.base_altitude: int = self.config.STARTING_ALTITUDE
@@ -21,67 +28,99 @@ class AltitudeGrid:
         self.max_altitude_var: int = self.config.MAX_ALTITUDE_VAR
         self.max_altitude: int = self.config.MAX_ALTITUDE
         self.routing_grid: "Grid2D" = routing_grid.get_routing_grid()
-        self.altitude_grid: "Grid3D" = self.calculate_altitude_grid(self.routing_grid)
+        self.calculate_grid_arrays(self.routing_grid)
+        self.altitude_views: "Grid3D" = {}
+
+    def calculate_grid_arrays(self, grid: "Grid2D") -> None:
+        """
+        Calculates the coordinate arrays and reachability mask of the grid
+        """
+        self.altitudes: np.ndarray = np.arange(
+            self.base_altitude, self.max_altitude + 1, self.altitude_step
+        )
+        self.altitude_indices: dict[int, int] = {
+            altitude: i for i, altitude in enumerate(self.altitudes.tolist())
+        }
+        self.widths: np.ndarray = np.array([len(step) for step in grid], dtype=int)
+        no_of_steps, max_width = len(grid), max(self.widths, default=0)
+
+        self.latitudes: np.ndarray = np.full((no_of_steps, max_width), np.nan)
+        self.longitudes: np.ndarray = np.full((no_of_steps, max_width), np.nan)
+        for xi, step in enumerate(grid):
+            self.latitudes[xi, : len(step)] = [point[0] for point in step]
+            self.longitudes[xi, : len(step)] = [point[1] for point in step]
+
+        in_step = np.arange(max_width) < self.widths[:, np.newaxis]
+        max_altitude_at_step = np.minimum(
+            self.base_altitude + np.arange(no_of_steps) * self.max_altitude_var,
+            self.max_altitude,
+        )
+        reachable = self.altitudes[:, np.newaxis] <= max_altitude_at_step[np.newaxis, :]
+        self.mask: np.ndarray = reachable[:, :, np.newaxis] & in_step[np.newaxis]
 
     def calculate_altitude_grid(self, grid: "Grid2D") -> "Grid3D":
         """
         Calculates which points are reachable at each altitude, and constructs the grid object
         """
+        self.calculate_grid_arrays(grid)
+        self.altitude_views = {}
+        return {altitude: self[altitude] for altitude in self}
 
-        def calculate_altitudes() -> list[int]:
-            altitudes = []
-            current_altitude = self.base_altitude
-            while current_altitude <= self.max_altitude:
-                altitudes.append(current_altitude)
-                current_altitude += self.altitude_step
-            return altitudes
-
-        altitudes = calculate_altitudes()
-        altitude_grid = {}
-
-        for altitude in altitudes:
-            altitude_grid[altitude] = []
-            for step in grid:
-                step_points = []
-                for point in step:
-                    index = grid.index(step)
-                    max_altitude_at_step = min(
-                        self.base_altitude + (index * self.max_altitude_var),
-                        self.max_altitude,
-                    )
-                    if altitude > max_altitude_at_step:
-                        step_points.append(None)
-                        continue
-                    step_points.append(point)
-                if len(step_points) > 0:
-                    altitude_grid[altitude].append(step_points)
-
-        return altitude_grid
+    def get_altitude_view(self, altitude: int) -> "Grid2D":
+        """
+        Builds the points of each step at an altitude, with None where a point
+        is unreachable
+        """
+        reachable = self.mask[self.altitude_indices[altitude]].tolist()
+        latitudes, longitudes = self.latitudes.tolist(), self.longitudes.tolist()
+        return [
+            [
+                (latitudes[xi][yi], longitudes[xi][yi]) if reachable[xi][yi] else None
+                for yi in range(width)
+            ]
+            for xi, width in enumerate(self.widths.tolist())
+        ]
 
-    def convert_index_to_point(self, index: "IndexPoint3D") -> "FlightPoint":
+    def convert_indices_to_points(self, indices: np.ndarray) -> dict[str, np.ndarray]:
         """
-        Converts an IndexPoint to a FlightPoint
+        Converts an array of (xi, yi, altitude) indices to columns of flight
+        point fields
         """
-        thrust = self.config.NOMINAL_THRUST
-        altitude_point = self.altitude_grid[index[2]][index[0]][index[1]]
-        path_point = {
-            "latitude": altitude_point[0],
-            "longitude": altitude_point[1],
-            "altitude_ft": index[2],
-            "thrust": thrust,
-            "level": Conversions().convert_altitude_to_pressure_bounded(
-                index[2],
+        indices = np.asarray(indices).reshape(-1, 3)
+        xi, yi, altitude = indices[:, 0], indices[:, 1], indices[:, 2]
+        pressure = Conversions().calculate_pressure_from_altitude_ft(
+            altitude.astype(float)
+        )
+        return {
+            "latitude": self.latitudes[xi, yi],
+            "longitude": self.longitudes[xi, yi],
+            "altitude_ft": altitude,
+            "thrust": np.full(len(indices), self.config.NOMINAL_THRUST),
+            "level": np.maximum(
                 self.config.PRESSURE_LEVELS[-1],
-                self.config.PRESSURE_LEVELS[0],
+                np.minimum(pressure, self.config.PRESSURE_LEVELS[0]),
             ),
         }
-        return path_point
+
+    def convert_index_path(self, indices: "IndexPath") -> "FlightPath":
+        """
+        Converts a whole index path to a flight path in one batch
+        """
+        return FlightPath(self.convert_indices_to_points(indices))
+
+    def convert_index_to_point(self, index: "IndexPoint3D") -> "FlightPoint":
+        """
+        Converts an IndexPoint to a FlightPoint
+        """
+        return dict(self.convert_index_path([index])[0])
 
     def __iter__(self) -> "iter":
-        return iter(self.altitude_grid)
+        return iter(self.altitude_indices)
 
     def __getitem__(self, key: int) -> "Grid2D":
-        return self.altitude_grid[key]
+        if key not in self.altitude_views:
+            self.altitude_views[key] = self.get_altitude_view(key)
+        return self.altitude_views[key]
 
     def __setitem__(self, key: int, value: "Grid2D") -> None:
-        self.altitude_grid[key] = value
+        self.altitude_views[key] = value
@@ -0,0 +1,307 @@
+import os
+import shutil
+import numpy as np
+from collections.abc import Mapping, MutableMapping
+import typing
+
+if typing.TYPE_CHECKING:
+    from _types import IndexPoint3D
+
+
+class ArrayGraph:
+    def __init__(self, arrays: dict[str, np.ndarray], directory: str or None = None):
+        """
+        A routing graph stored as arrays of node coordinates, CSR edges,
+        heuristics and pheromones, with networkx-style views over them.
+
+        Static arrays may be read-only memory maps shared between processes, the
+        pheromones are always private writable copies.
+        """
+        self.directory: str or None = directory
+        self.arrays: dict[str, np.ndarray] = {
+            key: array
+            for key, array in arrays.items()
+            if not key.endswith("_pheromone")
+        }
+        self.pheromones: dict[str, np.ndarray] = {
+            key: np.array(array, dtype=float)
+            for key, array in arrays.items()
+            if key.endswith("_pheromone")
+        }
+        self._init_lookups()
+
+    def _init_lookups(self) -> None:
+        self.indptr: np.ndarray = self.arrays["indptr"]
+        self.indices: np.ndarray = self.arrays["indices"]
+        self.node_list: list["IndexPoint3D"] = [
+            tuple(node) for node in self.arrays["nodes"].tolist()
+        ]
+        self.node_ids: dict["IndexPoint3D", int] = {
+            node: i for i, node in enumerate(self.node_list)
+        }
+        self.nodes: NodeView = NodeView(self)
+        self.edges: EdgeView = EdgeView(self)
+        self.pheromone_version: int = 0
+        self.neighbour_factors: dict[tuple, tuple[int, np.ndarray]] = {}
+
+    @classmethod
+    def load(cls, directory: str) -> "ArrayGraph":
+        """
+        Loads a graph saved with save, memory mapping its static arrays
+        """
+        arrays = {}
+        for filename in os.listdir(directory):
+            key, extension = os.path.splitext(filename)
+            if extension != ".npy":
+                continue
+            mmap_mode = None if key.endswith("_pheromone") else "r"
+            arrays[key] = np.load(
+                os.path.join(directory, filename), mmap_mode=mmap_mode
+            )
+        return cls(arrays, directory=directory)
+
+    def save(self, directory: str) -> None:
+        """
+        Saves the graph as a directory of .npy files
+        """
+        tmp_directory = f"{directory}.tmp"
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+        for key, array in {**self.arrays, **self.pheromones}.items():
+            np.save(os.path.join(tmp_directory, f"{key}.npy"), array)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+
+    def __getstate__(self) -> dict:
+        # Graphs loaded from disk are re-mapped on unpickling rather than copied
+        return {
+            "directory": self.directory,
+            "arrays": self.arrays if self.directory is None else None,
+            "pheromones": self.pheromones,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.directory = state["directory"]
+        if state["arrays"] is None:
+            self.arrays = ArrayGraph.load(self.directory).arrays
+        else:
+            self.arrays = state["arrays"]
+        self.pheromones = state["pheromones"]
+        self._init_lookups()
+
+    def __getitem__(self, node: "IndexPoint3D") -> "AdjacencyView":
+        return AdjacencyView(self, self.node_ids[node])
+
+    def __contains__(self, node: "IndexPoint3D") -> bool:
+        return node in self.node_ids
+
+    def __iter__(self) -> typing.Iterator["IndexPoint3D"]:
+        return iter(self.node_list)
+
+    def __len__(self) -> int:
+        return len(self.node_list)
+
+    def get_edge_sources(self) -> np.ndarray:
+        """
+        Gets the source node id of every edge
+        """
+        if not hasattr(self, "edge_sources"):
+            self.edge_sources = np.repeat(
+                np.arange(len(self.node_list)), np.diff(self.indptr)
+            )
+        return self.edge_sources
+
+    def get_pheromone(self, edge_id: int, key: str) -> float:
+        return float(self.pheromones[key][edge_id])
+
+    def set_pheromone(self, edge_id: int, key: str, value: float) -> None:
+        self.pheromones[key][edge_id] = value
+        self.pheromone_version += 1
+
+    def evaporate(self, key: str, evaporation_rate: float, tau_min: float) -> None:
+        """
+        Evaporates the pheromone of every edge, bounded below by tau_min
+        """
+        pheromone = self.pheromones[key]
+        np.maximum(tau_min, (1 - evaporation_rate) * pheromone, out=pheromone)
+        self.pheromone_version += 1
+
+    def get_time_bucket(self, heuristic_key: str, time: int or None) -> int or None:
+        """
+        Gets the time bucket of a heuristic nearest a time in nanoseconds since
+        the epoch, or None if the heuristic doesn't vary with time
+        """
+        times_key = f"{heuristic_key}_times"
+        if time is None or times_key not in self.arrays:
+            return None
+        return int(np.abs(self.arrays[times_key] - time).argmin())
+
+    def get_heuristic(self, heuristic_key: str, time_bucket: int or None) -> np.ndarray:
+        """
+        Gets the heuristic of every node, in a time bucket if given
+        """
+        if time_bucket is None:
+            return self.arrays[heuristic_key]
+        return self.arrays[f"{heuristic_key}_by_time"][:, time_bucket]
+
+    def get_neighbour_factors(
+        self,
+        pheromone_key: str,
+        heuristic_key: str,
+        alpha: float,
+        beta: float,
+        time_bucket: int or None = None,
+    ) -> np.ndarray:
+        """
+        Gets, for every node, the sum of pheromone^alpha * heuristic^beta over
+        its outgoing edges. Cached until the pheromones next change.
+        """
+        cache_key = (pheromone_key, heuristic_key, alpha, beta, time_bucket)
+        version, factors = self.neighbour_factors.get(cache_key, (None, None))
+        if version != self.pheromone_version:
+            heuristic = self.get_heuristic(heuristic_key, time_bucket)[self.indices]
+            edge_factors = np.power(self.pheromones[pheromone_key], alpha) * np.power(
+                heuristic, beta
+            )
+            factors = np.bincount(
+                self.get_edge_sources(),
+                weights=edge_factors,
+                minlength=len(self.node_list),
+            )
+            self.neighbour_factors[cache_key] = (self.pheromone_version, factors)
+        return factors
+
+    def calculate_probabilities(
+        self,
+        node: "IndexPoint3D",
+        pheromone_key: str,
+        heuristic_key: str,
+        alpha: float,
+        beta: float,
+        time: int or None = None,
+    ) -> tuple[list["IndexPoint3D"], np.ndarray]:
+        """
+        Calculates the probability of moving from a node to each of its
+        neighbours, as in Ant.calculate_probability_at_neighbour. Heuristics
+        held per time bucket are taken in the bucket nearest the time.
+        """
+        node_id = self.node_ids[node]
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        neighbours = self.indices[start:end]
+
+        time_bucket = self.get_time_bucket(heuristic_key, time)
+        pheromone = self.pheromones[pheromone_key][start:end]
+        heuristic = self.get_heuristic(heuristic_key, time_bucket)[neighbours]
+        factors = self.get_neighbour_factors(
+            pheromone_key, heuristic_key, alpha, beta, time_bucket
+        )
+        has_neighbours = self.indptr[neighbours + 1] > self.indptr[neighbours]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            probabilities = np.where(
+                has_neighbours,
+                np.power(pheromone, alpha)
+                * np.power(heuristic, beta)
+                / factors[neighbours],
+                0.0001,
+            )
+
+        return [self.node_list[i] for i in neighbours.tolist()], probabilities
+
+
+class EdgeData(MutableMapping):
+    def __init__(self, graph: ArrayGraph, edge: typing.Hashable):
+        """
+        Pheromone data of a single edge, writing through to the graph
+        """
+        self.graph: ArrayGraph = graph
+        self.edge: typing.Hashable = edge
+
+    def __getitem__(self, key: str) -> float:
+        return self.graph.get_pheromone(self.edge, key)
+
+    def __setitem__(self, key: str, value: float) -> None:
+        if key not in self.graph.pheromones:
+            raise KeyError(key)
+        self.graph.set_pheromone(self.edge, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("Edge data cannot be deleted")
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.graph.pheromones)
+
+    def __len__(self) -> int:
+        return len(self.graph.pheromones)
+
+
+class AdjacencyView(Mapping):
+    def __init__(self, graph: ArrayGraph, node_id: int):
+        """
+        The neighbours of a node, mapped to the data of the edge to them
+        """
+        self.graph: ArrayGraph = graph
+        self.start: int = int(graph.indptr[node_id])
+        self.end: int = int(graph.indptr[node_id + 1])
+
+    def __getitem__(self, node: "IndexPoint3D") -> EdgeData:
+        neighbours = self.graph.indices[self.start : self.end]
+        node_id = self.graph.node_ids[node]
+        position = np.searchsorted(neighbours, node_id)
+        if position == len(neighbours) or neighbours[position] != node_id:
+            raise KeyError(node)
+        return EdgeData(self.graph, self.start + int(position))
+
+    def __iter__(self) -> typing.Iterator["IndexPoint3D"]:
+        node_list = self.graph.node_list
+        for i in self.graph.indices[self.start : self.end].tolist():
+            yield node_list[i]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+
+class NodeView(Mapping):
+    def __init__(self, graph: ArrayGraph):
+        """
+        The nodes of the graph, mapped to their heuristics
+        """
+        self.graph: ArrayGraph = graph
+        self.heuristic_keys: list[str] = [
+            key for key in graph.arrays if key.endswith("_heuristic")
+        ]
+
+    def __getitem__(self, node: "IndexPoint3D") -> dict[str, float]:
+        node_id = self.graph.node_ids[node]
+        return {
+            key: float(self.graph.arrays[key][node_id]) for key in self.heuristic_keys
+        }
+
+    def __contains__(self, node: "IndexPoint3D") -> bool:
+        return node in self.graph.node_ids
+
+    def __iter__(self) -> typing.Iterator["IndexPoint3D"]:
+        return iter(self.graph.node_list)
+
+    def __len__(self) -> int:
+        return len(self.graph.node_list)
+
+
+class EdgeView(Mapping):
+    def __init__(self, graph: ArrayGraph):
+        """
+        The edges of the graph, mapped to their pheromones
+        """
+        self.graph: ArrayGraph = graph
+
+    def __getitem__(self, edge: tuple["IndexPoint3D", "IndexPoint3D"]) -> EdgeData:
+        u, v = edge
+        return self.graph[u][v]
+
+    def __iter__(self) -> typing.Iterator[tuple["IndexPoint3D", "IndexPoint3D"]]:
+        node_list = self.graph.node_list
+        sources = self.graph.get_edge_sources().tolist()
+        for u, v in zip(sources, self.graph.indices.tolist()):
+            yield node_list[u], node_list[v]
+
+    def __len__(self) -> int:
+        return len(self.graph.indices)
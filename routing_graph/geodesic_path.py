@@ -24,15 +24,15 @@ class GeodesicPath(list):
         )
         super().__init__(self.path)
 
-    def reduce_angle(self, angle: float) -> float:
+    def reduce_angle(self, angle: float or np.ndarray) -> float or np.ndarray:
         """
-        Reduces an angle to the range -180 to 180 degrees.
+        Reduces an angle, or an array of angles, to the range -180 to 180 degrees.
         """
-        while angle < -180:
-            angle += 360
-        while angle > 180:
-            angle -= 360
-        return angle
+        angle = np.where(
+            angle < -180, angle + 360 * np.ceil((-180 - angle) / 360), angle
+        )
+        angle = np.where(angle > 180, angle - 360 * np.ceil((angle - 180) / 360), angle)
+        return angle if angle.ndim else angle.item()
 
     def calculate_alpha1(self, phi1: float, phi2: float, delta: float) -> float:
         """
@@ -52,14 +52,12 @@ class GeodesicPath(list):
         Calculates the central angle (through the Earth's core) between two points.
         """
         numerator = np.sqrt(
-            pow(
-                (
-                    (np.cos(phi1) * np.sin(phi2))
-                    - np.sin(phi1) * np.cos(phi2) * np.cos(delta)
-                ),
-                2,
+            (
+                (np.cos(phi1) * np.sin(phi2))
+                - np.sin(phi1) * np.cos(phi2) * np.cos(delta)
             )
-            + pow((np.cos(phi2) * np.sin(delta)), 2)
+            ** 2
+            + (np.cos(phi2) * np.sin(delta)) ** 2
         )
         denominator = (np.sin(phi1) * np.sin(phi2)) + np.cos(phi1) * np.cos(
             phi2
@@ -102,15 +100,18 @@ class GeodesicPath(list):
         return equator_longitude
 
     def find_point_distance_along_great_circle(
-        self, distance: float, azimuth: float, equator_longitude: float
+        self,
+        distance: float or np.ndarray,
+        azimuth: float,
+        equator_longitude: float,
     ) -> "Point2D":
         """
-        Find a lat/lon point a certain distance along the great circle path.
+        Find a lat/lon point, or arrays of them, certain distances along the
+        great circle path.
         """
         phi_numerator = np.cos(azimuth) * np.sin(distance)
         phi_denominator = np.sqrt(
-            pow(np.cos(distance), 2)
-            + (pow(np.sin(azimuth), 2) * pow(np.sin(distance), 2))
+            np.cos(distance) ** 2 + (np.sin(azimuth) ** 2 * np.sin(distance) ** 2)
         )
         phi = np.arctan2(phi_numerator, phi_denominator)
         lambda_numerator = np.sin(azimuth) * np.sin(distance)
@@ -148,18 +149,17 @@ class GeodesicPath(list):
         angle1 = self.calculate_angle_1(alpha1, phi1)
         equator_longitude = self.calculate_equator_longitude(azimuth, angle1, lambda1)
 
-        points = [(lat0, lon0)]
-
         total_distance = self.config.R * central_angle
         step = total_distance / no_of_points
-        for i in range(1, no_of_points):
-            distance = angle1 + ((i * step) / self.config.R)
-            points.append(
-                self.find_point_distance_along_great_circle(
-                    distance, azimuth, equator_longitude
-                )
-            )
+        distances = angle1 + ((np.arange(1, no_of_points) * step) / self.config.R)
+        latitudes, longitudes = self.find_point_distance_along_great_circle(
+            distances, azimuth, equator_longitude
+        )
 
+        points = [(lat0, lon0)]
+        points.extend(
+            zip(np.atleast_1d(latitudes).tolist(), np.atleast_1d(longitudes).tolist())
+        )
         points.append((lat1, lon1))
 
         return points
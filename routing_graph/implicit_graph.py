@@ -0,0 +1,315 @@
+import numpy as np
+from collections.abc import Mapping
+import typing
+
+from .array_graph import EdgeData, EdgeView
+
+if typing.TYPE_CHECKING:
+    from config import Config
+    from objectives import Objective
+    from .altitude_grid import AltitudeGrid
+    from _types import IndexPoint3D
+
+
+class ImplicitGraph:
+    def __init__(
+        self,
+        altitude_grid: "AltitudeGrid",
+        objectives: list["Objective"],
+        config: "Config",
+    ):
+        """
+        A routing graph which computes successors from the altitude grid when
+        they are first needed, rather than materialising every edge.
+
+        Heuristics are calculated and cached per visited node, and pheromones
+        are only stored on edges whose pheromone differs from the default every
+        other edge shares, so memory scales with the visited edges.
+        """
+        self.config: "Config" = config
+        self.altitude_grid: "AltitudeGrid" = altitude_grid
+        self.altitude_indices: dict[int, int] = altitude_grid.altitude_indices
+        self.objectives: list["Objective"] = objectives
+
+        self.successors: dict["IndexPoint3D", list["IndexPoint3D"]] = {}
+        self.heuristics: dict["IndexPoint3D", dict[str, float]] = {}
+        self.heuristic_keys: list[str] = [
+            f"{objective}_heuristic" for objective in objectives
+        ]
+        self.default_pheromones: dict[str, float] = {
+            f"{objective}_pheromone": config.TAU_MAX for objective in objectives
+        }
+        self.pheromones: dict[str, dict["IndexPoint3D", dict]] = {
+            key: {} for key in self.default_pheromones
+        }
+        self.pheromone_version: int = 0
+        self.neighbour_factors: dict[tuple, float] = {}
+        self.neighbour_factors_version: int = 0
+
+        self.nodes: ImplicitNodeView = ImplicitNodeView(self)
+        self.edges: ImplicitEdgeView = ImplicitEdgeView(self)
+
+    def has_node(self, node: "IndexPoint3D") -> bool:
+        xi, yi, altitude = node
+        if altitude not in self.altitude_indices:
+            return False
+        widths = self.altitude_grid.widths
+        return (
+            0 <= xi < len(widths)
+            and 0 <= yi < widths[xi]
+            and bool(self.altitude_grid.mask[self.altitude_indices[altitude], xi, yi])
+        )
+
+    def get_successors(self, node: "IndexPoint3D") -> list["IndexPoint3D"]:
+        """
+        Gets the successors of a node, following the rules of
+        RoutingGraph.get_consecutive_points
+        """
+        if node not in self.successors:
+            xi, yi, altitude = node
+            max_alt = max(
+                self.config.STARTING_ALTITUDE,
+                min(altitude + self.config.MAX_ALTITUDE_VAR, self.config.MAX_ALTITUDE),
+            )
+            widths = self.altitude_grid.widths
+            successors = []
+            for next_altitude in range(
+                altitude, max_alt + 1, self.config.ALTITUDE_STEP
+            ):
+                if next_altitude not in self.altitude_indices:
+                    continue
+                if xi + 1 >= len(widths):
+                    break
+                reachable = self.altitude_grid.mask[
+                    self.altitude_indices[next_altitude], xi + 1
+                ]
+                next_layer_length = int(widths[xi + 1]) - 1
+                min_i = min(max(yi - self.config.OFFSET_VAR, 0), next_layer_length)
+                max_i = min(yi + self.config.OFFSET_VAR, next_layer_length)
+                successors.extend(
+                    (xi + 1, i, next_altitude)
+                    for i in range(min_i, max_i + 1)
+                    if reachable[i]
+                )
+            self.successors[node] = successors
+        return self.successors[node]
+
+    def get_heuristics(
+        self, nodes: list["IndexPoint3D"], heuristic_key: str
+    ) -> np.ndarray:
+        """
+        Gets a heuristic of each node, calculating those not yet cached in one
+        batch per objective
+        """
+        missing = [node for node in nodes if node not in self.heuristics]
+        if missing:
+            xi, yi, altitudes = np.array(missing).T
+            points = np.column_stack(
+                (
+                    self.altitude_grid.latitudes[xi, yi],
+                    self.altitude_grid.longitudes[xi, yi],
+                    altitudes,
+                )
+            ).astype(float)
+            values = {
+                f"{objective}_heuristic": np.asarray(
+                    objective.calculate_heuristics(points), dtype=float
+                )
+                for objective in self.objectives
+            }
+            for i, node in enumerate(missing):
+                self.heuristics[node] = {
+                    key: float(value[i]) for key, value in values.items()
+                }
+        return np.array(
+            [self.heuristics[node][heuristic_key] for node in nodes], dtype=float
+        )
+
+    def get_pheromone(
+        self, edge: tuple["IndexPoint3D", "IndexPoint3D"], key: str
+    ) -> float:
+        u, v = edge
+        return self.pheromones[key].get(u, {}).get(v, self.default_pheromones[key])
+
+    def get_pheromones(
+        self, node: "IndexPoint3D", neighbours: list["IndexPoint3D"], key: str
+    ) -> np.ndarray:
+        """
+        Gets the pheromone of the edges from a node to its neighbours
+        """
+        pheromones = np.full(len(neighbours), self.default_pheromones[key], dtype=float)
+        stored = self.pheromones[key].get(node)
+        if stored:
+            for i, neighbour in enumerate(neighbours):
+                if neighbour in stored:
+                    pheromones[i] = stored[neighbour]
+        return pheromones
+
+    def set_pheromone(
+        self, edge: tuple["IndexPoint3D", "IndexPoint3D"], key: str, value: float
+    ) -> None:
+        u, v = edge
+        self.pheromones[key].setdefault(u, {})[v] = value
+        self.pheromone_version += 1
+
+    def evaporate(self, key: str, evaporation_rate: float, tau_min: float) -> None:
+        """
+        Evaporates the pheromone of every edge, bounded below by tau_min.
+        Stored pheromones which fall to the default are dropped.
+        """
+        default = max(tau_min, (1 - evaporation_rate) * self.default_pheromones[key])
+        self.default_pheromones[key] = default
+        for u, stored in list(self.pheromones[key].items()):
+            for v, pheromone in list(stored.items()):
+                pheromone = max(tau_min, (1 - evaporation_rate) * pheromone)
+                if pheromone == default:
+                    del stored[v]
+                else:
+                    stored[v] = pheromone
+            if not stored:
+                del self.pheromones[key][u]
+        self.pheromone_version += 1
+
+    def get_neighbour_factor(
+        self,
+        node: "IndexPoint3D",
+        pheromone_key: str,
+        heuristic_key: str,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        """
+        Gets the sum of pheromone^alpha * heuristic^beta over the outgoing edges
+        of a node. Cached until the pheromones next change.
+        """
+        if self.neighbour_factors_version != self.pheromone_version:
+            self.neighbour_factors = {}
+            self.neighbour_factors_version = self.pheromone_version
+
+        cache_key = (node, pheromone_key, heuristic_key, alpha, beta)
+        if cache_key not in self.neighbour_factors:
+            successors = self.get_successors(node)
+            pheromone = self.get_pheromones(node, successors, pheromone_key)
+            heuristic = self.get_heuristics(successors, heuristic_key)
+            self.neighbour_factors[cache_key] = float(
+                np.sum(np.power(pheromone, alpha) * np.power(heuristic, beta))
+            )
+        return self.neighbour_factors[cache_key]
+
+    def calculate_probabilities(
+        self,
+        node: "IndexPoint3D",
+        pheromone_key: str,
+        heuristic_key: str,
+        alpha: float,
+        beta: float,
+        time: int or None = None,
+    ) -> tuple[list["IndexPoint3D"], np.ndarray]:
+        """
+        Calculates the probability of moving from a node to each of its
+        neighbours, as in Ant.calculate_probability_at_neighbour. Implicit
+        graphs hold one heuristic per node, so the time is unused.
+        """
+        neighbours = self.get_successors(node)
+        pheromone = self.get_pheromones(node, neighbours, pheromone_key)
+        heuristic = self.get_heuristics(neighbours, heuristic_key)
+        factors = np.array(
+            [
+                self.get_neighbour_factor(
+                    neighbour, pheromone_key, heuristic_key, alpha, beta
+                )
+                for neighbour in neighbours
+            ],
+            dtype=float,
+        )
+        has_neighbours = np.array(
+            [len(self.get_successors(neighbour)) > 0 for neighbour in neighbours],
+            dtype=bool,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            probabilities = np.where(
+                has_neighbours,
+                np.power(pheromone, alpha) * np.power(heuristic, beta) / factors,
+                0.0001,
+            )
+
+        return list(neighbours), probabilities
+
+    def __getitem__(self, node: "IndexPoint3D") -> "ImplicitAdjacencyView":
+        if not self.has_node(node):
+            raise KeyError(node)
+        return ImplicitAdjacencyView(self, node)
+
+    def __contains__(self, node: "IndexPoint3D") -> bool:
+        return self.has_node(node)
+
+    def __iter__(self) -> typing.Iterator["IndexPoint3D"]:
+        for altitude in sorted(self.altitude_indices):
+            reachable = self.altitude_grid.mask[self.altitude_indices[altitude]]
+            for xi, yi in zip(*np.nonzero(reachable)):
+                yield int(xi), int(yi), altitude
+
+    def __len__(self) -> int:
+        if not hasattr(self, "no_of_nodes"):
+            self.no_of_nodes = sum(1 for _ in self)
+        return self.no_of_nodes
+
+
+class ImplicitAdjacencyView(Mapping):
+    def __init__(self, graph: ImplicitGraph, node: "IndexPoint3D"):
+        """
+        The successors of a node, mapped to the data of the edge to them
+        """
+        self.graph: ImplicitGraph = graph
+        self.node: "IndexPoint3D" = node
+        self.successors: list["IndexPoint3D"] = graph.get_successors(node)
+
+    def __getitem__(self, node: "IndexPoint3D") -> EdgeData:
+        if node not in self.successors:
+            raise KeyError(node)
+        return EdgeData(self.graph, (self.node, node))
+
+    def __iter__(self) -> typing.Iterator["IndexPoint3D"]:
+        return iter(self.successors)
+
+    def __len__(self) -> int:
+        return len(self.successors)
+
+
+class ImplicitNodeView(Mapping):
+    def __init__(self, graph: ImplicitGraph):
+        """
+        The nodes of the graph, mapped to their heuristics
+        """
+        self.graph: ImplicitGraph = graph
+
+    def __getitem__(self, node: "IndexPoint3D") -> dict[str, float]:
+        if not self.graph.has_node(node):
+            raise KeyError(node)
+        return {
+            key: float(self.graph.get_heuristics([node], key)[0])
+            for key in self.graph.heuristic_keys
+        }
+
+    def __contains__(self, node: "IndexPoint3D") -> bool:
+        return self.graph.has_node(node)
+
+    def __iter__(self) -> typing.Iterator["IndexPoint3D"]:
+        return iter(self.graph)
+
+    def __len__(self) -> int:
+        return len(self.graph)
+
+
+class ImplicitEdgeView(EdgeView):
+    """
+    The edges of the graph, generated node by node when iterated
+    """
+
+    def __iter__(self) -> typing.Iterator[tuple["IndexPoint3D", "IndexPoint3D"]]:
+        for u in self.graph:
+            for v in self.graph.get_successors(u):
+                yield u, v
+
+    def __len__(self) -> int:
+        return sum(len(self.graph.get_successors(u)) for u in self.graph)
@@ -1,12 +1,15 @@
-from networkx import DiGraph, read_gml, write_gml
-from networkx.classes.reportviews import NodeView, EdgeView
-import os
+import numpy as np
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import print
 import typing
 
+from .array_graph import ArrayGraph, AdjacencyView, NodeView, EdgeView
+from .implicit_graph import ImplicitGraph
+from cache import ALTITUDE_GRID_FIELDS
+
 if typing.TYPE_CHECKING:
     from config import Config
+    from cache import Cache
     from performance_model import PerformanceModel
     from .altitude_grid import AltitudeGrid
     from _types import IndexPoint3D, Grid3D
@@ -18,15 +21,19 @@ class RoutingGraph:
         altitude_grid: "AltitudeGrid",
         performance_model: "PerformanceModel",
         config: "Config",
+        cache: "Cache" or None = None,
         test: bool = False,
     ):
         """
         Create a RoutingGraph object
         """
         self.config: "Config" = config
+        self.cache: "Cache" or None = cache
         self.altitude_grid: "AltitudeGrid" = altitude_grid
         self.performance_model: "PerformanceModel" = performance_model
-        self.routing_graph: DiGraph = self._init_routing_graph(test=test)
+        self.routing_graph: ArrayGraph or ImplicitGraph = self._init_routing_graph(
+            test=test
+        )
         self.nodes: NodeView = self.routing_graph.nodes
         self.edges: EdgeView = self.routing_graph.edges
 
@@ -62,77 +69,184 @@ class RoutingGraph:
 
         return points
 
-    def calculate_routing_graph(self) -> DiGraph:
+    def calculate_graph_arrays(self) -> dict[str, np.ndarray]:
+        """
+        Enumerates the nodes, edges and heuristics of the routing graph with
+        numpy index arithmetic, following the rules of get_consecutive_points.
+        Unlike get_consecutive_points, points which are unreachable at an
+        altitude are never the target of an edge.
+        """
+        altitude_grid = self.altitude_grid
+        altitudes = altitude_grid.altitudes.tolist()
+        altitude_indices = altitude_grid.altitude_indices
+        widths = altitude_grid.widths
+        latitudes, longitudes = altitude_grid.latitudes, altitude_grid.longitudes
+        mask = altitude_grid.mask
+        no_of_steps, max_width = latitudes.shape
+
+        def dense_id(a: np.ndarray, xi: np.ndarray, yi: np.ndarray) -> np.ndarray:
+            return (a * no_of_steps + xi) * max_width + yi
+
+        max_lateral_var = self.config.OFFSET_VAR
+        node_ids, edge_sources, edge_targets = [], [], []
+        for a, altitude in enumerate(altitudes):
+            max_alt = max(
+                self.config.STARTING_ALTITUDE,
+                min(altitude + self.config.MAX_ALTITUDE_VAR, self.config.MAX_ALTITUDE),
+            )
+            next_altitudes = [
+                altitude_indices[next_altitude]
+                for next_altitude in range(
+                    altitude, max_alt + 1, self.config.ALTITUDE_STEP
+                )
+                if next_altitude in altitude_indices
+            ]
+
+            xi, yi = np.nonzero(mask[a])
+            if next_altitudes:
+                # Points in the last step have no consecutive points
+                has_next = xi < no_of_steps - 1
+                node_ids.append(dense_id(a, xi[has_next], yi[has_next]))
+                xi, yi = xi[has_next], yi[has_next]
+            else:
+                node_ids.append(dense_id(a, xi, yi))
+                continue
+
+            sources = dense_id(a, xi, yi)
+            next_layer_length = widths[xi + 1] - 1
+            min_i = np.minimum(np.maximum(yi - max_lateral_var, 0), next_layer_length)
+            max_i = np.minimum(yi + max_lateral_var, next_layer_length)
+            counts = max_i - min_i + 1
+
+            edge_offsets = np.arange(counts.sum()) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            next_xi = np.repeat(xi + 1, counts)
+            next_yi = np.repeat(min_i, counts) + edge_offsets
+            edge_source = np.repeat(sources, counts)
+            for next_a in next_altitudes:
+                reachable = mask[next_a, next_xi, next_yi]
+                edge_sources.append(edge_source[reachable])
+                edge_targets.append(
+                    dense_id(next_a, next_xi[reachable], next_yi[reachable])
+                )
+
+        edge_sources = np.concatenate(edge_sources or [np.empty(0, dtype=int)])
+        edge_targets = np.concatenate(edge_targets or [np.empty(0, dtype=int)])
+        node_ids = np.unique(np.concatenate(node_ids + [edge_targets]))
+
+        # Compress the dense ids and sort the edges into CSR order
+        sources = np.searchsorted(node_ids, edge_sources)
+        targets = np.searchsorted(node_ids, edge_targets)
+        order = np.lexsort((targets, sources))
+        indices = targets[order]
+        indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(sources, minlength=len(node_ids))))
+        )
+
+        a, rest = np.divmod(node_ids, no_of_steps * max_width)
+        xi, yi = np.divmod(rest, max_width)
+        node_altitudes = np.array(altitudes)[a]
+        points = np.column_stack(
+            (latitudes[xi, yi], longitudes[xi, yi], node_altitudes)
+        )
+
+        arrays = {
+            "nodes": np.column_stack((xi, yi, node_altitudes)),
+            "points": points,
+            "indptr": indptr,
+            "indices": indices,
+        }
+        # Each objective is created once, and calculates each node's heuristic once
+        for objective in self.config.OBJECTIVES:
+            objective = objective(self.performance_model, self.config)
+            arrays[f"{objective}_heuristic"] = np.asarray(
+                objective.calculate_heuristics(points), dtype=float
+            )
+            # Heuristics which vary with time are also held per time bucket
+            heuristics_by_time = objective.calculate_heuristics_by_time(points)
+            if heuristics_by_time is not NotImplemented:
+                times, heuristics = heuristics_by_time
+                arrays[f"{objective}_heuristic_times"] = np.asarray(
+                    times, dtype=np.int64
+                )
+                arrays[f"{objective}_heuristic_by_time"] = np.asarray(
+                    heuristics, dtype=float
+                )
+            arrays[f"{objective}_pheromone"] = np.full(
+                len(indices), self.config.TAU_MAX, dtype=float
+            )
+
+        return arrays
+
+    def calculate_routing_graph(self) -> ArrayGraph:
         """
         Calculates a full routing graph from an altitude grid
         """
-        graph = DiGraph()
+        return ArrayGraph(self.calculate_graph_arrays())
 
-        altitude_grid = self.altitude_grid
+    def calculate_implicit_graph(self) -> ImplicitGraph:
+        """
+        Creates a routing graph whose edges are computed as they are visited
+        """
+        objectives = [
+            objective(self.performance_model, self.config)
+            for objective in self.config.OBJECTIVES
+        ]
+        return ImplicitGraph(self.altitude_grid, objectives, self.config)
+
+    def calculate_probabilities(
+        self,
+        node: "IndexPoint3D",
+        objective: str,
+        alpha: float,
+        beta: float,
+        time: int or None = None,
+    ) -> tuple[list["IndexPoint3D"], np.ndarray]:
+        """
+        Calculates the probability of an ant moving to each neighbour of a node,
+        with heuristics which vary with time taken at a time in nanoseconds since
+        the epoch
+        """
+        return self.routing_graph.calculate_probabilities(
+            node, f"{objective}_pheromone", f"{objective}_heuristic", alpha, beta, time
+        )
 
-        for altitude in altitude_grid:
-            for step in altitude_grid[altitude]:
-                for point in step:
-                    if point is None:
-                        continue
-
-                    xi = altitude_grid[altitude].index(step)
-                    yi = step.index(point)
-
-                    consecutive_points = self.get_consecutive_points(
-                        (xi, yi, altitude), altitude_grid
-                    )
-
-                    heuristic_data = {
-                        f"{objective(self.performance_model,self.config)}_heuristic": objective(
-                            self.performance_model, self.config
-                        ).calculate_heuristic((*point, altitude))
-                        for objective in self.config.OBJECTIVES
-                    }
-
-                    if consecutive_points is None:
-                        continue
-                    graph.add_node(
-                        (xi, yi, altitude),
-                        **heuristic_data,
-                    )
-                    for next_point in consecutive_points:
-                        pheromone_data = {
-                            f"{objective(self.performance_model,self.config)}_pheromone": self.config.TAU_MAX
-                            for objective in self.config.OBJECTIVES
-                        }
-                        next_heuristic_data = {
-                            f"{objective(self.performance_model,self.config)}_heuristic": objective(
-                                self.performance_model, self.config
-                            ).calculate_heuristic(next_point)
-                            for objective in self.config.OBJECTIVES
-                        }
-
-                        graph.add_edge(
-                            (xi, yi, altitude),
-                            (next_point[0], next_point[1], next_point[2]),
-                            **pheromone_data,
-                        )
-                        next_lat, next_lon, _ = next_point
-
-                        graph.add_node(
-                            (next_point[0], next_point[1], next_point[2]),
-                            **next_heuristic_data,
-                        )
-
-        return graph
-
-    def parse_node(self, s: str) -> "IndexPoint3D":
-        """
-        Parses a GML node into an IndexPoint3D
-        """
-        parts = s.strip("()").split(",")
-        return tuple(map(int, parts))
-
-    def __getitem__(self, key: "IndexPoint3D") -> NodeView:
+    def evaporate_pheromone(
+        self, objective: str, evaporation_rate: float, tau_min: float
+    ) -> None:
+        """
+        Evaporates the pheromone of an objective on every edge
+        """
+        self.routing_graph.evaporate(
+            f"{objective}_pheromone", evaporation_rate, tau_min
+        )
+
+    def __getitem__(self, key: "IndexPoint3D") -> AdjacencyView:
         return self.routing_graph[key]
 
-    def _init_routing_graph(self, test: bool = False) -> DiGraph:
+    def get_cache_key(self) -> str:
+        """
+        Gets the cache key of the graph, which depends on the grid, the
+        objectives and the grids the heuristics are calculated from
+        """
+        return self.cache.get_key(
+            "routing_graph",
+            ALTITUDE_GRID_FIELDS
+            + [
+                "OBJECTIVES",
+                "TAU_MAX",
+                "NOMINAL_THRUST",
+                "AIRCRAFT_TYPE",
+                "DEPARTURE_DATE",
+            ],
+            upstream=[
+                self.performance_model.get_contrail_grid_manager().cache_key,
+                self.performance_model.get_ps_grid().cache_key,
+            ],
+        )
+
+    def _init_routing_graph(self, test: bool = False) -> ArrayGraph or ImplicitGraph:
         """
         Retrieves the routing graph from a file or calculates it
         """
@@ -142,13 +256,18 @@ class RoutingGraph:
             transient=True,
         ) as progress:
             progress.add_task(description="Creating routing graph...", total=None)
-            if os.path.exists("data/routing_graph.gml") and not test:
-                rg = read_gml("data/routing_graph.gml", destringizer=self.parse_node)
-                self.routing_graph = rg
+            if self.config.IMPLICIT_GRAPH:
+                self.routing_graph = self.calculate_implicit_graph()
+            elif test or self.cache is None:
+                self.routing_graph = self.calculate_routing_graph()
             else:
-                rg = self.calculate_routing_graph()
-                if not test:
-                    write_gml(rg, "data/routing_graph.gml")
+                path, cached = self.cache.lookup("routing_graph", self.get_cache_key())
+                if cached:
+                    rg = ArrayGraph.load(path)
+                else:
+                    rg = self.calculate_routing_graph()
+                    rg.save(path)
+                    self.cache.store(path)
                 self.routing_graph = rg
         print("[bold green]:white_check_mark: Routing graph constructed.[/bold green]")
         return self.routing_graph
@@ -1,6 +1,8 @@
 import numpy as np
 import typing
 
+from utils import geodesy
+
 if typing.TYPE_CHECKING:
     from _types import Point2D, Path2D, Grid2D
     from config import Config
@@ -25,20 +27,7 @@ class RoutingGrid:
         Calculates new coordinates based on initial point, distance, and bearing
         """
         lat1, lon1 = p1
-
-        lat1 = np.radians(lat1)
-        lon1 = np.radians(lon1)
-
-        lat2 = np.arcsin(
-            np.sin(lat1) * np.cos(distance / self.config.R)
-            + np.cos(lat1) * np.sin(distance / self.config.R) * np.cos(bearing)
-        )
-        lon2 = lon1 + np.arctan2(
-            np.sin(bearing) * np.sin(distance / self.config.R) * np.cos(lat1),
-            np.cos(distance / self.config.R) - np.sin(lat1) * np.sin(lat2),
-        )
-
-        return np.degrees(lat2), np.degrees(lon2)
+        return geodesy.destination(lat1, lon1, distance, bearing, self.config.R)
 
     def calculate_normal_bearing(self, bearing: float) -> float:
         """
@@ -52,59 +41,66 @@ class RoutingGrid:
         """
         lat1, lon1 = p1
         lat2, lon2 = p2
-        delta_lon = lon2 - lon1
-
-        lat1 = np.radians(lat1)
-        lat2 = np.radians(lat2)
-        delta_lon = np.radians(delta_lon)
+        return geodesy.initial_bearing(lat1, lon1, lat2, lon2)
 
-        x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(
-            delta_lon
+    def calculate_grid_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculates the latitudes and longitudes of the grid as arrays of shape
+        (n_points, 2 * GRID_WIDTH + 1), centred on the geodesic path, with a mask
+        of which lateral offsets are valid at each point
+        """
+        path = np.asarray(self.path, dtype=float).reshape(-1, 2)
+        no_of_points, width = len(path), self.config.GRID_WIDTH
+        index = np.arange(no_of_points)[:, np.newaxis]
+        offsets = np.arange(width, -width - 1, -1)[np.newaxis, :]
+
+        # Offsets narrow towards the destination, and the last point has none
+        valid = (
+            index + (np.abs(offsets) / self.config.OFFSET_VAR) <= no_of_points - 1
+        ) & (index + 1 <= no_of_points - 1)
+        valid |= offsets == 0
+
+        next_path = np.vstack((path[1:], path[-1:]))
+        bearing = self.calculate_normal_bearing(
+            self.calculate_bearing(path.T, next_path.T)
+        )[:, np.newaxis]
+        latitudes, longitudes = self.calculate_new_coordinates(
+            (path[:, 0:1], path[:, 1:2]), self.config.GRID_SPACING * offsets, bearing
         )
-        y = np.sin(delta_lon) * np.cos(lat1)
-        z = np.arctan2(y, x) % (2 * np.pi)  # Convert to range [0, 2pi]
+        # The centre of the grid is the path itself
+        latitudes[:, width], longitudes[:, width] = path[:, 0], path[:, 1]
 
-        return z
+        return latitudes, longitudes, valid
 
     def calculate_routing_grid(self) -> "Grid2D":
         """
-        Calculates the routing grid
+        Calculates the routing grid, with the valid points of each step
+        left-aligned
         """
+        latitudes, longitudes, valid = self.get_grid_arrays()
         grid = []
-        for point in self.path:
-            lat, lon = point
-            positive_waypoints = []
-            negative_waypoints = []
-            potential_waypoints = []
-            for i in range(1, self.config.GRID_WIDTH + 1):
-                index = self.path.index(point)
-
-                if index + (i / self.config.OFFSET_VAR) > len(self.path) - 1:
-                    continue
-
-                if index + 1 > len(self.path) - 1:
-                    continue
-
-                bearing = self.calculate_bearing(self.path[index], self.path[index + 1])
-                bearing = self.calculate_normal_bearing(bearing)
-
-                new_point_positive = self.calculate_new_coordinates(
-                    point, self.config.GRID_SPACING * i, bearing
-                )
-                new_point_negative = self.calculate_new_coordinates(
-                    point, self.config.GRID_SPACING * i * -1, bearing
-                )
-                plat, plon = new_point_positive
-                nlat, nlon = new_point_negative
-                positive_waypoints.append((plat, plon))
-                negative_waypoints.append((nlat, nlon))
-            # reverse positive waypoints
-            positive_waypoints = list(reversed(positive_waypoints))
-            potential_waypoints = positive_waypoints + [(lat, lon)] + negative_waypoints
-
-            grid.append(potential_waypoints)
+        for step_latitudes, step_longitudes, step_valid in zip(
+            latitudes.tolist(), longitudes.tolist(), valid.tolist()
+        ):
+            grid.append(
+                [
+                    (lat, lon)
+                    for lat, lon, is_valid in zip(
+                        step_latitudes, step_longitudes, step_valid
+                    )
+                    if is_valid
+                ]
+            )
         return grid
 
+    def get_grid_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gets the latitude, longitude and validity arrays of the grid
+        """
+        if not hasattr(self, "grid_arrays"):
+            self.grid_arrays = self.calculate_grid_arrays()
+        return self.grid_arrays
+
     def get_routing_grid(self) -> "Grid2D":
         """
         Gets the routing grid
@@ -62,3 +62,30 @@ class TestAltitudeGrid(unittest.TestCase):
         # Modify altitude grid and assert the change
         self.altitude_grid[0] = [(0, 0), (0, 0), (0, 0)]
         self.assertEqual(self.altitude_grid[0], [(0, 0), (0, 0), (0, 0)])
+
+    def test_grid_arrays(self):
+        self.assertEqual(self.altitude_grid.latitudes.shape, (3, 3))
+        self.assertEqual(self.altitude_grid.mask.shape, (4, 3, 3))
+        # Points are masked where they match the Nones of the altitude grid
+        for altitude, a in self.altitude_grid.altitude_indices.items():
+            for xi, step in enumerate(self.altitude_grid[altitude]):
+                for yi, point in enumerate(step):
+                    self.assertEqual(
+                        self.altitude_grid.mask[a, xi, yi], point is not None
+                    )
+
+    def test_views_built_lazily(self):
+        self.assertEqual(self.altitude_grid.altitude_views, {})
+        self.assertEqual(self.altitude_grid[1][0], [None, None, None])
+        self.assertEqual(self.altitude_grid[1][1][2], (5, 5))
+        self.assertEqual(list(self.altitude_grid.altitude_views), [1])
+
+    def test_convert_index_path(self):
+        indices = [(0, 0, 0), (1, 2, 0), (2, 1, 0)]
+        flight_path = self.altitude_grid.convert_index_path(indices)
+        self.assertEqual(
+            flight_path,
+            [self.altitude_grid.convert_index_to_point(index) for index in indices],
+        )
+        self.assertEqual(flight_path[1]["latitude"], 5)
+        self.assertEqual(flight_path[2]["longitude"], 7)
@@ -0,0 +1,91 @@
+import unittest
+import pickle
+import tempfile
+import os
+import numpy as np
+from ..array_graph import ArrayGraph
+
+
+class TestArrayGraph(unittest.TestCase):
+    def setUp(self):
+        # (0, 0, 0) -> (1, 0, 0), (1, 1, 0); (1, 0, 0) -> (2, 0, 0)
+        self.arrays = {
+            "nodes": np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [2, 0, 0]]),
+            "indptr": np.array([0, 2, 3, 3, 3]),
+            "indices": np.array([1, 2, 3]),
+            "test_heuristic": np.array([1.0, 2.0, 3.0, 4.0]),
+            "test_pheromone": np.array([1.0, 0.5, 1.0]),
+        }
+        self.graph = ArrayGraph(self.arrays)
+
+    def test_views(self):
+        self.assertEqual(len(self.graph.nodes), 4)
+        self.assertEqual(len(self.graph.edges), 3)
+        self.assertEqual(list(self.graph[(0, 0, 0)]), [(1, 0, 0), (1, 1, 0)])
+        self.assertEqual(self.graph[(1, 1, 0)], {})
+        self.assertEqual(self.graph.nodes[(1, 1, 0)], {"test_heuristic": 3.0})
+        self.assertEqual(self.graph[(0, 0, 0)][(1, 1, 0)]["test_pheromone"], 0.5)
+        self.assertEqual(
+            list(self.graph.edges),
+            [((0, 0, 0), (1, 0, 0)), ((0, 0, 0), (1, 1, 0)), ((1, 0, 0), (2, 0, 0))],
+        )
+        with self.assertRaises(KeyError):
+            self.graph[(0, 0, 0)][(2, 0, 0)]
+
+    def test_set_pheromone(self):
+        self.graph[(0, 0, 0)][(1, 0, 0)]["test_pheromone"] = 0.2
+        self.assertEqual(self.graph.edges[(0, 0, 0), (1, 0, 0)]["test_pheromone"], 0.2)
+        # The input arrays are not modified
+        self.assertEqual(self.arrays["test_pheromone"][0], 1.0)
+
+    def test_evaporate(self):
+        self.graph.evaporate("test_pheromone", 0.5, 0.3)
+        np.testing.assert_allclose(
+            self.graph.pheromones["test_pheromone"], [0.5, 0.3, 0.5]
+        )
+
+    def test_calculate_probabilities(self):
+        neighbours, probabilities = self.graph.calculate_probabilities(
+            (0, 0, 0), "test_pheromone", "test_heuristic", 1, 1
+        )
+        self.assertEqual(neighbours, [(1, 0, 0), (1, 1, 0)])
+        # (1, 0, 0) has one neighbour with a factor of 1 * 4, (1, 1, 0) has none
+        np.testing.assert_allclose(probabilities, [2 / 4, 0.0001])
+
+        # The cached neighbour factors are refreshed when pheromones change
+        self.graph[(1, 0, 0)][(2, 0, 0)]["test_pheromone"] = 0.5
+        _, probabilities = self.graph.calculate_probabilities(
+            (0, 0, 0), "test_pheromone", "test_heuristic", 1, 1
+        )
+        np.testing.assert_allclose(probabilities, [2 / 2, 0.0001])
+
+    def test_calculate_probabilities_by_time(self):
+        self.arrays["test_heuristic_times"] = np.array([0, 3600, 7200]) * 10**9
+        self.arrays["test_heuristic_by_time"] = np.array(
+            [[1.0, 1.0, 1.0], [2.0, 6.0, 2.0], [3.0, 3.0, 3.0], [4.0, 1.0, 4.0]]
+        )
+        graph = ArrayGraph(self.arrays)
+        self.assertEqual(graph.nodes[(1, 1, 0)], {"test_heuristic": 3.0})
+
+        # Times take the nearest bucket, and no time the time-summed heuristic
+        for time, expected in [(None, 2 / 4), (3000 * 10**9, 6 / 1), (10**14, 2 / 4)]:
+            _, probabilities = graph.calculate_probabilities(
+                (0, 0, 0), "test_pheromone", "test_heuristic", 1, 1, time
+            )
+            np.testing.assert_allclose(probabilities, [expected, 0.0001])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "routing_graph")
+            self.graph.save(path)
+            graph = ArrayGraph.load(path)
+
+            self.assertIsInstance(graph.arrays["indices"], np.memmap)
+            self.assertEqual(list(graph.edges), list(self.graph.edges))
+            self.assertEqual(graph.nodes[(2, 0, 0)], {"test_heuristic": 4.0})
+            graph[(0, 0, 0)][(1, 0, 0)]["test_pheromone"] = 0.2
+
+            # Unpickled graphs re-map the static arrays from disk
+            unpickled = pickle.loads(pickle.dumps(graph))
+            self.assertIsInstance(unpickled.arrays["indices"], np.memmap)
+            self.assertEqual(unpickled[(0, 0, 0)][(1, 0, 0)]["test_pheromone"], 0.2)
@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from ..geodesic_path import GeodesicPath
 
 
@@ -53,3 +54,21 @@ class TestGeodesicPath(unittest.TestCase):
         point = geodesic_path.find_point_distance_along_great_circle(0, 0, 0)
         self.assertIsInstance(point, tuple)
         self.assertEqual(len(point), 2)
+
+    def test_calculate_path_matches_points(self):
+        geodesic_path = GeodesicPath(self.config)
+        # Points along the whole path are calculated as arrays at once
+        latitudes, longitudes = geodesic_path.find_point_distance_along_great_circle(
+            np.array([0.1, 0.2]), 0.5, 0
+        )
+        for i, distance in enumerate([0.1, 0.2]):
+            point = geodesic_path.find_point_distance_along_great_circle(
+                distance, 0.5, 0
+            )
+            self.assertAlmostEqual(point[0], latitudes[i])
+            self.assertAlmostEqual(point[1], longitudes[i])
+
+    def test_reduce_angles(self):
+        geodesic_path = GeodesicPath(self.config)
+        angles = geodesic_path.reduce_angle(np.array([360, 180, -180, -540, 725]))
+        self.assertEqual(angles.tolist(), [0, 180, -180, -180, 5])
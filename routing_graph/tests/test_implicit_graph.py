@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+from routing_graph import RoutingGraph, AltitudeGrid
+from config import Config
+from objectives import Objective
+from ..implicit_graph import ImplicitGraph
+
+
+class TestImplicitGraph(unittest.TestCase):
+    def setUp(self):
+        class MockRoutingGrid:
+            def get_routing_grid(self):
+                return [
+                    [(0, 0), (1, 1), (2, 2)],
+                    [(3, 3), (4, 4), (5, 5)],
+                    [(6, 6), (7, 7), (8, 8)],
+                ]
+
+        class MockObjective(Objective):
+            def __init__(self, performance_model, config):
+                super().__init__(performance_model, config)
+                self.name = "test"
+
+            def calculate_heuristics(self, points):
+                return points[:, 0] + 1
+
+        class MockConfig(Config):
+            OBJECTIVES = [MockObjective]
+            STARTING_ALTITUDE = 0
+            MAX_ALTITUDE = 1
+            MAX_ALTITUDE_VAR = 1
+            OFFSET_VAR = 1
+            ALTITUDE_STEP = 1
+            TAU_MAX = 1
+
+        # Altitude 1 is only reachable from the second step
+        altitude_grid = AltitudeGrid(MockRoutingGrid(), MockConfig())
+        self.routing_graph = RoutingGraph(altitude_grid, None, MockConfig(), test=True)
+        self.array_graph = self.routing_graph.routing_graph
+        self.graph = ImplicitGraph(
+            altitude_grid, [MockObjective(None, None)], MockConfig()
+        )
+
+    def test_matches_array_graph(self):
+        for node in self.array_graph:
+            self.assertEqual(list(self.graph[node]), list(self.array_graph[node]))
+            self.assertEqual(self.graph.nodes[node], self.array_graph.nodes[node])
+        self.assertEqual(set(self.graph.edges), set(self.array_graph.edges))
+
+    def test_pheromones(self):
+        edge = ((0, 0, 0), (1, 1, 1))
+        self.assertEqual(self.graph.edges[edge]["test_pheromone"], 1)
+        self.assertEqual(self.graph.pheromones["test_pheromone"], {})
+
+        self.graph.edges[edge]["test_pheromone"] = 0.8
+        self.graph.evaporate("test_pheromone", 0.5, 0.3)
+        self.assertEqual(self.graph.edges[edge]["test_pheromone"], 0.4)
+        self.assertEqual(self.graph[(0, 0, 0)][(1, 0, 0)]["test_pheromone"], 0.5)
+
+        # Edges which evaporate down to the default are no longer stored
+        self.graph.evaporate("test_pheromone", 0.5, 0.3)
+        self.assertEqual(self.graph.pheromones["test_pheromone"], {})
+
+    def test_calculate_probabilities(self):
+        for u, v in [((0, 0, 0), (1, 1, 0)), ((1, 1, 0), (2, 2, 1))]:
+            self.graph[u][v]["test_pheromone"] = 0.5
+            self.array_graph[u][v]["test_pheromone"] = 0.5
+
+        for node in [(0, 0, 0), (0, 1, 0), (1, 1, 1)]:
+            neighbours, probabilities = self.graph.calculate_probabilities(
+                node, "test_pheromone", "test_heuristic", 2, 1
+            )
+            expected_neighbours, expected = self.array_graph.calculate_probabilities(
+                node, "test_pheromone", "test_heuristic", 2, 1
+            )
+            self.assertEqual(neighbours, expected_neighbours)
+            np.testing.assert_allclose(probabilities, expected)
@@ -1,6 +1,8 @@
 import unittest
+import numpy as np
 from routing_graph import RoutingGraph
 from config import Config
+from objectives import Objective
 
 
 class TestRoutingGraph(unittest.TestCase):
@@ -19,6 +21,13 @@ class TestRoutingGraph(unittest.TestCase):
                         [(6, 6), (7, 7), (8, 8)],
                     ],
                 }
+                self.altitudes = np.array([0, 1])
+                self.altitude_indices = {0: 0, 1: 1}
+                self.widths = np.array([3, 3, 3])
+                self.latitudes = np.arange(9, dtype=float).reshape(3, 3)
+                self.longitudes = np.arange(9, dtype=float).reshape(3, 3)
+                self.mask = np.ones((2, 3, 3), dtype=bool)
+                self.mask[1, 0] = False
 
             def __iter__(self):
                 return iter(self.altitude_grid)
@@ -29,15 +38,17 @@ class TestRoutingGraph(unittest.TestCase):
             def __getitem__(self, key):
                 return self.altitude_grid[key]
 
-        class MockObjective:
+        class MockObjective(Objective):
             def __init__(self, performance_model, config):
-                self.config = config
+                super().__init__(performance_model, config)
                 self.name = "test"
-                self.performance_model = performance_model
 
             def calculate_heuristic(self, point):
                 return 1
 
+            def calculate_heuristics(self, points):
+                return [self.calculate_heuristic(point) for point in points]
+
             def __str__(self):
                 return self.name
 
@@ -75,10 +86,17 @@ class TestRoutingGraph(unittest.TestCase):
         self.assertEqual(len(graph.nodes), 15)
         self.assertEqual(len(graph.edges), 14)
 
-    def test_parse_node(self):
-        node = self.routing_graph.parse_node("(0, 0, 31000)")
-        # Assert parsing of node string
-        self.assertEqual(node, (0, 0, 31000))
+    def test_unreachable_points_have_no_edges(self):
+        self.mock_config.MAX_ALTITUDE = 1
+        self.mock_config.MAX_ALTITUDE_VAR = 1
+        self.mock_altitude_grid[1][1][0] = None
+        self.mock_altitude_grid.mask[1, 1, 0] = False
+        graph = self.routing_graph.calculate_routing_graph()
+        # Edges are only made to points which exist at their altitude
+        self.assertNotIn((1, 0, 1), graph.nodes)
+        for _, v in graph.edges:
+            self.assertIsNotNone(self.mock_altitude_grid[v[2]][v[0]][v[1]])
+        self.assertIn(((0, 0, 0), (1, 1, 1)), graph.edges)
 
     def test_init_routing_graph(self):
         routing_graph = self.routing_graph._init_routing_graph(test=True)
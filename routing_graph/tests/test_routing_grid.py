@@ -49,3 +49,19 @@ class TestRoutingGrid(unittest.TestCase):
         self.assertEqual(len(routing_grid), 3)
         # Width should match GRID_WIDTH
         self.assertEqual(len(routing_grid[0]), self.config.GRID_WIDTH * 2 - 1)
+
+    def test_calculate_grid_arrays(self):
+        latitudes, longitudes, valid = self.routing_grid.calculate_grid_arrays()
+        width = self.config.GRID_WIDTH * 2 + 1
+        self.assertEqual(latitudes.shape, (3, width))
+        self.assertEqual(longitudes.shape, (3, width))
+        # Offsets narrow towards the destination, the centre is always valid
+        self.assertEqual(valid.sum(axis=1).tolist(), [5, 3, 1])
+        self.assertTrue(valid[:, self.config.GRID_WIDTH].all())
+
+        # The list form is the valid points of each step, left-aligned
+        routing_grid = self.routing_grid.calculate_routing_grid()
+        for xi, step in enumerate(routing_grid):
+            self.assertEqual(
+                step, list(zip(latitudes[xi][valid[xi]], longitudes[xi][valid[xi]]))
+            )
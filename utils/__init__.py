@@ -1 +1,3 @@
 from .conversions import Conversions
+from .flight_path import FlightPath, FlightPointView
+from .interpolation import GridInterpolator, InterpolationIndex
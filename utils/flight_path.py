@@ -0,0 +1,341 @@
+from collections.abc import MutableMapping
+import hashlib
+import numpy as np
+import pandas as pd
+import pycontrails as pc
+import typing
+
+if typing.TYPE_CHECKING:
+    from _types import FlightPoint
+
+NAT: int = np.iinfo(np.int64).min
+
+
+class FlightPath:
+    """
+    A flight path held as one array per field, with times held as int64
+    nanoseconds since the epoch. The arrays are over-allocated so that
+    appending is amortised O(1).
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray] or None = None):
+        """
+        Constructs a FlightPath from columns of equal length
+        """
+        columns = columns or {}
+        self.length: int = len(next(iter(columns.values()), []))
+        self.capacity: int = self.length
+        self.buffers: dict[str, np.ndarray] = {}
+        # Masks of the points where a field was never set, only kept for fields
+        # which are missing at some point
+        self.missing: dict[str, np.ndarray] = {}
+        for field, values in columns.items():
+            self[field] = values
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        The columns of the flight path, as views of the buffers
+        """
+        return {field: values[: self.length] for field, values in self.buffers.items()}
+
+    @classmethod
+    def from_points(cls, points: list["FlightPoint"]) -> "FlightPath":
+        """
+        Constructs a FlightPath from a list of points
+        """
+        flight_path = cls()
+        fields = list(dict.fromkeys(field for point in points for field in point))
+        flight_path.length = flight_path.capacity = len(points)
+        for field in fields:
+            values = [point.get(field) for point in points]
+            flight_path[field] = values
+            missing = np.array([value is None for value in values], dtype=bool)
+            if missing.any():
+                flight_path.missing[field] = missing
+        return flight_path
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "FlightPath":
+        """
+        Constructs a FlightPath from the columns of a dataframe, with null
+        values missing as dataframes have no other way to leave them out
+        """
+        flight_path = cls({field: df[field].values for field in df.columns})
+        for field in df.columns:
+            missing = df[field].isna().values
+            if missing.any():
+                flight_path.missing[field] = missing
+        return flight_path
+
+    @classmethod
+    def coerce(cls, flight_path: "FlightPath" or list["FlightPoint"]) -> "FlightPath":
+        """
+        Returns a flight path as a FlightPath, converting lists of points
+        """
+        if isinstance(flight_path, cls):
+            return flight_path
+        return cls.from_points(flight_path)
+
+    def to_dataframe(self, columns: list[str] or None = None) -> pd.DataFrame:
+        """
+        Converts the flight path to a dataframe without copying the columns
+        """
+        columns = self.keys() if columns is None else columns
+        return pd.DataFrame(
+            {field: self[field] for field in columns if field in self.buffers},
+            columns=columns,
+            copy=False,
+        )
+
+    def to_flight(self, **kwargs) -> pc.Flight:
+        """
+        Converts the flight path to a pycontrails Flight without copying the
+        columns
+        """
+        data = {field: self[field] for field in self.keys()}
+        return pc.Flight(data=data, copy=False, **kwargs)
+
+    def fingerprint(self) -> str:
+        """
+        Hashes the fields and values of the flight path, so that identical
+        trajectories share a fingerprint
+        """
+        digest = hashlib.sha256()
+        columns = self.columns
+        for field in sorted(columns):
+            values = columns[field]
+            digest.update(f"{field}:{values.dtype}".encode())
+            if values.dtype == object:
+                digest.update(repr(values.tolist()).encode())
+            else:
+                digest.update(np.ascontiguousarray(values).tobytes())
+            if field in self.missing:
+                digest.update(self.missing[field][: self.length].tobytes())
+        return digest.hexdigest()
+
+    def keys(self) -> list[str]:
+        return list(self.buffers)
+
+    def copy(self) -> "FlightPath":
+        flight_path = FlightPath()
+        flight_path.length = flight_path.capacity = self.length
+        flight_path.buffers = {
+            field: values.copy() for field, values in self.columns.items()
+        }
+        flight_path.missing = {
+            field: missing[: self.length].copy()
+            for field, missing in self.missing.items()
+        }
+        return flight_path
+
+    def append(self, point: "FlightPoint") -> None:
+        """
+        Appends a point to the end of the flight path, growing the buffers
+        geometrically when they are full
+        """
+        if self.length == self.capacity:
+            self._set_capacity(max(2 * self.capacity, 16))
+        self.length += 1
+        for field in dict.fromkeys([*self.buffers, *point]):
+            self.set_value(self.length - 1, field, point.get(field))
+
+    def get_value(self, i: int, field: str) -> typing.Any:
+        """
+        Gets the value of a field at a point, or None if it was never set
+        """
+        if self.is_missing(i, field):
+            return None
+        value = self.buffers[field][i]
+        if field == "time":
+            return pd.Timestamp(value)
+        if self.buffers[field].dtype != object:
+            value = value.item()
+        return value
+
+    def set_value(self, i: int, field: str, value: typing.Any) -> None:
+        """
+        Sets the value of a field at a point, adding the field if needed.
+        Setting None marks the field as missing at the point.
+        """
+        if field not in self.buffers:
+            self.buffers[field] = self._get_missing(field, self.capacity)
+            self.missing[field] = np.ones(self.capacity, dtype=bool)
+        if value is None:
+            if field not in self.missing:
+                self.missing[field] = np.zeros(self.capacity, dtype=bool)
+            self.missing[field][i] = True
+        elif field in self.missing:
+            self.missing[field][i] = False
+        value = self._to_column(field, [value])
+        values = self.buffers[field]
+        if self._get_dtype(values, value) != values.dtype:
+            values = self.buffers[field] = values.astype(object)
+        values[i] = value[0]
+
+    def is_missing(self, i: int, field: str) -> bool:
+        """
+        Checks whether a field was never set at a point. Fields set to NaN are
+        not missing.
+        """
+        if field not in self.buffers:
+            return True
+        return field in self.missing and bool(self.missing[field][i])
+
+    def _set_capacity(self, capacity: int) -> None:
+        """
+        Reallocates the buffers to hold a number of points, keeping the first
+        self.length
+        """
+        for field, values in self.buffers.items():
+            buffer = self._get_missing(field, capacity).astype(values.dtype)
+            buffer[: self.length] = values[: self.length]
+            self.buffers[field] = buffer
+        for field, missing in self.missing.items():
+            buffer = np.ones(capacity, dtype=bool)
+            buffer[: self.length] = missing[: self.length]
+            self.missing[field] = buffer
+        self.capacity = capacity
+
+    def _to_column(self, field: str, values: typing.Any) -> np.ndarray:
+        """
+        Converts values to a column, with times as int64 nanoseconds and other
+        numbers as floats
+        """
+        if np.ndim(values) == 0:
+            values = [values] * self.length
+        if field == "time":
+            times = pd.DatetimeIndex(values)
+            if times.tz is not None:
+                times = times.tz_convert(None)
+            return times.as_unit("ns").asi8
+        values = np.asarray(values)
+        if values.dtype == object:
+            try:
+                return np.array(
+                    [np.nan if value is None else value for value in values],
+                    dtype=float,
+                )
+            except (TypeError, ValueError):
+                return values
+        if values.dtype.kind in "biuf":
+            return values.astype(float, copy=False)
+        return values.astype(object)
+
+    def _get_dtype(self, values: np.ndarray, value: np.ndarray) -> np.dtype:
+        """
+        Gets the dtype a column needs to hold new values, falling back to object
+        """
+        if values.dtype == value.dtype:
+            return values.dtype
+        if values.dtype.kind in "fi" and value.dtype.kind in "fi":
+            return np.result_type(values, value)
+        return np.dtype(object)
+
+    def _get_missing(self, field: str, length: int) -> np.ndarray:
+        if field == "time":
+            return np.full(length, NAT, dtype=np.int64)
+        return np.full(length, np.nan)
+
+    def _get_index(self, i: int) -> int:
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("flight path index out of range")
+        return i
+
+    def __getitem__(self, key: str or int or slice) -> typing.Any:
+        """
+        Gets a column by field name, a point view by index, or a flight path by
+        slice. Times are returned as datetime64 views of the epoch times.
+        """
+        if isinstance(key, str):
+            values = self.buffers[key][: self.length]
+            if key == "time":
+                return values.view("datetime64[ns]")
+            return values
+        if isinstance(key, slice):
+            flight_path = FlightPath(
+                {field: self[field][key] for field in self.buffers}
+                if self.buffers
+                else None
+            )
+            flight_path.missing = {
+                field: missing[: self.length][key].copy()
+                for field, missing in self.missing.items()
+            }
+            return flight_path
+        return FlightPointView(self, self._get_index(key))
+
+    def __setitem__(self, key: str or int, value: typing.Any) -> None:
+        """
+        Sets a column by field name, or the fields of a point by index
+        """
+        if isinstance(key, str):
+            column = self._to_column(key, value)
+            if not self.buffers:
+                self.length = self.capacity = len(column)
+            if len(column) != self.length:
+                raise ValueError(
+                    f"Column {key} has length {len(column)}, expected {self.length}"
+                )
+            if self.capacity != self.length:
+                self._set_capacity(self.length)
+            self.buffers[key] = column
+            self.missing.pop(key, None)
+            return
+        key = self._get_index(key)
+        for field, field_value in dict(value).items():
+            self.set_value(key, field, field_value)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> "iter":
+        return (FlightPointView(self, i) for i in range(self.length))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (FlightPath, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            point == other_point for point, other_point in zip(self, other)
+        )
+
+    def __repr__(self) -> str:
+        return f"FlightPath(length={self.length}, fields={self.keys()})"
+
+
+class FlightPointView(MutableMapping):
+    """
+    A dict-like view of one point of a FlightPath. Fields which were never set
+    at the point are left out, as they would be from a dict.
+    """
+
+    def __init__(self, flight_path: FlightPath, i: int):
+        self.flight_path: FlightPath = flight_path
+        self.i: int = i
+
+    def __getitem__(self, field: str) -> typing.Any:
+        if self.flight_path.is_missing(self.i, field):
+            raise KeyError(field)
+        return self.flight_path.get_value(self.i, field)
+
+    def __setitem__(self, field: str, value: typing.Any) -> None:
+        self.flight_path.set_value(self.i, field, value)
+
+    def __delitem__(self, field: str) -> None:
+        self[field]
+        self.flight_path.set_value(self.i, field, None)
+
+    def __iter__(self) -> "iter":
+        return (
+            field
+            for field in self.flight_path.keys()
+            if not self.flight_path.is_missing(self.i, field)
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
@@ -0,0 +1,188 @@
+import numpy as np
+
+# WGS-84 ellipsoid
+WGS84_A: float = 6378137.0  # m
+WGS84_F: float = 1 / 298.257223563
+WGS84_B: float = (1 - WGS84_F) * WGS84_A
+MEAN_EARTH_RADIUS: float = 6371008.8  # m
+
+
+def _output(value: np.ndarray) -> float or np.ndarray:
+    """
+    Returns floats for scalar inputs and arrays for array inputs
+    """
+    return value.item() if np.ndim(value) == 0 else value
+
+
+def haversine(
+    lat1: float or np.ndarray,
+    lon1: float or np.ndarray,
+    lat2: float or np.ndarray,
+    lon2: float or np.ndarray,
+    radius: float = MEAN_EARTH_RADIUS,
+) -> float or np.ndarray:
+    """
+    Calculates the great circle distance between points in degrees on a sphere,
+    in the units of the radius. Accurate to about 0.5% on the Earth.
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(np.subtract(lon2, lon1))
+
+    a = (
+        np.sin(delta_phi / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    )
+    return _output(2 * radius * np.arcsin(np.sqrt(np.clip(a, 0, 1))))
+
+
+def vincenty(
+    lat1: float or np.ndarray,
+    lon1: float or np.ndarray,
+    lat2: float or np.ndarray,
+    lon2: float or np.ndarray,
+    tolerance: float = 1e-12,
+    max_iterations: int = 200,
+) -> float or np.ndarray:
+    """
+    Calculates the distance in m between points in degrees on the WGS-84
+    ellipsoid with Vincenty's inverse formula. Accurate to within a millimetre
+    of geopy's geodesic, except for nearly antipodal points which routes never
+    approach. Points where the iteration doesn't converge fall back to the
+    haversine distance.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (lat1, lon1, lat2, lon2))
+    )
+    f = WGS84_F
+    L = np.radians(lon2 - lon1)
+    L = (L + np.pi) % (2 * np.pi) - np.pi
+    U1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sin_U1, cos_U1 = np.sin(U1), np.cos(U1)
+    sin_U2, cos_U2 = np.sin(U2), np.cos(U2)
+
+    lam = L
+    converged = np.zeros(L.shape, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.sqrt(
+                (cos_U2 * sin_lam) ** 2
+                + (cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lam) ** 2
+            )
+            cos_sigma = sin_U1 * sin_U2 + cos_U1 * cos_U2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            # Coincident points have no azimuth
+            sin_alpha = np.where(
+                sin_sigma == 0, 0.0, cos_U1 * cos_U2 * sin_lam / sin_sigma
+            )
+            cos_sq_alpha = 1 - sin_alpha**2
+            # Equatorial lines have no midpoint latitude
+            cos_2_sigma_m = np.where(
+                cos_sq_alpha == 0, 0.0, cos_sigma - 2 * sin_U1 * sin_U2 / cos_sq_alpha
+            )
+            C = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+            previous_lam = lam
+            lam = L + (1 - C) * f * sin_alpha * (
+                sigma
+                + C
+                * sin_sigma
+                * (cos_2_sigma_m + C * cos_sigma * (-1 + 2 * cos_2_sigma_m**2))
+            )
+            converged = np.abs(lam - previous_lam) < tolerance
+            if converged.all():
+                break
+
+    u_sq = cos_sq_alpha * (WGS84_A**2 - WGS84_B**2) / WGS84_B**2
+    A = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    B = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = (
+        B
+        * sin_sigma
+        * (
+            cos_2_sigma_m
+            + B
+            / 4
+            * (
+                cos_sigma * (-1 + 2 * cos_2_sigma_m**2)
+                - B
+                / 6
+                * cos_2_sigma_m
+                * (-3 + 4 * sin_sigma**2)
+                * (-3 + 4 * cos_2_sigma_m**2)
+            )
+        )
+    )
+    distance = WGS84_B * A * (sigma - delta_sigma)
+
+    if not converged.all():
+        distance = np.where(
+            converged, distance, haversine(lat1, lon1, lat2, lon2) * np.ones_like(L)
+        )
+    return _output(distance)
+
+
+def distance(
+    lat1: float or np.ndarray,
+    lon1: float or np.ndarray,
+    lat2: float or np.ndarray,
+    lon2: float or np.ndarray,
+    method: str = "vincenty",
+) -> float or np.ndarray:
+    """
+    Calculates the distance in m between points in degrees, either on the
+    ellipsoid with "vincenty" or, faster and less accurately, on a sphere with
+    "haversine"
+    """
+    if method == "vincenty":
+        return vincenty(lat1, lon1, lat2, lon2)
+    elif method == "haversine":
+        return haversine(lat1, lon1, lat2, lon2)
+    raise ValueError(f"Unknown distance method: {method}")
+
+
+def initial_bearing(
+    lat1: float or np.ndarray,
+    lon1: float or np.ndarray,
+    lat2: float or np.ndarray,
+    lon2: float or np.ndarray,
+) -> float or np.ndarray:
+    """
+    Calculates the initial great circle bearing in radians, in the range
+    [0, 2pi), from points in degrees to other points
+    """
+    delta_lon = np.radians(np.subtract(lon2, lon1))
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(delta_lon)
+    y = np.sin(delta_lon) * np.cos(lat2)
+    return _output(np.arctan2(y, x) % (2 * np.pi))
+
+
+def destination(
+    lat: float or np.ndarray,
+    lon: float or np.ndarray,
+    distance: float or np.ndarray,
+    bearing: float or np.ndarray,
+    radius: float = MEAN_EARTH_RADIUS,
+) -> tuple:
+    """
+    Calculates the points reached from points in degrees after travelling
+    distances, in the units of the radius, along bearings in radians on a sphere
+    """
+    lat1 = np.radians(lat)
+    lon1 = np.radians(lon)
+    angular_distance = np.divide(distance, radius)
+
+    lat2 = np.arcsin(
+        np.sin(lat1) * np.cos(angular_distance)
+        + np.cos(lat1) * np.sin(angular_distance) * np.cos(bearing)
+    )
+    lon2 = lon1 + np.arctan2(
+        np.sin(bearing) * np.sin(angular_distance) * np.cos(lat1),
+        np.cos(angular_distance) - np.sin(lat1) * np.sin(lat2),
+    )
+
+    return _output(np.degrees(lat2)), _output(np.degrees(lon2))
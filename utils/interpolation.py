@@ -0,0 +1,206 @@
+import bisect
+import os
+import shutil
+import numpy as np
+import xarray as xr
+import typing
+
+
+class InterpolationIndex(typing.NamedTuple):
+    """
+    Flat indices into a grid, and the weights to combine them with, of shape
+    (n_corners, n_points), and a mask of the points outside the grid if they
+    are to be NaN
+    """
+
+    indices: np.ndarray
+    weights: np.ndarray
+    outside: np.ndarray or None = None
+
+
+def get_bracket(axis: list[float], value: float, method: str) -> tuple[int, int, float]:
+    """
+    Gets the indices of the coordinates either side of a single value on a
+    sorted axis and the weight of the upper one, as GridInterpolator.get_index
+    does for arrays. Nearest lookups give both indices as the nearest one.
+    """
+    if len(axis) == 1:
+        return 0, 0, 0.0
+    if method == "nearest":
+        upper = min(max(bisect.bisect_left(axis, value), 1), len(axis) - 1)
+        lower = upper - 1
+        nearest = lower if value - axis[lower] <= axis[upper] - value else upper
+        return nearest, nearest, 0.0
+    elif method == "linear":
+        lower = min(max(bisect.bisect_right(axis, value) - 1, 0), len(axis) - 2)
+        weight = (value - axis[lower]) / (axis[lower + 1] - axis[lower])
+        return lower, lower + 1, min(max(weight, 0.0), 1.0)
+    raise ValueError(f"Unknown interpolation method: {method}")
+
+
+class GridInterpolator:
+    def __init__(self, axes: list[np.ndarray], values: np.ndarray):
+        """
+        Interpolates variables on a regular grid with sorted axes. The values
+        have shape (n_variables, *axis lengths). Times are handled as
+        nanoseconds since the epoch.
+        """
+        self.directory: str or None = None
+        self.axes: list[np.ndarray] = [self._to_float(axis) for axis in axes]
+        self.shape: tuple[int] = tuple(len(axis) for axis in self.axes)
+        self.values: np.ndarray = np.ascontiguousarray(values).reshape(len(values), -1)
+        self.strides: np.ndarray = np.array(
+            [int(np.prod(self.shape[d + 1 :])) for d in range(len(self.shape))]
+        )
+
+    @classmethod
+    def from_dataarrays(
+        cls, dataarrays: list[xr.DataArray], dims: list[str]
+    ) -> "GridInterpolator":
+        """
+        Constructs an interpolator over some dims of data arrays. Any other dims
+        are flattened into extra variables.
+        """
+        dataarrays = [dataarray.sortby(dims) for dataarray in dataarrays]
+        axes = [dataarrays[0][dim].values for dim in dims]
+        values = np.concatenate(
+            [
+                dataarray.transpose(..., *dims).values.reshape(
+                    -1, *(len(axis) for axis in axes)
+                )
+                for dataarray in dataarrays
+            ]
+        )
+        return cls(axes, values)
+
+    def save(self, directory: str) -> None:
+        """
+        Saves the values as a .npy file, for map
+        """
+        tmp_directory = f"{directory}.tmp"
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+        np.save(os.path.join(tmp_directory, "values.npy"), self.values)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+
+    def map(self, directory: str) -> None:
+        """
+        Maps the values saved in a directory read-only, so that processes which
+        unpickle the interpolator share them rather than copying them
+        """
+        self.directory = directory
+        self.values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r")
+
+    def __getstate__(self) -> dict:
+        # Saved values are re-mapped on unpickling rather than copied
+        state = self.__dict__.copy()
+        if self.directory is not None:
+            state["values"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.directory is not None:
+            self.map(self.directory)
+
+    def _to_float(self, values: np.ndarray) -> np.ndarray:
+        """
+        Converts coordinates to floats, with times as nanoseconds since the epoch
+        """
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.datetime64):
+            values = values.astype("datetime64[ns]").astype(np.int64)
+        return np.asarray(values, dtype=float).reshape(-1)
+
+    def get_index(
+        self,
+        coordinates: list[np.ndarray],
+        method: str = "linear",
+        out_of_bounds: str = "clamp",
+    ) -> InterpolationIndex:
+        """
+        Precomputes the indices and weights of points on the grid, from the
+        coordinates of the points along each axis. Points outside the grid take
+        the values at its edges with out_of_bounds="clamp", or NaN with
+        out_of_bounds="nan" as xarray's interp gives.
+        """
+        coordinates = [self._to_float(values) for values in coordinates]
+        if out_of_bounds == "clamp":
+            outside = None
+        elif out_of_bounds == "nan":
+            outside = np.zeros(len(coordinates[0]), dtype=bool)
+            for axis, values in zip(self.axes, coordinates):
+                outside |= ~((values >= axis[0]) & (values <= axis[-1]))
+        else:
+            raise ValueError(f"Unknown out of bounds handling: {out_of_bounds}")
+
+        if method == "nearest":
+            flat_indices = sum(
+                self._get_nearest(axis, values) * stride
+                for axis, values, stride in zip(self.axes, coordinates, self.strides)
+            )
+            return InterpolationIndex(
+                flat_indices[np.newaxis], np.ones((1, len(flat_indices))), outside
+            )
+        elif method == "linear":
+            no_of_points = len(coordinates[0])
+            indices = np.zeros((1, no_of_points), dtype=np.int64)
+            weights = np.ones((1, no_of_points))
+            # Corners combine the lower and upper bracket of every axis in turn
+            for axis, values, stride in zip(self.axes, coordinates, self.strides):
+                lower, upper_weight = self._get_bracket(axis, values)
+                step = stride if len(axis) > 1 else 0
+                indices = (
+                    indices[:, np.newaxis, :]
+                    + (lower * stride)[np.newaxis, np.newaxis, :]
+                    + np.array([0, step])[np.newaxis, :, np.newaxis]
+                ).reshape(-1, no_of_points)
+                weights = (
+                    weights[:, np.newaxis, :]
+                    * np.stack((1 - upper_weight, upper_weight))[np.newaxis]
+                ).reshape(-1, no_of_points)
+            return InterpolationIndex(indices, weights, outside)
+        raise ValueError(f"Unknown interpolation method: {method}")
+
+    def _get_nearest(self, axis: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Gets the index of the nearest coordinate on an axis, preferring the lower
+        coordinate when equally near
+        """
+        if len(axis) == 1:
+            return np.zeros(len(values), dtype=np.int64)
+        upper = np.clip(np.searchsorted(axis, values), 1, len(axis) - 1)
+        lower = upper - 1
+        return np.where(values - axis[lower] <= axis[upper] - values, lower, upper)
+
+    def _get_bracket(
+        self, axis: np.ndarray, values: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the lower index of the coordinates on an axis either side of each
+        value, and the weight of the upper coordinate
+        """
+        if len(axis) == 1:
+            return np.zeros(len(values), dtype=np.int64), np.zeros(len(values))
+        lower = np.clip(
+            np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2
+        )
+        weights = (values - axis[lower]) / (axis[lower + 1] - axis[lower])
+        return lower, np.clip(weights, 0, 1)
+
+    def interpolate(self, index: InterpolationIndex) -> np.ndarray:
+        """
+        Gets the values of every variable at the points of a precomputed index,
+        of shape (n_variables, n_points)
+        """
+        if len(index.indices) == 1:
+            values = self.values[:, index.indices[0]]
+        else:
+            values = np.einsum(
+                "vkn,kn->vn", self.values[:, index.indices], index.weights
+            )
+        if index.outside is not None and index.outside.any():
+            values = values.astype(float)
+            values[:, index.outside] = np.nan
+        return values
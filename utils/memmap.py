@@ -0,0 +1,41 @@
+import os
+import json
+import shutil
+import numpy as np
+import xarray as xr
+
+
+def save_dataset(dataset: xr.Dataset, directory: str) -> None:
+    """
+    Saves a dataset as a directory with a .npy file per data variable, and its
+    coordinates in a small netCDF file
+    """
+    tmp_directory = f"{directory}.tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+    variables = {}
+    for name, variable in dataset.data_vars.items():
+        np.save(os.path.join(tmp_directory, f"{name}.npy"), variable.values)
+        variables[name] = {"dims": list(variable.dims), "attrs": variable.attrs}
+    with open(os.path.join(tmp_directory, "variables.json"), "w") as f:
+        json.dump(variables, f, default=str)
+    dataset.drop_vars(list(dataset.data_vars)).to_netcdf(
+        os.path.join(tmp_directory, "coords.nc")
+    )
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+
+
+def load_dataset(directory: str) -> xr.Dataset:
+    """
+    Loads a dataset saved with save_dataset, with its data variables as
+    read-only memory maps which every process shares through the page cache
+    """
+    with xr.open_dataset(os.path.join(directory, "coords.nc")) as coords:
+        dataset = coords.load()
+    with open(os.path.join(directory, "variables.json")) as f:
+        variables = json.load(f)
+    for name, variable in variables.items():
+        values = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        dataset[name] = xr.Variable(variable["dims"], values, variable["attrs"])
+    return dataset
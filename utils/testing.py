@@ -0,0 +1,83 @@
+import networkx as nx
+import pandas as pd
+
+from objectives import Objective
+
+# Mocks shared by the optimiser tests. They are defined at module level so they
+# can be pickled to executor workers.
+
+
+def create_lattice_graph(no_of_points: int = 3, width: int = 5) -> nx.DiGraph:
+    """
+    Creates a layered graph where each node links to the nodes at most one step
+    sideways in the next layer, with lateral and centre heuristics
+    """
+    centre = width // 2
+    graph = nx.DiGraph()
+    for xi in range(no_of_points + 1):
+        for yi in range(width):
+            graph.add_node(
+                (xi, yi, 0),
+                lateral_heuristic=-yi,
+                centre_heuristic=-abs(centre - yi),
+            )
+    for xi in range(no_of_points):
+        for yi in range(width):
+            for next_yi in range(max(yi - 1, 0), min(yi + 1, width - 1) + 1):
+                graph.add_edge((xi, yi, 0), (xi + 1, next_yi, 0))
+    return graph
+
+
+class MockPerformanceModel:
+    def run_apm(self, flight_path):
+        return flight_path
+
+
+class MockRoutingGraphManager:
+    def __init__(self, routing_graph: nx.DiGraph or None = None):
+        self.performance_model = MockPerformanceModel()
+        self.routing_graph = routing_graph
+
+    def get_routing_graph(self):
+        return self.routing_graph
+
+    def get_performance_model(self):
+        return self.performance_model
+
+    def convert_index_to_point(self, index):
+        return {
+            "latitude": index[0],
+            "longitude": index[1],
+            "altitude_ft": index[2],
+            "thrust": 1,
+            "level": 0,
+        }
+
+    def convert_index_path(self, indices):
+        return [self.convert_index_to_point(index) for index in indices]
+
+
+class MockLateralObjective(Objective):
+    def __init__(self, performance_model, config):
+        super().__init__(performance_model, config)
+        self.name = "lateral"
+
+    def _run_objective_function(self, flight_path):
+        return sum(point["longitude"] for point in flight_path)
+
+
+class MockCentreObjective(MockLateralObjective):
+    def __init__(self, performance_model, config):
+        super().__init__(performance_model, config)
+        self.name = "centre"
+
+    def _run_objective_function(self, flight_path):
+        return sum(abs(2 - point["longitude"]) for point in flight_path)
+
+
+class MockConfig:
+    STARTING_WEIGHT = 100000
+    STARTING_ALTITUDE = 0
+    GRID_WIDTH = 2
+    OBJECTIVES = [MockLateralObjective, MockCentreObjective]
+    DEPARTURE_DATE = pd.Timestamp(year=2024, month=1, day=31, hour=13)
@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ..flight_path import FlightPath
+
+
+class TestFlightPath(unittest.TestCase):
+    def setUp(self):
+        self.points = [
+            {
+                "latitude": 50,
+                "longitude": -3,
+                "altitude_ft": 30000,
+                "time": pd.Timestamp("2024-01-31 13:45"),
+            },
+            {
+                "latitude": 51,
+                "longitude": -4,
+                "altitude_ft": 31000,
+                "time": pd.Timestamp("2024-01-31 13:55"),
+            },
+            {"latitude": 52, "longitude": -5, "altitude_ft": 32000},
+        ]
+        self.flight_path = FlightPath.from_points(self.points)
+
+    def test_from_points(self):
+        self.assertEqual(len(self.flight_path), 3)
+        self.assertEqual(self.flight_path, self.points)
+        np.testing.assert_array_equal(self.flight_path["latitude"], [50, 51, 52])
+        # Times are held as int64 nanoseconds since the epoch
+        self.assertEqual(self.flight_path.columns["time"].dtype, np.int64)
+        self.assertEqual(
+            self.flight_path.columns["time"][0],
+            pd.Timestamp("2024-01-31 13:45").value,
+        )
+
+    def test_point_view(self):
+        point = self.flight_path[-1]
+        self.assertNotIn("time", point)
+        self.assertEqual(point["latitude"], 52)
+        with self.assertRaises(KeyError):
+            point["time"]
+
+        point["time"] = pd.Timestamp("2024-01-31 14:05")
+        point["course"] = 1.5
+        self.assertEqual(
+            self.flight_path["time"][2], np.datetime64("2024-01-31T14:05", "ns")
+        )
+        self.assertEqual(self.flight_path[2]["course"], 1.5)
+        self.assertNotIn("course", self.flight_path[0])
+
+    def test_append(self):
+        self.flight_path.append({"latitude": 53, "longitude": -6, "thrust": 0.8})
+        self.assertEqual(len(self.flight_path), 4)
+        self.assertEqual(
+            self.flight_path[3], {"latitude": 53, "longitude": -6, "thrust": 0.8}
+        )
+        self.assertTrue(np.isnan(self.flight_path["altitude_ft"][3]))
+
+    def test_append_many(self):
+        flight_path = FlightPath()
+        for i in range(100):
+            flight_path.append({"latitude": i, "course": np.nan})
+        self.assertEqual(len(flight_path), 100)
+        self.assertGreaterEqual(flight_path.capacity, 100)
+        np.testing.assert_array_equal(flight_path["latitude"], np.arange(100))
+        self.assertEqual(len(flight_path.columns["latitude"]), 100)
+        self.assertEqual(
+            flight_path[:3].fingerprint(), flight_path.copy()[:3].fingerprint()
+        )
+
+    def test_nan_value(self):
+        # Fields set to NaN are present, only fields never set are missing
+        self.flight_path[0]["course"] = np.nan
+        self.assertIn("course", self.flight_path[0])
+        self.assertTrue(np.isnan(self.flight_path[0]["course"]))
+        self.assertNotIn("course", self.flight_path[1])
+        self.assertNotIn("course", self.flight_path.copy()[1])
+
+        del self.flight_path[0]["course"]
+        self.assertNotIn("course", self.flight_path[0])
+
+    def test_set_column(self):
+        self.flight_path["thrust"] = 0.8
+        np.testing.assert_array_equal(self.flight_path["thrust"], [0.8, 0.8, 0.8])
+        with self.assertRaises(ValueError):
+            self.flight_path["course"] = [0, 1]
+
+    def test_to_dataframe(self):
+        df = self.flight_path.to_dataframe()
+        self.assertEqual(
+            list(df.columns), ["latitude", "longitude", "altitude_ft", "time"]
+        )
+        self.assertTrue(pd.isna(df["time"][2]))
+        self.assertTrue(
+            np.shares_memory(df["latitude"].values, self.flight_path["latitude"])
+        )
+        self.assertEqual(FlightPath.from_dataframe(df), self.flight_path)
+
+    def test_slice(self):
+        flight_path = self.flight_path[:2]
+        self.assertEqual(flight_path, self.points[:2])
+        self.assertEqual(FlightPath(), [])
+
+    def test_fingerprint(self):
+        fingerprint = self.flight_path.fingerprint()
+        self.assertEqual(FlightPath.from_points(self.points).fingerprint(), fingerprint)
+        self.flight_path[0]["latitude"] = 50.001
+        self.assertNotEqual(self.flight_path.fingerprint(), fingerprint)
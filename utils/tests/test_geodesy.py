@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from geopy import distance as gp
+from .. import geodesy
+
+
+class TestGeodesy(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.lat1 = rng.uniform(-80, 80, 200)
+        self.lon1 = rng.uniform(-180, 180, 200)
+        self.lat2 = rng.uniform(-80, 80, 200)
+        self.lon2 = rng.uniform(-180, 180, 200)
+        self.geopy_distances = np.array(
+            [
+                gp.distance((lat1, lon1), (lat2, lon2)).m
+                for lat1, lon1, lat2, lon2 in zip(
+                    self.lat1, self.lon1, self.lat2, self.lon2
+                )
+            ]
+        )
+
+    def test_vincenty(self):
+        distances = geodesy.vincenty(self.lat1, self.lon1, self.lat2, self.lon2)
+        # Within a millimetre of geopy's geodesic
+        np.testing.assert_allclose(distances, self.geopy_distances, atol=1e-3)
+        self.assertAlmostEqual(
+            geodesy.vincenty(50.74, -3.0, 40.64, -73.78),
+            gp.distance((50.74, -3.0), (40.64, -73.78)).m,
+            places=3,
+        )
+        self.assertEqual(geodesy.vincenty(10, 10, 10, 10), 0)
+
+    def test_haversine(self):
+        distances = geodesy.haversine(self.lat1, self.lon1, self.lat2, self.lon2)
+        np.testing.assert_allclose(distances, self.geopy_distances, rtol=0.006)
+
+    def test_distance(self):
+        self.assertEqual(geodesy.distance(0, 0, 1, 1), geodesy.vincenty(0, 0, 1, 1))
+        self.assertEqual(
+            geodesy.distance(0, 0, 1, 1, method="haversine"),
+            geodesy.haversine(0, 0, 1, 1),
+        )
+        with self.assertRaises(ValueError):
+            geodesy.distance(0, 0, 1, 1, method="flat")
+
+    def test_initial_bearing(self):
+        self.assertAlmostEqual(geodesy.initial_bearing(0, 0, 1, 0), 0)
+        self.assertAlmostEqual(geodesy.initial_bearing(0, 0, 0, 1), np.pi / 2)
+        self.assertAlmostEqual(geodesy.initial_bearing(0, 0, -1, 0), np.pi)
+        bearings = geodesy.initial_bearing(self.lat1, self.lon1, self.lat2, self.lon2)
+        self.assertTrue(((bearings >= 0) & (bearings < 2 * np.pi)).all())
+
+    def test_destination(self):
+        bearings = geodesy.initial_bearing(self.lat1, self.lon1, self.lat2, self.lon2)
+        distances = geodesy.haversine(self.lat1, self.lon1, self.lat2, self.lon2)
+        # Travelling along the initial bearing for the distance reaches the point
+        lat, lon = geodesy.destination(self.lat1, self.lon1, distances, bearings)
+        np.testing.assert_allclose(lat, self.lat2, atol=1e-6)
+        np.testing.assert_allclose((lon - self.lon2 + 180) % 360 - 180, 0, atol=1e-6)
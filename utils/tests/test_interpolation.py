@@ -0,0 +1,121 @@
+import pickle
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import xarray as xr
+from ..interpolation import GridInterpolator
+
+
+class TestGridInterpolator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.dataarray = xr.DataArray(
+            rng.normal(size=(6, 3, 8, 10)),
+            coords={
+                "time": pd.date_range("2024-01-31 12:00", periods=6, freq="1h"),
+                "level": [300, 250, 200],
+                "latitude": np.arange(55, 51, -0.5),
+                "longitude": np.arange(-5, 0, 0.5),
+            },
+        )
+        self.dims = ["time", "level", "latitude", "longitude"]
+        self.interpolator = GridInterpolator.from_dataarrays(
+            [self.dataarray], self.dims
+        )
+        n = 200
+        self.coordinates = [
+            (
+                pd.Timestamp("2024-01-31 12:00")
+                + pd.to_timedelta(rng.uniform(0, 5 * 3600, n), "s")
+            ).values,
+            rng.uniform(200, 300, n),
+            rng.uniform(51.5, 55, n),
+            rng.uniform(-5, -0.5, n),
+        ]
+
+    def get_indexers(self):
+        return {
+            dim: xr.DataArray(values, dims="points")
+            for dim, values in zip(self.dims, self.coordinates)
+        }
+
+    def test_linear(self):
+        index = self.interpolator.get_index(self.coordinates)
+        self.assertEqual(index.indices.shape, (16, 200))
+        np.testing.assert_allclose(index.weights.sum(axis=0), 1)
+        np.testing.assert_allclose(
+            self.interpolator.interpolate(index)[0],
+            self.dataarray.interp(**self.get_indexers()).values,
+        )
+
+    def test_out_of_bounds(self):
+        self.coordinates[1][:10] = 350
+        self.coordinates[3][10:20] = 1
+        clamped = self.interpolator.interpolate(
+            self.interpolator.get_index(self.coordinates)
+        )
+        self.assertFalse(np.isnan(clamped).any())
+
+        for method in ["linear", "nearest"]:
+            index = self.interpolator.get_index(
+                self.coordinates, method, out_of_bounds="nan"
+            )
+            values = self.interpolator.interpolate(index)[0]
+            self.assertTrue(np.isnan(values[:20]).all())
+            self.assertFalse(np.isnan(values[20:]).any())
+        np.testing.assert_allclose(
+            self.interpolator.interpolate(
+                self.interpolator.get_index(self.coordinates, out_of_bounds="nan")
+            )[0],
+            self.dataarray.interp(**self.get_indexers()).values,
+        )
+
+    def test_nearest(self):
+        index = self.interpolator.get_index(self.coordinates, "nearest")
+        np.testing.assert_array_equal(
+            self.interpolator.interpolate(index)[0],
+            self.dataarray.sel(**self.get_indexers(), method="nearest").values,
+        )
+
+    def test_extra_dims(self):
+        # Dims which aren't interpolated over become separate variables
+        interpolator = GridInterpolator.from_dataarrays([self.dataarray], self.dims[1:])
+        index = interpolator.get_index(self.coordinates[1:])
+        indexers = self.get_indexers()
+        indexers.pop("time")
+        np.testing.assert_allclose(
+            interpolator.interpolate(index),
+            self.dataarray.interp(**indexers).transpose("time", "points").values,
+        )
+
+    def test_grid_points(self):
+        index = self.interpolator.get_index(
+            [
+                [values[1]]
+                for values in (
+                    self.dataarray["time"].values,
+                    self.dataarray["level"].values,
+                    self.dataarray["latitude"].values,
+                    self.dataarray["longitude"].values,
+                )
+            ]
+        )
+        self.assertAlmostEqual(
+            self.interpolator.interpolate(index)[0, 0],
+            self.dataarray[1, 1, 1, 1].item(),
+        )
+
+    def test_pickle_saved(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.interpolator.save(directory + "/values")
+            self.interpolator.map(directory + "/values")
+            state = self.interpolator.__getstate__()
+            self.assertIsNone(state["values"])
+            interpolator = pickle.loads(pickle.dumps(self.interpolator))
+            self.assertFalse(interpolator.values.flags.writeable)
+            index = interpolator.get_index(self.coordinates)
+            np.testing.assert_array_equal(
+                interpolator.interpolate(index),
+                self.interpolator.interpolate(index),
+            )
@@ -0,0 +1,37 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import xarray as xr
+from .. import memmap
+
+
+class TestMemmap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dataset = xr.Dataset(
+            {
+                "air_temperature": (
+                    ["latitude", "time"],
+                    np.arange(8, dtype="float32").reshape(4, 2),
+                    {"units": "K"},
+                )
+            },
+            coords={
+                "latitude": [50.0, 50.5, 51.0, 51.5],
+                "time": pd.date_range("2024-01-31", periods=2, freq="1h"),
+            },
+            attrs={"provider": "ECMWF"},
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        path = os.path.join(self.directory.name, "met")
+        memmap.save_dataset(self.dataset, path)
+        dataset = memmap.load_dataset(path)
+        xr.testing.assert_identical(dataset, self.dataset)
+        # Variables are read-only maps of the saved files
+        self.assertFalse(dataset["air_temperature"].values.flags.writeable)